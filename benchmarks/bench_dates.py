@@ -0,0 +1,83 @@
+"""
+Events/sec turning decoded event dictionaries into Event objects.
+
+Compares dateutil parsing of every date field (the previous behaviour), the ISO fast path with all dates read, and
+lazy construction where no date is read.
+
+    python -m benchmarks.bench_dates [--events 20000]
+"""
+
+import argparse
+import datetime
+import time
+
+from dateutil.parser import parse as to_datetime
+
+from pyteamup import Event
+from pyteamup.utils.utilities import parse_datetime
+
+DATE_FIELDS = ('start_dt', 'end_dt', 'ristart_dt', 'rsstart_dt', 'creation_dt', 'update_dt', 'delete_dt')
+
+
+class _StubCalendar:
+    api_key = 'bench'
+    _base_url = 'http://localhost/bench'
+
+
+def synthetic_events(n):
+    base = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone(datetime.timedelta(hours=-5)))
+    events = []
+    for i in range(n):
+        start = base + datetime.timedelta(hours=i)
+        events.append({'id': str(i), 'title': f'Event {i}', 'subcalendar_ids': [i % 10],
+                       'start_dt': start.isoformat(), 'end_dt': (start + datetime.timedelta(hours=1)).isoformat(),
+                       'ristart_dt': start.isoformat(), 'rsstart_dt': start.isoformat(),
+                       'creation_dt': base.isoformat(), 'update_dt': start.isoformat(), 'delete_dt': None})
+    return events
+
+
+def timed(label, n, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f'{label:>28}: {n / elapsed:10.0f} events/s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--events', type=int, default=20000)
+    args = parser.parse_args()
+
+    events = synthetic_events(args.events)
+    cal = _StubCalendar()
+
+    def dateutil_eager():
+        for e in events:
+            for f in DATE_FIELDS:
+                if e[f]:
+                    to_datetime(e[f])
+            Event(cal, **e)
+
+    def fast_path_all_read():
+        for e in events:
+            evnt = Event(cal, **e)
+            for f in DATE_FIELDS:
+                getattr(evnt, f)
+
+    def lazy_unread():
+        for e in events:
+            Event(cal, **e)
+
+    def parse_only():
+        for e in events:
+            for f in DATE_FIELDS:
+                parse_datetime(e[f])
+
+    timed('dateutil, all fields', args.events, dateutil_eager)
+    timed('fast path, all fields read', args.events, fast_path_all_read)
+    timed('fast path, parse only', args.events, parse_only)
+    timed('lazy, no field read', args.events, lazy_unread)
+
+
+if __name__ == '__main__':
+    main()
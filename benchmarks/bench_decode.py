@@ -0,0 +1,60 @@
+"""
+Decoding of a large event collection body: full json.loads of the str body (the previous behaviour), the fast
+backend on bytes, and incremental decoding. Reports total time, time to the first event and peak memory.
+
+    python -m benchmarks.bench_decode [--events 50000]
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+
+from pyteamup.utils.jsonstream import iter_json_array, loads
+from benchmarks.bench_dates import synthetic_events
+
+
+def measure(label, fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    first = fn(start)
+    total = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f'{label:>24}: total {total * 1000:8.1f} ms  first event {first * 1000:8.2f} ms  peak {peak / 2 ** 20:7.1f} MiB')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--events', type=int, default=50000)
+    args = parser.parse_args()
+
+    body = json.dumps({'events': synthetic_events(args.events), 'timestamp': 0}).encode()
+    chunks = [body[i:i + 65536] for i in range(0, len(body), 65536)]
+    print(f'body: {len(body) / 2 ** 20:.1f} MiB')
+
+    def full_str(start):
+        events = json.loads(body.decode())['events']
+        first = time.perf_counter() - start
+        for _ in events:
+            pass
+        return first
+
+    def fast_bytes(start):
+        loads(body)
+        return time.perf_counter() - start
+
+    def streamed(start):
+        first = None
+        for _ in iter_json_array(iter(chunks)):
+            if first is None:
+                first = time.perf_counter() - start
+        return first
+
+    measure('json.loads(str)', full_str)
+    measure('fast backend (bytes)', fast_bytes)
+    measure('incremental', streamed)
+
+
+if __name__ == '__main__':
+    main()
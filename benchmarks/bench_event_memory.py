@@ -0,0 +1,70 @@
+"""
+Memory held by Event objects. Builds events from synthetic api dictionaries under tracemalloc and reports the bytes
+retained per event, the time to build them, and the bytes per event of the dictionaries alone for comparison.
+
+    python -m benchmarks.bench_event_memory [--events 200000]
+"""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from pyteamup import Calendar, Event
+from benchmarks.mock_server import synthetic_calendar
+
+
+def retained(build):
+    """Bytes still allocated after build() returns, with the time build() took"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        began = time.perf_counter()
+        value = build()
+        elapsed = time.perf_counter() - began
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    return size, elapsed, value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=200000)
+    args = parser.parse_args()
+
+    events, _ = synthetic_calendar(args.events, subcalendars=50)
+    # decoded from JSON like a real response, so equal values are separate objects as they would be
+    body = json.dumps(events)
+    del events
+    cal = Calendar('ksmockcal', 'mock-api-key', validate=False)
+
+    dict_size, _, events = retained(lambda: json.loads(body))
+    n = len(events)
+    print(f'{"dicts":>18}: {dict_size / n:8.1f} bytes/event')
+
+    event_size, elapsed, built = retained(lambda: [Event(cal, **e) for e in events])
+    print(f'{"Event objects":>18}: {event_size / n:8.1f} bytes/event   '
+          f'{event_size / 2 ** 20:8.1f} MiB for {n} events   built in {elapsed:.2f} s')
+
+    # reading dates parses and keeps them
+    dated_size, elapsed, _ = retained(lambda: [(e.start_dt, e.end_dt) for e in built])
+    print(f'{"+ dates read":>18}: {dated_size / n:8.1f} bytes/event   in {elapsed:.2f} s')
+
+    del events
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    standalone = [Event(cal, **e) for e in json.loads(body)]
+    gc.collect()
+    total = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    print(f'{"events + values":>18}: {total / len(standalone):8.1f} bytes/event   '
+          f'{total / 2 ** 20:8.1f} MiB, dictionaries released after construction')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Fan-out across many calendars: building N calendars and fetching a collection from each one after the other, against
+a CalendarPool checking the keys concurrently and fetching the collections over shared connections.
+
+    python -m benchmarks.bench_pool [--calendars 100] [--events 2000] [--latency 0.02] [--workers 16]
+"""
+
+import argparse
+import datetime
+import time
+
+from pyteamup import Calendar, CalendarPool
+from benchmarks.mock_server import MockTeamUpServer, synthetic_calendar
+
+START = datetime.date(2023, 12, 1)
+END = datetime.date(2024, 6, 1)
+
+
+def serial(server, keys):
+    events = 0
+    for cal_id, api_key in keys.items():
+        cal = Calendar(cal_id, api_key, base_url=server.base_url)
+        events += len(cal.get_event_collection(START, END, returnas='dict'))
+        cal.close()
+    return events
+
+
+def pooled(server, keys, workers, window_days):
+    events = 0
+    with CalendarPool(keys, base_url=server.base_url, max_workers=workers) as pool:
+        for result in pool.iter_event_collections(START, END, returnas='dict', window_days=window_days):
+            events += len(result.result)
+    return events
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calendars', type=int, default=100)
+    parser.add_argument('--events', type=int, default=2000, help='events served by every calendar')
+    parser.add_argument('--latency', type=float, default=0.02, help='seconds added to every mock response')
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--window-days', type=int, default=None)
+    args = parser.parse_args()
+
+    keys = {f'kscal{i}': f'key-{i}' for i in range(args.calendars)}
+    events, subcalendars = synthetic_calendar(args.events, start=datetime.datetime(2024, 1, 1))
+    with MockTeamUpServer(events=events, subcalendars=subcalendars, latency=args.latency, calendars=keys) as server:
+        for label, run in (('serial Calendars', lambda: serial(server, keys)),
+                           ('CalendarPool', lambda: pooled(server, keys, args.workers, args.window_days))):
+            Calendar.clear_validation_cache()
+            server.reset_counts()
+            start = time.perf_counter()
+            fetched = run()
+            elapsed = time.perf_counter() - start
+            print(f'{label:>18}: {elapsed:8.2f} s   {fetched} events   {server.request_count} requests')
+
+
+if __name__ == '__main__':
+    main()
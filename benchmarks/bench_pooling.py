@@ -0,0 +1,42 @@
+"""
+Requests/sec for Calendar.get_event with and without connection pooling.
+
+    python -m benchmarks.bench_pooling [--requests 500] [--threads 1]
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pyteamup import Calendar
+from benchmarks.mock_server import MockTeamUpServer
+
+EVENT = {'id': '1', 'title': 'Benchmark', 'subcalendar_ids': [1], 'start_dt': '2024-01-01T09:00:00+00:00',
+         'end_dt': '2024-01-01T10:00:00+00:00', 'all_day': False, 'version': 'a1', 'creation_dt': '2024-01-01T00:00:00+00:00'}
+
+
+def run(server, n_requests, threads, keep_alive):
+    cal = Calendar(server.calendar_id, server.api_key, base_url=server.base_url, keep_alive=keep_alive,
+                   pool_size=max(threads, 1))
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(lambda _: cal.get_event('1', returnas='dict'), range(n_requests)))
+    elapsed = time.perf_counter() - start
+    cal.close()
+    return n_requests / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--threads', type=int, default=1)
+    args = parser.parse_args()
+
+    with MockTeamUpServer(events=[EVENT]) as server:
+        for label, keep_alive in (('no pooling', False), ('pooled', True)):
+            rps = run(server, args.requests, args.threads, keep_alive)
+            print(f'{label:>12}: {rps:8.1f} req/s')
+
+
+if __name__ == '__main__':
+    main()
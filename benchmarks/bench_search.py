@@ -0,0 +1,75 @@
+"""
+Repeated text searches over one calendar: the api query, scanning a fetched collection in Python, and a local
+SearchIndex built once. Reports the mean time per search and the requests sent.
+
+    python -m benchmarks.bench_search [--events 20000] [--searches 200] [--latency 0.02]
+"""
+
+import argparse
+import datetime
+import random
+import time
+
+from pyteamup import Calendar
+from pyteamup.utils.search import SEARCH_FIELDS
+from benchmarks.mock_server import MockTeamUpServer, synthetic_calendar
+
+START = datetime.date(2000, 1, 1)
+END = datetime.date(2100, 1, 1)
+
+
+def scan(events, query):
+    words = query.lower().split()
+    found = []
+    for event in events:
+        text = ' '.join(getattr(event, field) or '' for field in SEARCH_FIELDS).lower()
+        if all(word in text for word in words):
+            found.append(event)
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=20000)
+    parser.add_argument('--searches', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.02, help='seconds added to every mock response')
+    args = parser.parse_args()
+
+    events, subcalendars = synthetic_calendar(args.events, subcalendars=20)
+    rng = random.Random(0)
+    queries = [f'event {rng.randrange(args.events)}' for _ in range(args.searches)]
+    with MockTeamUpServer(events=events, subcalendars=subcalendars, latency=args.latency) as server:
+        cal = Calendar(server.calendar_id, server.api_key, base_url=server.base_url)
+        runs = []
+
+        def api():
+            for query in queries[:max(1, args.searches // 10)]:
+                cal.search_events(query, START, END)
+            return max(1, args.searches // 10)
+
+        def fetch_and_scan():
+            collection = cal.get_event_collection(START, END)
+            for query in queries:
+                scan(collection, query)
+            return args.searches
+
+        def index():
+            search_index = cal.search_index(START, END)
+            began = time.perf_counter()
+            for query in queries:
+                search_index.search(query)
+            runs.append(time.perf_counter() - began)
+            return args.searches
+
+        for label, bench in (('api query', api), ('fetch + scan', fetch_and_scan), ('search index', index)):
+            server.reset_counts()
+            began = time.perf_counter()
+            searches = bench()
+            elapsed = time.perf_counter() - began
+            print(f'{label:>14}: {elapsed / searches * 1000:9.3f} ms per search   requests {server.request_count}')
+        print(f'{"index only":>14}: {runs[0] / args.searches * 1000:9.3f} ms per search once built')
+        cal.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Saving and reloading event sets: snapshot files against JSON and pickle of the event dicts. Reports the file size,
+write time, time to open and read one event, and time to decode every event.
+
+    python -m benchmarks.bench_snapshot [--events 50000] [--path /tmp/pyteamup-bench]
+"""
+
+import argparse
+import json
+import os
+import pickle
+import tempfile
+import time
+
+from pyteamup import Snapshot, write_snapshot
+from benchmarks.mock_server import synthetic_calendar
+
+
+def timed(fn):
+    start = time.perf_counter()
+    value = fn()
+    return time.perf_counter() - start, value
+
+
+def bench_json(path, events):
+    def write():
+        with open(path, 'w') as f:
+            json.dump(events, f)
+
+    def load():
+        with open(path) as f:
+            return json.load(f)
+    return write, lambda: load()[len(events) // 2], lambda: load()
+
+
+def bench_pickle(path, events):
+    def write():
+        with open(path, 'wb') as f:
+            pickle.dump(events, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def load():
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    return write, lambda: load()[len(events) // 2], lambda: load()
+
+
+def bench_snapshot(path, events):
+    def first():
+        with Snapshot.open(path) as snapshot:
+            return snapshot.record(len(events) // 2)
+
+    def every():
+        with Snapshot.open(path) as snapshot:
+            return list(snapshot.records())
+    return lambda: write_snapshot(path, events), first, every
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=50000)
+    parser.add_argument('--path', default=tempfile.gettempdir())
+    args = parser.parse_args()
+
+    events, _ = synthetic_calendar(args.events, subcalendars=50)
+    for label, bench, suffix in (('json', bench_json, 'json'), ('pickle', bench_pickle, 'pickle'),
+                                 ('snapshot', bench_snapshot, 'snap')):
+        path = os.path.join(args.path, f'pyteamup-bench.{suffix}')
+        write, first, every = bench(path, events)
+        write_time, _ = timed(write)
+        first_time, _ = timed(first)
+        every_time, _ = timed(every)
+        print(f'{label:>10}: {os.path.getsize(path) / 2 ** 20:7.2f} MiB   write {write_time:6.3f} s   '
+              f'open + one event {first_time * 1000:9.2f} ms   all events {every_time:6.3f} s')
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Cold start cost: time to ``import pyteamup`` in a fresh interpreter and latency of constructing a Calendar with eager,
+deferred and already validated api keys.
+
+    python -m benchmarks.bench_startup [--imports 5] [--calendars 200]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.mock_server import MockTeamUpServer
+
+IMPORT_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+import pyteamup
+elapsed = time.perf_counter() - start
+heavy = [m for m in ('pandas', 'numpy', 'aiohttp', 'orjson', 'dateutil', 'asyncio') if m in sys.modules]
+print(elapsed, ','.join(heavy))
+"""
+
+
+def import_times(n):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get('PYTHONPATH')])))
+    times, heavy = [], ''
+    for _ in range(n):
+        out = subprocess.run([sys.executable, '-c', IMPORT_SNIPPET], env=env, check=True, capture_output=True,
+                             text=True).stdout.split()
+        times.append(float(out[0]))
+        heavy = out[1] if len(out) > 1 else ''
+    return times, heavy
+
+
+def construction_times(server, n, **kwargs):
+    from pyteamup import Calendar
+    times = []
+    for _ in range(n):
+        start = time.perf_counter()
+        cal = Calendar(server.calendar_id, server.api_key, base_url=server.base_url, **kwargs)
+        times.append(time.perf_counter() - start)
+        cal.close()
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--imports', type=int, default=5)
+    parser.add_argument('--calendars', type=int, default=200)
+    args = parser.parse_args()
+
+    times, heavy = import_times(args.imports)
+    print(f'{"import pyteamup":>28}: {statistics.median(times) * 1000:8.1f} ms median'
+          f'  (optional modules loaded: {heavy or "none"})')
+
+    from pyteamup import Calendar
+    with MockTeamUpServer() as server:
+        for label, kwargs, cached in (('Calendar(), key unchecked', {}, False),
+                                      ('Calendar(), key cached', {}, True),
+                                      ('Calendar(validate=False)', {'validate': False}, False)):
+            Calendar.clear_validation_cache()
+            if cached:
+                Calendar.validate_keys([server.api_key], base_url=server.base_url)
+            server.reset_counts()
+            if cached:
+                times = construction_times(server, args.calendars, **kwargs)
+            else:
+                times = []
+                for _ in range(args.calendars):
+                    Calendar.clear_validation_cache()
+                    times.extend(construction_times(server, 1, **kwargs))
+            print(f'{label:>28}: {statistics.median(times) * 1e6:8.1f} us median, '
+                  f'{server.request_count / args.calendars:.2f} requests per calendar')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Many threads sharing one Calendar. A cold start where every thread asks for the configuration, the subcalendars, the
+same collection and the same event at once, reporting the calls made against the requests the server received, then
+threads updating one shared Event, reporting the version conflicts.
+
+    python -m benchmarks.bench_threads [--threads 50] [--events 2000] [--latency 0.05]
+"""
+
+import argparse
+import datetime
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+from pyteamup import Calendar, VersionConflict
+from benchmarks.mock_server import MockTeamUpServer, synthetic_calendar
+
+START = datetime.date(2000, 1, 1)
+END = datetime.date(2100, 1, 1)
+
+
+def run_together(threads, fn):
+    """Runs fn(i) in threads threads released at the same time, returns the errors raised"""
+    barrier = threading.Barrier(threads)
+
+    def task(i):
+        barrier.wait()
+        try:
+            fn(i)
+        except Exception as error:
+            return error
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return [error for error in pool.map(task, range(threads)) if error is not None]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=50)
+    parser.add_argument('--events', type=int, default=2000)
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds added to every mock response')
+    args = parser.parse_args()
+
+    events, subcalendars = synthetic_calendar(args.events, subcalendars=20, recurring=0)
+    event_id = events[0]['id']
+    with MockTeamUpServer(events=events, subcalendars=subcalendars, latency=args.latency) as server:
+        cal = Calendar(server.calendar_id, server.api_key, base_url=server.base_url, validate=False,
+                       pool_size=args.threads, metrics=True)
+
+        def cold_start(_):
+            cal.valid_api
+            cal.configuration
+            cal.subcalendars
+            cal.get_event_collection(START, END)
+            cal.get_event(event_id)
+
+        server.reset_counts()
+        began = time.perf_counter()
+        errors = run_together(args.threads, cold_start)
+        elapsed = time.perf_counter() - began
+        calls = args.threads * 5
+        sent = server.request_count
+        print(f'cold start: {args.threads} threads, {calls} calls, {sent} requests sent, {calls - sent} saved '
+              f'in {elapsed:.2f} s, errors {len(errors)}')
+        for endpoint, count in sorted(server.requests.items()):
+            print(f'{endpoint:>24}: {count}')
+        print(f'single flight: {cal.singleflight.stats()}')
+
+        shared = cal.get_event(event_id)
+
+        def update(i):
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                shared.title = f'Updated by thread {i}'
+
+        server.reset_counts()
+        errors = run_together(args.threads, update)
+        conflicts = sum(isinstance(error, VersionConflict) for error in errors)
+        print(f'shared event: {args.threads} threads updating, {server.request_count} PUTs, {conflicts} version '
+              f'conflicts, other errors {len(errors) - conflicts}')
+        cal.close()
+
+
+if __name__ == '__main__':
+    main()
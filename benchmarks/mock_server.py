@@ -0,0 +1,326 @@
+"""
+Local, offline stand-in for the parts of the TeamUp api used by pyteamup.
+
+Only meant for benchmarks: it keeps every event in memory, speaks HTTP/1.1 with keep-alive and counts the requests
+it receives so benchmarks can compare how many round trips a client made. Latency and random error responses can be
+added to mimic a remote api, and ``synthetic_calendar`` builds large calendars to load it with.
+
+    events, subcalendars = synthetic_calendar(10000, subcalendars=50)
+    with MockTeamUpServer(events=events, subcalendars=subcalendars, latency=0.02) as server:
+        cal = Calendar(server.calendar_id, server.api_key, base_url=server.base_url)
+"""
+
+import datetime
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+from zoneinfo import ZoneInfo
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload=None):
+        body = json.dumps(payload).encode() if payload is not None else b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if self.headers.get('Connection', '').lower() == 'close':
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length)) if length else {}
+
+    def _route(self, method):
+        server = self.server.mock
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+        path = parts.path.rstrip('/').split('/')[1:]
+        server.count(method, path)
+        server.wait()
+
+        injected = server.next_error()
+        if injected is not None:
+            status, retry_after = injected
+            # the body has to be consumed or it would be read as the next request on a keep-alive connection
+            self._read_body()
+            self.send_response(status)
+            if retry_after is not None:
+                self.send_header('Retry-After', str(retry_after))
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        token = query.get('_teamup_token', [None])[0]
+        if token not in server.calendars.values():
+            return self._send(403, {'error': {'id': 'no_permission'}})
+        if path == ['check-access']:
+            return self._send(200, {'access': 'ok'})
+        if not path or path[0] not in server.calendars:
+            return self._send(404, {'error': {'id': 'calendar_not_found'}})
+        if server.calendars[path[0]] != token:
+            return self._send(403, {'error': {'id': 'no_permission'}})
+
+        resource = path[1:]
+        if resource == ['configuration'] and method == 'GET':
+            return self._send(200, {'configuration': server.configuration})
+        if resource == ['subcalendars'] and method == 'GET':
+            return self._send(200, {'subcalendars': server.subcalendars})
+        if resource == ['events'] and method == 'GET':
+            return self._send(200, server.list_events(query))
+        if resource == ['events'] and method == 'POST':
+            return self._send(201, server.create_event(self._read_body()))
+        if len(resource) == 2 and resource[0] == 'events':
+            event = server.events.get(resource[1])
+            if event is None:
+                return self._send(404, {'error': {'id': 'event_not_found'}})
+            if method == 'GET':
+                return self._send(200, {'event': event})
+            if method == 'PUT':
+                payload = self._read_body()
+                if payload.get('version') and payload['version'] != event.get('version'):
+                    return self._send(409, {'error': {'id': 'event_conflict'}})
+                return self._send(200, server.update_event(event, payload))
+            if method == 'DELETE':
+                return self._send(200, server.delete_event(event))
+        return self._send(405, {'error': {'id': 'method_not_allowed'}})
+
+    def do_GET(self):
+        self._route('GET')
+
+    def do_POST(self):
+        self._route('POST')
+
+    def do_PUT(self):
+        self._route('PUT')
+
+    def do_DELETE(self):
+        self._route('DELETE')
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+class MockTeamUpServer:
+    """
+    Threaded HTTP server answering the TeamUp endpoints pyteamup talks to.
+
+    :param calendar_id: <str> calendar key the server answers for
+    :param api_key: <str> token every request must carry
+    :param events: optional list of event dicts to preload
+    :param subcalendars: optional list of subcalendar dicts
+    :param latency: seconds every response is delayed by, or a (min, max) tuple for a uniformly random delay
+    :param error_rate: <float> fraction of requests answered with ``error_status`` instead of being served
+    :param error_status: <int> status used for random errors
+    :param seed: optional seed of the random latency and errors
+    :param calendars: optional dict of more calendar keys to their api keys, all serving the same events
+    :param timezone: <str> IANA timezone of the calendar, naive dates of created and updated events are read in it and
+                     stored with its offset like the api does
+    """
+    def __init__(self, calendar_id='ksmockcal', api_key='mock-api-key', events=None, subcalendars=None,
+                 host='127.0.0.1', port=0, latency=0, error_rate=0.0, error_status=503, seed=None,
+                 calendars=None, timezone='UTC'):
+        self.calendar_id = calendar_id
+        self.api_key = api_key
+        self.calendars = {calendar_id: api_key, **(calendars or {})}
+        self.subcalendars = subcalendars or [{'id': 1, 'name': 'Default', 'active': True}]
+        self.configuration = {'general_settings': {'timezone': timezone}}
+        self.timezone = ZoneInfo(timezone)
+        self.events = {str(e['id']): e for e in (events or [])}
+        self.deleted = {}
+        self.modified = {}
+        self.requests = {}
+        self.errors = []
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = _Server((host, port), _Handler)
+        self._httpd.mock = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def request_count(self):
+        return sum(self.requests.values())
+
+    def count(self, method, path):
+        key = f'{method} /' + '/'.join(path[1:2] if path and path[0] in self.calendars else path)
+        with self._lock:
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+    def inject_errors(self, status, count=1, retry_after=None):
+        """Answers the next ``count`` requests with ``status`` (and a Retry-After header if given)"""
+        with self._lock:
+            self.errors.extend([(status, retry_after)] * count)
+
+    def next_error(self):
+        with self._lock:
+            if self.errors:
+                return self.errors.pop(0)
+            if self.error_rate and self._random.random() < self.error_rate:
+                return self.error_status, None
+            return None
+
+    def wait(self):
+        """Sleeps for the configured latency before a request is answered"""
+        latency = self.latency
+        if isinstance(latency, tuple):
+            with self._lock:
+                latency = self._random.uniform(*latency)
+        if latency:
+            time.sleep(latency)
+
+    def reset_counts(self):
+        with self._lock:
+            self.requests = {}
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    @staticmethod
+    def _now():
+        return datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%S+00:00')
+
+    def list_events(self, query):
+        modified_since = query.get('modifiedSince', [None])[0]
+        if modified_since is not None:
+            since = int(modified_since)
+            events = [e for i, e in list(self.events.items()) + list(self.deleted.items())
+                      if self.modified.get(i, 0) >= since]
+            return {'events': events, 'timestamp': int(datetime.datetime.now().timestamp())}
+        start = query.get('startDate', [None])[0]
+        end = query.get('endDate', [None])[0]
+        subcals = set(query.get('subcalendarId[]', []))
+        words = (query.get('query', [''])[0]).lower().split()
+        events = []
+        for event in self.events.values():
+            if words:
+                text = ' '.join(event.get(f) or '' for f in ('title', 'notes', 'location', 'who')).lower()
+                if not all(word in text for word in words):
+                    continue
+            if start and event['end_dt'][:10] < start:
+                continue
+            if end and event['start_dt'][:10] > end:
+                continue
+            if subcals and not subcals.intersection(str(s) for s in event['subcalendar_ids']):
+                continue
+            events.append(event)
+        events.sort(key=lambda e: e['start_dt'])
+        return {'events': events, 'timestamp': int(datetime.datetime.now().timestamp())}
+
+    def _localized(self, payload):
+        """Gives naive start and end dates the offset of the calendar timezone"""
+        for field in ('start_dt', 'end_dt'):
+            value = payload.get(field)
+            if value:
+                parsed = datetime.datetime.fromisoformat(value)
+                if parsed.tzinfo is None:
+                    payload[field] = parsed.replace(tzinfo=self.timezone).isoformat(timespec='seconds')
+        return payload
+
+    def create_event(self, payload):
+        event = self._localized(dict(payload))
+        with self._lock:
+            event['id'] = str(uuid.uuid4().int)[:9]
+            event['version'] = uuid.uuid4().hex[:10]
+            event['creation_dt'] = self._now()
+            event['update_dt'] = None
+            event['delete_dt'] = None
+            self.events[event['id']] = event
+            self.modified[event['id']] = int(datetime.datetime.now().timestamp())
+        return {'event': event, 'undo_id': uuid.uuid4().hex[:12]}
+
+    def update_event(self, event, payload):
+        with self._lock:
+            event.update({k: v for k, v in self._localized(dict(payload)).items() if k != 'id'})
+            event['version'] = uuid.uuid4().hex[:10]
+            event['update_dt'] = self._now()
+            self.modified[str(event['id'])] = int(datetime.datetime.now().timestamp())
+        return {'event': event, 'undo_id': uuid.uuid4().hex[:12]}
+
+    def delete_event(self, event):
+        with self._lock:
+            event = self.events.pop(str(event['id']), None) or event
+            event['delete_dt'] = self._now()
+            self.deleted[str(event['id'])] = event
+            self.modified[str(event['id'])] = int(datetime.datetime.now().timestamp())
+        return {'undo_id': uuid.uuid4().hex[:12]}
+
+
+def synthetic_calendar(n_events, subcalendars=10, recurring=0.1, occurrences=10, start=None, seed=0):
+    """
+    Builds a calendar of ``n_events`` events spread over ``subcalendars`` subcalendars, about a ``recurring`` fraction
+    of them being instances of weekly series of ``occurrences`` events expanded the way the api returns them
+    (``<series id>-rid-<timestamp>`` ids sharing an ``rrule`` and ``series_id``).
+
+    :return: (list of event dicts, list of subcalendar dicts)
+    """
+    rng = random.Random(seed)
+    start = start or datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    subcals = [{'id': i + 1, 'name': f'Subcalendar {i + 1}', 'active': True, 'color': i % 48}
+               for i in range(subcalendars)]
+
+    def event(event_id, begin, length, subcalendar_ids, **extra):
+        stamp = lambda dt: dt.strftime('%Y-%m-%dT%H:%M:%S+00:00')
+        data = {'id': event_id, 'series_id': None, 'remote_id': None, 'subcalendar_ids': subcalendar_ids,
+                'subcalendar_id': subcalendar_ids[0], 'all_day': False, 'rrule': '', 'title': f'Event {event_id}',
+                'who': '', 'location': '', 'notes': '', 'version': uuid.UUID(int=rng.getrandbits(128)).hex[:10],
+                'readonly': False, 'tz': None, 'attachments': [], 'start_dt': stamp(begin),
+                'end_dt': stamp(begin + length), 'ristart_dt': None, 'rsstart_dt': None,
+                'creation_dt': stamp(start), 'update_dt': None, 'delete_dt': None}
+        data.update(extra)
+        return data
+
+    events = []
+    next_id = 1
+    span_hours = max(24, n_events)
+    while len(events) < n_events:
+        begin = start + datetime.timedelta(hours=rng.randrange(span_hours), minutes=rng.choice((0, 15, 30, 45)))
+        length = datetime.timedelta(minutes=rng.choice((30, 60, 90, 120)))
+        subcalendar_ids = rng.sample([c['id'] for c in subcals], k=min(len(subcals), rng.choice((1, 1, 1, 2, 3))))
+        if rng.random() < recurring:
+            series_id = next_id
+            count = min(occurrences, n_events - len(events))
+            for k in range(count):
+                when = begin + datetime.timedelta(weeks=k)
+                events.append(event(f'{series_id}-rid-{int(when.timestamp())}', when, length, subcalendar_ids,
+                                    series_id=series_id, title=f'Series {series_id}',
+                                    rrule=f'FREQ=WEEKLY;COUNT={occurrences}',
+                                    ristart_dt=when.strftime('%Y-%m-%dT%H:%M:%S+00:00'),
+                                    rsstart_dt=begin.strftime('%Y-%m-%dT%H:%M:%S+00:00')))
+        else:
+            events.append(event(str(next_id), begin, length, subcalendar_ids))
+        next_id += 1
+    events.sort(key=lambda e: e['start_dt'])
+    return events, subcals
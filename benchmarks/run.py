@@ -0,0 +1,238 @@
+"""
+Benchmark suite for the hot paths of pyteamup against the local mock server.
+
+Every benchmark reports throughput, latency percentiles (p50/p95/p99) and the peak memory traced while running a few
+extra operations under tracemalloc. Results are printed and can be written as JSON and compared with an earlier run.
+
+    python -m benchmarks.run [--events 5000] [--subcalendars 50] [--iterations 200] [--latency 0.005]
+                             [--error-rate 0.01] [--only new_event,delete] [--output results.json]
+                             [--compare baseline.json]
+"""
+
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import warnings
+
+import pyteamup
+from pyteamup import Calendar, Event, RetryPolicy
+from benchmarks.mock_server import MockTeamUpServer, synthetic_calendar
+
+START = datetime.date(2023, 12, 1)
+END = datetime.date(2030, 1, 1)
+
+
+def percentile(sorted_values, pct):
+    """Nearest rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def measure(op, iterations, warmup=1, memory_samples=3):
+    """
+    Times ``op(i)`` for i in range(iterations) after ``warmup`` untimed calls, then runs ``memory_samples`` more calls
+    under tracemalloc and keeps the highest peak of a single call.
+    """
+    index = 0
+    for _ in range(warmup):
+        op(index)
+        index += 1
+
+    latencies = []
+    errors = 0
+    start = time.perf_counter()
+    for _ in range(iterations):
+        began = time.perf_counter()
+        try:
+            op(index)
+        except Exception:
+            errors += 1
+        latencies.append(time.perf_counter() - began)
+        index += 1
+    elapsed = time.perf_counter() - start
+
+    peak = 0
+    tracemalloc.start()
+    try:
+        for _ in range(memory_samples):
+            tracemalloc.reset_peak()
+            try:
+                op(index)
+            except Exception:
+                pass
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            index += 1
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {'iterations': iterations,
+            'errors': errors,
+            'seconds': elapsed,
+            'ops_per_sec': iterations / elapsed if elapsed else None,
+            'mean_ms': sum(latencies) / len(latencies) * 1000 if latencies else None,
+            'p50_ms': percentile(latencies, 50) * 1000 if latencies else None,
+            'p95_ms': percentile(latencies, 95) * 1000 if latencies else None,
+            'p99_ms': percentile(latencies, 99) * 1000 if latencies else None,
+            'peak_kib': peak / 1024}
+
+
+def bench_get_event_collection(cal, server, events, args):
+    def op(_):
+        return cal.get_event_collection(START, END, returnas='events')
+    result = measure(op, max(1, args.iterations // 20), memory_samples=1)
+    result['events_per_call'] = len(events)
+    return result
+
+
+def bench_get_event_collection_dict(cal, server, events, args):
+    def op(_):
+        return cal.get_event_collection(START, END, returnas='dict')
+    result = measure(op, max(1, args.iterations // 20), memory_samples=1)
+    result['events_per_call'] = len(events)
+    return result
+
+
+def bench_event_construction(cal, server, events, args):
+    batch = events[:1000]
+
+    def op(_):
+        return [Event(cal, **e) for e in batch]
+    result = measure(op, args.iterations)
+    result['events_per_call'] = len(batch)
+    if result['ops_per_sec']:
+        result['events_per_sec'] = result['ops_per_sec'] * len(batch)
+    return result
+
+
+def bench_new_event(cal, server, events, args):
+    subcal_ids = [s['id'] for s in server.subcalendars]
+    base = datetime.datetime(2025, 1, 1, 9, tzinfo=datetime.timezone.utc)
+
+    def op(i):
+        start = base + datetime.timedelta(hours=i)
+        subcal_id = subcal_ids[i % len(subcal_ids)]
+        return cal.new_event(f'Bench {i}', start, start + datetime.timedelta(hours=1), [subcal_id])
+    return measure(op, args.iterations)
+
+
+def _created_events(cal, server, count):
+    subcal_id = server.subcalendars[0]['id']
+    base = datetime.datetime(2026, 1, 1, 9, tzinfo=datetime.timezone.utc)
+    return [cal.new_event(f'Target {i}', base + datetime.timedelta(hours=i), base + datetime.timedelta(hours=i + 1),
+                          [subcal_id]) for i in range(count)]
+
+
+def bench_execute_update(cal, server, events, args):
+    targets = _created_events(cal, server, min(args.iterations, 50))
+
+    def op(i):
+        targets[i % len(targets)].title = f'Updated {i}'
+    return measure(op, args.iterations)
+
+
+def bench_delete(cal, server, events, args):
+    targets = _created_events(cal, server, args.iterations + 4)
+
+    def op(i):
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            targets[i].delete()
+    return measure(op, args.iterations)
+
+
+BENCHMARKS = {
+    'get_event_collection': bench_get_event_collection,
+    'get_event_collection_dict': bench_get_event_collection_dict,
+    'event_construction': bench_event_construction,
+    'new_event': bench_new_event,
+    'execute_update': bench_execute_update,
+    'delete': bench_delete,
+}
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'pyteamup': pyteamup.__version__,
+            'commit': commit,
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds')}
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)['results']
+    print(f'\ncompared with {baseline_path}')
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before or not before.get('ops_per_sec') or not result.get('ops_per_sec'):
+            continue
+        speedup = result['ops_per_sec'] / before['ops_per_sec']
+        p99 = result['p99_ms'] / before['p99_ms'] if before.get('p99_ms') else float('nan')
+        memory = result['peak_kib'] / before['peak_kib'] if before.get('peak_kib') else float('nan')
+        print(f'{name:>26}: throughput x{speedup:5.2f}   p99 x{p99:5.2f}   peak memory x{memory:5.2f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=5000, help='events in the synthetic calendar')
+    parser.add_argument('--subcalendars', type=int, default=50)
+    parser.add_argument('--recurring', type=float, default=0.1, help='fraction of events that start a weekly series')
+    parser.add_argument('--iterations', type=int, default=200, help='timed operations per benchmark')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every mock response')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with 503')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', default='', help='comma separated benchmark names, all by default')
+    parser.add_argument('--output', help='write the results as JSON to this path')
+    parser.add_argument('--compare', help='JSON file of an earlier run to compare with')
+    args = parser.parse_args()
+
+    names = [n for n in args.only.split(',') if n] or list(BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f'unknown benchmarks: {", ".join(sorted(unknown))}. Known: {", ".join(BENCHMARKS)}')
+
+    events, subcalendars = synthetic_calendar(args.events, subcalendars=args.subcalendars, recurring=args.recurring,
+                                              seed=args.seed)
+    results = {}
+    with MockTeamUpServer(events=[dict(e) for e in events], subcalendars=subcalendars, latency=args.latency,
+                          error_rate=args.error_rate, seed=args.seed) as server:
+        cal = Calendar(server.calendar_id, server.api_key, base_url=server.base_url,
+                       retry=RetryPolicy(max_retries=5, base_delay=0.01, max_delay=0.1))
+        try:
+            for name in names:
+                server.reset_counts()
+                result = BENCHMARKS[name](cal, server, events, args)
+                result['requests'] = server.request_count
+                results[name] = result
+                print(f'{name:>26}: {result["ops_per_sec"]:10.1f} ops/s   p50 {result["p50_ms"]:8.2f} ms   '
+                      f'p95 {result["p95_ms"]:8.2f} ms   p99 {result["p99_ms"]:8.2f} ms   '
+                      f'peak {result["peak_kib"]:9.1f} KiB   errors {result["errors"]}')
+        finally:
+            cal.close()
+
+    report = {'environment': environment(),
+              'parameters': {k: v for k, v in vars(args).items() if k not in ('output', 'compare')},
+              'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'\nresults written to {args.output}')
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+import json
+
+from pyteamup.utils.utilities import *
+from pyteamup.utils.constants import *
+from pyteamup.utils.transport import AsyncTransport
+from pyteamup.utils.responses import *
+from pyteamup.AsyncEvent import AsyncEvent
+
+
+class AsyncCalendar:
+    """
+    asyncio version of Calendar. All network methods are coroutines and share one connection pool, with a semaphore
+    bounding how many requests are in flight. Request building and response parsing are shared with Calendar.
+
+        async with AsyncCalendar(calendar_id, api_key) as calendar:
+            events = await calendar.get_event_collection()
+
+    Entering the context validates the api key, use ``await calendar.valid_api()`` if not using it as a context manager.
+    """
+    def __init__(self, cal_id, api_key, session=None, transport=None, pool_size=DEFAULT_MAX_CONCURRENCY,
+                 max_concurrency=DEFAULT_MAX_CONCURRENCY, keep_alive=True, headers=None, timeout=DEFAULT_TIMEOUT,
+                 base_url=BASE_URL, retry=None, rate_limiter=None):
+        """
+        :param cal_id: <str> calendar key
+        :param api_key: <str> TeamUp api key
+        :param session: optional ``aiohttp.ClientSession`` to send requests through
+        :param transport: optional AsyncTransport to share between calendars
+        :param pool_size: <int> maximum number of open connections
+        :param max_concurrency: <int> maximum number of requests in flight at once
+        :param keep_alive: <bool> reuse connections between requests
+        :param headers: <dict> default headers sent with every request
+        :param timeout: <float or tuple> default request timeout in seconds
+        :param base_url: <str> root of the api
+        :param retry: RetryPolicy for 429/5xx responses
+        :param rate_limiter: optional TokenBucket limiting requests per second
+        """
+        if transport is None:
+            transport = AsyncTransport(session=session, pool_size=pool_size, max_concurrency=max_concurrency,
+                                       keep_alive=keep_alive, headers=headers, timeout=timeout, retry=retry,
+                                       rate_limiter=rate_limiter)
+        self._transport = transport
+        self.__calendar_id = cal_id
+        self.__api_key = api_key
+        self.__token_str = f'?_teamup_token={self.api_key}'
+        self.__subcalendars = None
+        self.__configuration = None
+
+        self._base_url = base_url + f'/{cal_id}'
+        self._event_collection_url = self._base_url + EVENTS_BASE + self.__token_str
+        self._subcalendars_url = self._base_url + SUBCALENDARS_BASE + self.__token_str
+        self._check_access_url = base_url + CHECK_ACCESS_BASE + self.__token_str
+
+        self.events_json = None
+
+    def __str__(self):
+        return self.calendar_id
+
+    async def __aenter__(self):
+        try:
+            valid = await self.valid_api()
+        except BaseException:
+            await self.close()
+            raise
+        if not valid:
+            await self.close()
+            raise Exception(f'Invalid Api Key: {self.api_key}')
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self):
+        await self._transport.close()
+
+    @property
+    def api_key(self):
+        return self.__api_key
+
+    @property
+    def calendar_id(self):
+        return self.__calendar_id
+
+    @property
+    def transport(self):
+        return self._transport
+
+    async def valid_api(self):
+        """
+        Makes a request to the calendar to see if the api is valid.
+        :raises: the retryable TeamUpError (RateLimited, ServerError) when the server could not answer
+        """
+        req = await self._transport.get(self._check_access_url)
+        try:
+            check_status_code(req.status_code, req)
+            return True
+        except TeamUpError as e:
+            if e.retryable:
+                raise
+            return False
+
+    async def configuration(self):
+        if self.__configuration is None:
+            req = await self._transport.get(self._base_url + CONFIGURATION_BASE + self.__token_str)
+            check_status_code(req.status_code, req)
+            self.__configuration = parse_configuration(req.text)
+        return self.__configuration
+
+    async def subcalendars(self):
+        if not self.__subcalendars:
+            req = await self._transport.get(self._subcalendars_url)
+            check_status_code(req.status_code, req)
+            self.__subcalendars = parse_subcalendars(req.text)
+        return self.__subcalendars
+
+    def clear_calendar_cache(self):
+        self.__subcalendars = None
+        self.__configuration = None
+
+    async def get_event_collection(self, start_dt=None, end_dt=None, subcal_id=None, returnas='events', markdown=False):
+        """
+        Fetches the events between start_dt and end_dt, see Calendar.get_event_collection
+
+        :param start_dt: if set as None then set as today minus 30 days
+        :param end_dt:  if left as None then set as today plus 180 days
+        :param subcal_id: optional str or list-like if a different calendar should be queried
+        :return: list of AsyncEvent, DataFrame or list of dicts
+        """
+        if returnas not in ('events', 'dataframe', 'dict', 'columnar'):
+            raise TypeError('Returnas not recognized. Recognized values: events, dataframe, dict, columnar')
+
+        parameters = collection_parameters(start_dt, end_dt, subcal_id, markdown)
+        req = await self._transport.get(self._event_collection_url + parameters)
+        check_status_code(req.status_code, req)
+        self.events_json = parse_events(req.text)
+        return events_as(self, self.events_json, returnas, AsyncEvent)
+
+    async def search_events(self, query, start_dt=None, end_dt=None, subcal_id=None, returnas='events', markdown=False):
+        """Events between start_dt and end_dt matching a text search, see Calendar.search_events"""
+        if returnas not in ('events', 'dataframe', 'dict', 'columnar'):
+            raise TypeError('Returnas not recognized. Recognized values: events, dataframe, dict, columnar')
+        parameters = collection_parameters(start_dt, end_dt, subcal_id, markdown, query=query)
+        req = await self._transport.get(self._event_collection_url + parameters)
+        check_status_code(req.status_code, req)
+        return events_as(self, parse_events(req.text), returnas, AsyncEvent)
+
+    def _event_url(self, event_id):
+        return self._base_url + EVENTS_BASE + f'/{event_id}' + self.__token_str
+
+    async def get_event(self, event_id, returnas='event'):
+        if returnas not in ('event', 'series', 'dict'):
+            raise TypeError('Returnas not recognized. Recognized values: event, series, dict')
+
+        resp = await self._transport.get(self._event_url(event_id))
+        check_status_code(resp.status_code, resp)
+        event_dict, _ = parse_event(resp.text)
+        return event_as(self, event_dict, returnas, AsyncEvent)
+
+    async def get_changed_events(self, modified_since, returnas='event'):
+        """
+        Get changed events since given unix time
+        :param modified_since: <int> Unix timestamp, must be less than 30 days old
+        :param returnas: <str> `event` `series` `dict` are valid options
+        :return: Tuple of event list and returned timestamp
+        """
+        if returnas not in ('event', 'series', 'dict'):
+            raise TypeError('Returnas not recognized. Recognized values: event, series, dict')
+        resp = await self._transport.get(self._event_collection_url + '&modifiedSince=' + str(modified_since))
+        check_status_code(resp.status_code, resp)
+        events_json, timestamp = parse_changed_events(resp.text)
+        return events_as(self, events_json, returnas, AsyncEvent), timestamp
+
+    def watch(self, **kwargs):
+        """Returns an AsyncChangeWatcher polling this calendar's changes from an asyncio task, see ChangeWatcher"""
+        from pyteamup.ChangeWatcher import AsyncChangeWatcher
+        return AsyncChangeWatcher(self, **kwargs)
+
+    async def new_event(self, title, start_dt, end_dt, subcalendar_ids, all_day=False,
+                        notes=None, location=None, who=None, remote_id=None, returnas='event'):
+        """
+        Create a new event within a provided subcalendar, see Calendar.new_event for the parameters
+        """
+        if returnas not in ('event', 'dict', 'series'):
+            raise ValueError(f'Unrecognized returnas paramter: {returnas}')
+        payload = new_event_payload(title, start_dt, end_dt, subcalendar_ids, all_day=all_day, notes=notes,
+                                    location=location, who=who, remote_id=remote_id)
+
+        resp = await self._transport.post(self._event_collection_url, data=json.dumps(payload), headers=POST_HEADERS)
+        check_status_code(resp.status_code, resp)
+        event_dict, undo_id = parse_event(resp.text)
+        return event_as(self, event_dict, returnas, AsyncEvent, undo_id=undo_id)
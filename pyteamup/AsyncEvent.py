@@ -0,0 +1,59 @@
+from warnings import warn
+
+from pyteamup.utils.utilities import *
+from pyteamup.utils.constants import *
+from pyteamup.Event import Event
+
+
+class AsyncEvent(Event):
+    """
+    Event returned by an AsyncCalendar. Attributes are read exactly like an Event, but since a property setter cannot
+    be awaited every change made through the setters is queued (as in batch mode) and sent with
+    ``await event.batch_commit()``. ``execute_update`` and ``delete`` are coroutines.
+    """
+    __slots__ = ()
+
+    @property
+    def batch(self):
+        return True
+
+    def _stage_update(self, update_dict):
+        self._record_batch(update_dict)
+
+    def enable_batch_update(self):
+        if not self.surpress_warning:
+            warn('AsyncEvent is always in batch mode')
+
+    def disable_batch_update(self, clear=False, force=False):
+        """AsyncEvent always queues changes, this only discards the queue when clear=True"""
+        if clear:
+            self._take_batch_records()
+
+    async def execute_update(self, update_dict):
+        """
+        Sends update_dict merged with the current state of the event and refreshes the event from the response.
+        :param: update_dict: Required dictionary of update elements
+        """
+        resp = await self.parent_calendar._transport.put(self.api_url, data=self._update_payload(update_dict),
+                                                         headers=POST_HEADERS)
+        check_status_code(resp.status_code, resp)
+        self._apply_update_response(resp.text)
+
+    async def batch_commit(self):
+        """Sends every change queued by the property setters as a single update. No request is made if none are queued"""
+        records = self._take_batch_records()
+        if not records:
+            if not self.surpress_warning:
+                warn('No Updates in Queue, no changes made.')
+            return
+        try:
+            await self.execute_update(records)
+        except:
+            for k, v in records.items():
+                self._record_batch({k: v})
+            raise
+
+    async def delete(self, redit=None):
+        resp = await self.parent_calendar._transport.delete(self._delete_url(redit))
+        check_status_code(resp.status_code, resp)
+        self._apply_delete_response(resp.text)
@@ -1,41 +1,131 @@
-import requests
 import json
 import datetime
-import sys
-from dateutil.parser import parse as to_datetime
-try:
-    import pandas as pd
-except:
-    pass
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 from pyteamup.utils.utilities import *
 from pyteamup.utils.constants import *
+from pyteamup.utils.transport import Transport
+from pyteamup.utils.responses import *
+from pyteamup.utils.bulk import BulkResult, bounded_map
+from pyteamup.utils.cache import ResponseCache
+from pyteamup.utils.jsonstream import iter_json_array
+from pyteamup.utils.metrics import Instrumentation, MetricsRegistry
+from pyteamup.utils.singleflight import SingleFlight
 from pyteamup.Event import Event
+from pyteamup.SubCalendar import SubCalendar
+from pyteamup.UnitOfWork import UnitOfWork
+
+logger = logging.getLogger(__name__)
+
+# /check-access results per (base_url, api_key) shared by every Calendar in the process
+_VALIDATED_KEYS = {}
+_VALIDATED_KEYS_LOCK = threading.Lock()
+_CHECK_ACCESS_FLIGHTS = SingleFlight()
+
+
+def _check_access(transport, base_url, api_key, instrumentation):
+    """Validates an api key once per process, answers from the shared results afterwards"""
+    key = (base_url, api_key)
+    with _VALIDATED_KEYS_LOCK:
+        if key in _VALIDATED_KEYS:
+            return _VALIDATED_KEYS[key]
+    return _CHECK_ACCESS_FLIGHTS.do(key, lambda: _request_access(transport, base_url, api_key, instrumentation))[0]
+
+
+def _request_access(transport, base_url, api_key, instrumentation):
+    key = (base_url, api_key)
+    with instrumentation.call('GET', CHECK_ACCESS_ENDPOINT) as call:
+        req = call.response(transport.get(base_url + CHECK_ACCESS_BASE + f'?_teamup_token={api_key}'))
+    try:
+        check_status_code(req.status_code, req)
+        valid = True
+    except TeamUpError as e:
+        if e.retryable:
+            # rate limited or server side trouble says nothing about the key, not cached and left to the caller
+            raise
+        valid = False
+    with _VALIDATED_KEYS_LOCK:
+        _VALIDATED_KEYS[key] = valid
+    return valid
 
 
 class Calendar:
-    def __init__(self, cal_id, api_key):
+    """
+    A TeamUp calendar. One instance can be shared by many threads: identical GETs in flight at the same time (the
+    configuration, the subcalendars, an event, a collection with the same parameters) are coalesced into a single
+    request whose result every waiting thread receives, see ``singleflight``.
+    """
+    def __init__(self, cal_id, api_key, session=None, transport=None, pool_size=DEFAULT_POOL_SIZE, keep_alive=True,
+                 headers=None, timeout=DEFAULT_TIMEOUT, base_url=BASE_URL, retry=None, rate_limiter=None,
+                 concurrency=None, cache=None, validate=True, metrics=None):
+        """
+        :param cal_id: <str> calendar key
+        :param api_key: <str> TeamUp api key
+        :param session: optional ``requests.Session`` to send requests through instead of a new pooled session
+        :param transport: optional Transport (or compatible object) to share, takes priority over the pool settings
+        :param pool_size: <int> number of keep-alive connections kept open to the api
+        :param keep_alive: <bool> reuse connections between requests
+        :param headers: <dict> default headers sent with every request
+        :param timeout: <float or tuple> default request timeout in seconds
+        :param base_url: <str> root of the api, can be pointed at a proxy or local stand-in server
+        :param retry: RetryPolicy for 429/5xx responses, default 3 retries with jittered exponential backoff
+        :param rate_limiter: optional TokenBucket shared by the calendar and its events
+        :param concurrency: optional AdaptiveConcurrency limiting requests in flight
+        :param cache: optional ResponseCache for get_event, configuration and subcalendars, pass True for the defaults
+        :param validate: <bool> check the api key now and raise if it is invalid. With False no request is made until
+                         the calendar is used and the key is checked on the first access of ``valid_api``. Either way
+                         the result is shared by every Calendar of the process using the same key. When the server
+                         cannot answer the check (429, 502, 503, 504) its retryable TeamUpError is raised instead.
+        :param metrics: optional MetricsRegistry recording every request of the calendar and its events, pass True
+                        for a new one. See also add_hook.
+        """
+        if transport is None:
+            transport = Transport(session=session, pool_size=pool_size, keep_alive=keep_alive, headers=headers,
+                                  timeout=timeout, retry=retry, rate_limiter=rate_limiter, concurrency=concurrency)
+        self._transport = transport
+        self._cache = ResponseCache() if cache is True else (None if cache is False else cache)
+        self._instrumentation = Instrumentation(MetricsRegistry() if metrics is True else (metrics or None))
         self.__calendar_id = cal_id
         self.__api_key = api_key
         self.__cal_base = f'/{cal_id}'
         self.__token_str = f'?_teamup_token={self.api_key}'
         self.__subcalendars = None
+        self.__subcalendar_source = None
+        self.__subcalendars_by_id = {}
+        self.__subcalendars_by_name = {}
+        self.__windows = ResponseCache(maxsize=SUBCALENDAR_VIEW_WINDOWS, ttl={'window': SUBCALENDAR_VIEW_TTL})
         self.__valid_api = None
         self.__configuration = None
 
-        self._base_url = BASE_URL + self.__cal_base
+        self._base_url = base_url + self.__cal_base
         self._event_collection_url = self._base_url + EVENTS_BASE + self.__token_str
         self._subcalendars_url = self._base_url + SUBCALENDARS_BASE + self.__token_str
-        self._check_access_url = BASE_URL + CHECK_ACCESS_BASE + self.__token_str
+        self._check_access_url = base_url + CHECK_ACCESS_BASE + self.__token_str
+        self.__root_url = base_url
 
         self.events_json = None
+        self.__local = threading.local()
+        self.__lock = threading.Lock()
+        self.__flights = SingleFlight()
 
-        if not self.valid_api:
+        if validate and not self.valid_api:
             raise Exception(f'Invalid Api Key: {self.api_key}')
 
     def __str__(self):
         return self.calendar_id
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Releases the pooled connections held by the calendar's transport"""
+        self._transport.close()
+
     @property
     def api_key(self):
         return self.__api_key
@@ -44,94 +134,451 @@ class Calendar:
     def calendar_id(self):
         return self.__calendar_id
 
+    @property
+    def transport(self):
+        return self._transport
+
+    @property
+    def cache(self):
+        return self._cache
+
+    @property
+    def metrics(self):
+        """MetricsRegistry of the calendar or None"""
+        return self._instrumentation.metrics
+
+    @property
+    def singleflight(self):
+        """SingleFlight coalescing the identical GETs of the calendar, ``singleflight.stats()`` counts the saved ones"""
+        return self.__flights
+
+    def _coalesced(self, key, call, fetch):
+        """
+        Runs fetch once for all the threads asking for key at the same time, marking call if it did not send. Threads
+        that did not run it get a shallow copy so the list or dict they receive is their own.
+        """
+        value, call.coalesced = self.__flights.do(key, fetch)
+        if call.coalesced and isinstance(value, (list, dict)):
+            value = type(value)(value)
+        return value
+
+    def add_hook(self, name, callback):
+        """
+        Registers a callback receiving a RequestInfo for every api call made by the calendar and its events.
+        ``before_request`` callbacks run before anything is sent, ``after_request`` callbacks once the result is built
+        or the call failed, with method, endpoint template, status, bytes and connect/wait/decode/construct times.
+
+        :param name: <str> ``before_request`` or ``after_request``
+        :param callback: callable taking the RequestInfo
+        """
+        self._instrumentation.add_hook(name, callback)
+
+    def remove_hook(self, name, callback):
+        self._instrumentation.remove_hook(name, callback)
+
+    def _cached(self, kind, key, fetch):
+        """Returns the cached value for (kind, key) or stores the result of fetch()"""
+        value = self._cache.get(kind, key)
+        if value is None:
+            value = fetch()
+            self._cache.set(kind, key, value)
+        return value
+
+    def _invalidate_event(self, event_id):
+        if self._cache is not None:
+            self._cache.invalidate('event', str(event_id))
+        self.__windows.clear()
+
+    @property
+    def _active_unit_of_work(self):
+        return getattr(self.__local, 'unit_of_work', None)
+
+    def _begin_unit_of_work(self, unit_of_work):
+        if self._active_unit_of_work is not None:
+            raise Exception('A unit of work is already active for this calendar in this thread')
+        self.__local.unit_of_work = unit_of_work
+
+    def _end_unit_of_work(self, unit_of_work):
+        if self._active_unit_of_work is unit_of_work:
+            self.__local.unit_of_work = None
+
+    def unit_of_work(self, max_workers=DEFAULT_MAX_WORKERS):
+        """
+        Returns a UnitOfWork to use as a context manager. Changes made through Event setters inside the block are
+        collected per event and flushed as concurrent PUTs when the block exits, see UnitOfWork.
+        :param max_workers: <int> maximum number of concurrent requests when flushing
+        """
+        return UnitOfWork(self, max_workers=max_workers)
+
     @property
     def valid_api(self):
-        """Makes a request to the calendar to see if the api is valid"""
+        """
+        Makes a request to the calendar to see if the api is valid, once per api key and process.
+        :raises: the retryable TeamUpError (RateLimited, ServerError) when the server could not answer, which says
+                 nothing about the key
+        """
         if not self.__valid_api:
-            req = requests.get(self._check_access_url)
-            try:
-                check_status_code(req.status_code)
-                self.__valid_api = True
-            except:
-                self.__valid_api = False
-            return self.__valid_api
+            self.__valid_api = _check_access(self._transport, self.__root_url, self.api_key, self._instrumentation)
+        return self.__valid_api
 
-        else:
-            return None
+    @classmethod
+    def validate_keys(cls, api_keys, base_url=BASE_URL, transport=None, max_workers=DEFAULT_MAX_WORKERS):
+        """
+        Checks many api keys concurrently ahead of time so Calendars constructed with them afterwards skip the round
+        trip. Keys already checked in this process are answered without a request.
+
+        :param api_keys: iterable of <str> api keys
+        :param base_url: <str> root of the api
+        :param transport: optional Transport to send the checks through, a temporary pooled one by default
+        :param max_workers: <int> maximum number of concurrent checks
+        :return: dict of api key to True (valid), False (rejected) or None when the key could not be checked because
+                 of server trouble or a connection error
+        """
+        api_keys = list(dict.fromkeys(api_keys))
+        instrumentation = Instrumentation()
+        owned = transport is None
+        if owned:
+            transport = Transport(pool_size=max_workers)
+        try:
+            results = {}
+            for position, valid, error in bounded_map(lambda key: _check_access(transport, base_url, key, instrumentation),
+                                                      api_keys, max_workers):
+                results[api_keys[position]] = bool(valid) if error is None else None
+            return results
+        finally:
+            if owned:
+                transport.close()
+
+    @staticmethod
+    def clear_validation_cache():
+        """Forgets every api key checked so far in this process"""
+        with _VALIDATED_KEYS_LOCK:
+            _VALIDATED_KEYS.clear()
+
+    def _fetch_configuration(self):
+        with self._instrumentation.call('GET', CONFIGURATION_ENDPOINT) as call:
+            def fetch():
+                logger.debug('Fetching configuration')
+                req = call.response(self._transport.get(self._base_url + CONFIGURATION_BASE + self.__token_str))
+                check_status_code(req.status_code, req)
+                with call.phase('decode'):
+                    return parse_configuration(req.content)
+            return self._coalesced(('configuration',), call, fetch)
+
+    def _fetch_subcalendars(self):
+        with self._instrumentation.call('GET', SUBCALENDARS_ENDPOINT) as call:
+            def fetch():
+                logger.debug('Fetching Subcalendars')
+                req = call.response(self._transport.get(self._subcalendars_url))
+                check_status_code(req.status_code, req)
+                with call.phase('decode'):
+                    return parse_subcalendars(req.content)
+            return self._coalesced(('subcalendars',), call, fetch)
 
     @property
     def configuration(self):
+        if self._cache is not None:
+            return self._cached('configuration', None, self._fetch_configuration)
         if self.__configuration is None:
-            print('Fetching configuration')
-            req = requests.get(self._base_url + CONFIGURATION_BASE + self.__token_str)
-            check_status_code(req.status_code)
-            self.__configuration = json.loads(req.text)['configuration']
+            self.__configuration = self._fetch_configuration()
         return self.__configuration
 
     @property
     def subcalendars(self):
-        if not self.__subcalendars:
-            print('Fetching Subcalendars')
-            req = requests.get(self._subcalendars_url)
-            check_status_code(req.status_code)
-            self.__subcalendars = json.loads(req.text)['subcalendars']
-        return self.__subcalendars
+        """List of the SubCalendar objects of the calendar, they also read as the dictionaries sent by the api"""
+        if self._cache is not None:
+            raw = self._cached('subcalendars', None, self._fetch_subcalendars)
+        else:
+            if not self.__subcalendars:
+                self.__subcalendars = self._fetch_subcalendars()
+            raw = self.__subcalendars
+        with self.__lock:
+            if raw is not self.__subcalendar_source:
+                self._index_subcalendars(raw)
+            return list(self.__subcalendars_by_id.values())
+
+    def _index_subcalendars(self, raw):
+        """Wraps the subcalendar dictionaries and indexes them by id and by name"""
+        by_id, by_name = {}, {}
+        for data in raw:
+            subcalendar = SubCalendar(self, data)
+            by_id[str(data['id'])] = subcalendar
+            if data.get('name') is not None:
+                by_name.setdefault(str(data['name']).casefold(), subcalendar)
+        self.__subcalendars_by_id, self.__subcalendars_by_name = by_id, by_name
+        self.__subcalendar_source = raw
+
+    def get_subcalendar(self, subcal_id=None, name=None):
+        """
+        Looks a subcalendar up by id or by name (case insensitive) in O(1). A subcal_id that is not an id is tried as a
+        name. When several subcalendars share a name the first one listed by the api is returned.
+
+        :param subcal_id: <str or int> id of the subcalendar
+        :param name: <str> name of the subcalendar
+        :return: SubCalendar, raises KeyError if there is none
+        """
+        if subcal_id is None and name is None:
+            raise ValueError('Pass the id or the name of the subcalendar')
+        self.subcalendars  # fetches and indexes the subcalendars if needed
+        if subcal_id is not None:
+            subcalendar = self.__subcalendars_by_id.get(str(subcal_id))
+            if subcalendar is not None:
+                return subcalendar
+            if name is None and isinstance(subcal_id, str):
+                name = subcal_id
+        if name is not None:
+            subcalendar = self.__subcalendars_by_name.get(name.casefold())
+            if subcalendar is not None:
+                return subcalendar
+        raise KeyError(f'No subcalendar {subcal_id if subcal_id is not None else name!r} in calendar {self.calendar_id}')
+
+    def subcalendar_events(self, subcal_ids=None, start_dt=None, end_dt=None, returnas='events', refresh=False):
+        """
+        Events of the given subcalendars between start_dt and end_dt, split per subcalendar. The window is fetched
+        once for the whole calendar and kept for SUBCALENDAR_VIEW_TTL seconds (or until an event is created, updated
+        or deleted through this calendar), so views of any number of subcalendars over the same window cost one
+        request. Events in several subcalendars are listed under each of them.
+
+        :param subcal_ids: optional id or list-like of subcalendar ids or SubCalendars, every subcalendar with events
+                           by default
+        :param start_dt: if set as None then set as today minus 30 days
+        :param end_dt:  if left as None then set as today plus 180 days
+        :param returnas: <str> `events` `dataframe` `dict` or `columnar`
+        :param refresh: <bool> fetch the window again instead of using the shared collection
+        :return: dict of subcalendar id (as passed) to the events of the subcalendar in the form given by returnas
+        """
+        if returnas not in ('events', 'dataframe', 'dict', 'columnar'):
+            raise TypeError('Returnas not recognized. Recognized values: events, dataframe, dict, columnar')
+        start_dt, end_dt = collection_range(start_dt, end_dt)
+        key = (to_date(start_dt).isoformat(), to_date(end_dt).isoformat())
+        groups = None if refresh else self.__windows.get('window', key)
+        if groups is None:
+            groups = {}
+            for event_dict in self._fetch_events(start_dt, end_dt):
+                for subcal_id in event_dict.get('subcalendar_ids') or ():
+                    groups.setdefault(str(subcal_id), []).append(event_dict)
+            self.__windows.set('window', key, groups)
+
+        if subcal_ids is None:
+            subcal_ids = list(groups)
+        elif isinstance(subcal_ids, (str, int, SubCalendar)):
+            subcal_ids = [subcal_ids]
+        views = {}
+        for subcal_id in subcal_ids:
+            if isinstance(subcal_id, SubCalendar):
+                subcal_id = subcal_id.subcalendar_id
+            # the groups stay cached for the next view, the caller gets its own list
+            views[subcal_id] = events_as(self, list(groups.get(str(subcal_id), ())), returnas, Event)
+        return views
 
     def clear_calendar_cache(self):
         self.__subcalendars = None
+        self.__subcalendar_source = None
         self.__configuration = None
+        self.__windows.clear()
+        if self._cache is not None:
+            self._cache.clear()
 
-    def get_event_collection(self, start_dt=None, end_dt=None, subcal_id=None, returnas='events', markdown=False):
+    def _event_url(self, event_id):
+        return self._base_url + EVENTS_BASE + f'/{event_id}' + self.__token_str
+
+    def get_event_collection(self, start_dt=None, end_dt=None, subcal_id=None, returnas='events', markdown=False,
+                             shard_days=None, subcal_batch_size=None, max_workers=DEFAULT_MAX_WORKERS,
+                             max_shard_events=None):
         """
         Method allows bulk fetching of events that fall between the provided time frame. If None is provided then
         the current date -30 and +180 days is used.
 
+        Passing shard_days and/or subcal_batch_size switches to sharded mode: the range is split into windows of
+        shard_days days and the subcalendar list into groups of subcal_batch_size ids, the shards are fetched
+        concurrently and the results merged without duplicates so the output holds the same events as a single call.
+
         :param start_dt: if set as None then set as today minus 30 days
         :param end_dt:  if left as None then set as today plus 180 days
         :param subcal_id: optional str or list-like if a different calendar should be queried
+        :param shard_days: <int> optional number of days per request window
+        :param subcal_batch_size: <int> optional number of subcalendar ids per request
+        :param max_workers: <int> maximum number of shards fetched at once
+        :param max_shard_events: <int> optional, windows returning at least this many events are split in half and
+                                 fetched again
         :return: json of events
         """
-        if returnas not in ('events', 'dataframe', 'dict'):
-            raise TypeError('Returnas not recognized. Recognized values: event, series, dict')
-
-        if start_dt is None:
-            start_dt = datetime.date.today() - datetime.timedelta(30)
-        if end_dt is None:
-            end_dt = datetime.date.today() + datetime.timedelta(180)
+        if returnas not in ('events', 'dataframe', 'dict', 'columnar'):
+            raise TypeError('Returnas not recognized. Recognized values: events, dataframe, dict, columnar')
+
+        # another thread may replace events_json meanwhile, the result is built from this call's own collection
+        if shard_days or subcal_batch_size:
+            self.events_json = events_json = self._fetch_sharded_events(start_dt, end_dt, subcal_id, markdown,
+                                                                        shard_days, subcal_batch_size, max_workers,
+                                                                        max_shard_events)
+            return events_as(self, events_json, returnas, Event)
+        with self._instrumentation.call('GET', EVENTS_ENDPOINT) as call:
+            self.events_json = events_json = self._fetch_events(start_dt, end_dt, subcal_id, markdown, call)
+            with call.phase('construct'):
+                return events_as(self, events_json, returnas, Event)
+
+    def iter_events(self, start_dt=None, end_dt=None, subcal_id=None, returnas='event', window_days=DEFAULT_WINDOW_DAYS,
+                    markdown=False):
+        """
+        Generator over the events between start_dt and end_dt that fetches the range one window at a time and yields
+        each event as it goes. Unlike get_event_collection nothing is kept on the calendar, so at most one window of
+        events is held in memory. Events spanning several windows are only yielded once.
 
-        subcal_par = ''
-        if subcal_id:
-            if isinstance(subcal_id, (list, tuple)):
-                for id in subcal_id:
-                    subcal_par += f'&subcalendarId[]={id}'
-            else:
-                subcal_par = f'&subcalendarId[]={subcal_id}'
+        :param start_dt: if set as None then set as today minus 30 days
+        :param end_dt:  if left as None then set as today plus 180 days
+        :param subcal_id: optional str or list-like if a different calendar should be queried
+        :param returnas: <str> `event` or `dict`
+        :param window_days: <int> number of days fetched per request
+        :return: generator of Event objects or dicts
+        """
+        if returnas not in ('event', 'dict'):
+            raise TypeError('Returnas not recognized. Recognized values: event, dict')
+
+        start_dt, end_dt = collection_range(start_dt, end_dt)
+        carried_ids = set()
+        for window_start, window_end in date_windows(start_dt, end_dt, window_days):
+            with self._instrumentation.call('GET', EVENTS_ENDPOINT) as call:
+                events_json = self._stream_events(window_start, window_end, subcal_id, markdown, call=call)
+                # only events running past this window can show up again in the next one
+                window_end_str = window_end.isoformat()
+                next_carried_ids = set()
+                for event_dict in events_json:
+                    event_id = event_dict['id']
+                    if (event_dict.get('end_dt') or '')[:10] > window_end_str:
+                        next_carried_ids.add(event_id)
+                    if event_id in carried_ids:
+                        continue
+                    if returnas == 'event':
+                        with call.phase('construct'):
+                            event_dict = Event(self, **event_dict)
+                    yield event_dict
+            carried_ids = next_carried_ids
+
+    def get_schedule(self, start_dt=None, end_dt=None, subcal_id=None, tz=datetime.timezone.utc):
+        """
+        Fetches a collection and returns it as a Schedule for overlap, conflict and free slot queries. The schedule
+        knows every subcalendar of the calendar (those of subcal_id when given), ones without events are free.
+        :param tz: <tzinfo> timezone assumed for naive datetimes, see Schedule
+        """
+        from pyteamup.Schedule import Schedule
+        if subcal_id is None:
+            subcal_ids = [subcal.subcalendar_id for subcal in self.subcalendars]
+        else:
+            subcal_ids = subcal_id if isinstance(subcal_id, (list, tuple)) else [subcal_id]
+        return Schedule(self.get_event_collection(start_dt, end_dt, subcal_id), tz=tz, subcalendar_ids=subcal_ids)
 
-        if markdown == True:
-            para_markdown = '&format[]=markdown'
+    def save_snapshot(self, path, events=None, metadata=None):
+        """
+        Writes events to a binary snapshot file, see pyteamup.Snapshot. The api key is not stored.
+        :param events: Events, event dicts or an EventTable, by default the last collection fetched by the calendar
+        :param metadata: <dict> optional JSON serializable values stored with the events
+        :return: <int> size of the file in bytes
+        """
+        from pyteamup.Snapshot import write_snapshot
+        if events is None:
+            if self.events_json is None:
+                raise ValueError('No events to save, fetch a collection first or pass events')
+            events = self.events_json
+        return write_snapshot(path, events, calendar_id=self.calendar_id, metadata=metadata)
+
+    def open_snapshot(self, path):
+        """Opens a snapshot file through a memory map with its events bound to this calendar"""
+        from pyteamup.Snapshot import Snapshot
+        return Snapshot.open(path, self)
+
+    def get_recurrences(self, start_dt=None, end_dt=None, subcal_id=None):
+        """
+        Fetches a collection once and returns a RecurrenceEngine answering later window queries on its recurring
+        series locally. Occurrences missing from or changed in the fetched range are kept as exceptions.
+        :param start_dt: if set as None then set as today minus 30 days
+        :param end_dt:  if left as None then set as today plus 180 days
+        """
+        from pyteamup.Recurrence import RecurrenceEngine
+        start_dt, end_dt = collection_range(start_dt, end_dt)
+        events_json = self.get_event_collection(start_dt, end_dt, subcal_id, returnas='dict')
+        # the api filters by whole days, endDate included
+        return RecurrenceEngine(events_json, to_date(start_dt), to_date(end_dt) + datetime.timedelta(days=1))
+
+    def _fetch_events(self, start_dt=None, end_dt=None, subcal_id=None, markdown=False, call=None):
+        """Single request for the event dictionaries of a collection, recorded on call or as a call of its own"""
+        if call is None:
+            with self._instrumentation.call('GET', EVENTS_ENDPOINT) as call:
+                return self._fetch_events(start_dt, end_dt, subcal_id, markdown, call)
+        parameters = collection_parameters(start_dt, end_dt, subcal_id, markdown)
+
+        def fetch():
+            req = call.response(self._transport.get(self._event_collection_url + parameters))
+            check_status_code(req.status_code, req)
+            with call.phase('decode'):
+                return parse_events(req.content)
+        return self._coalesced(('events', parameters), call, fetch)
+
+    def _stream_events(self, start_dt=None, end_dt=None, subcal_id=None, markdown=False, meta=None, call=None):
+        """
+        Generator decoding the events of a collection one at a time while the body is being downloaded.
+        :param meta: optional dict receiving the other top level values of the response
+        """
+        if call is None:
+            with self._instrumentation.call('GET', EVENTS_ENDPOINT) as call:
+                yield from self._stream_events(start_dt, end_dt, subcal_id, markdown, meta, call)
+            return
+        parameters = collection_parameters(start_dt, end_dt, subcal_id, markdown)
+        req = call.response(self._transport.get(self._event_collection_url + parameters, stream=True), streamed=True)
+        try:
+            check_status_code(req.status_code, req)
+            yield from call.timed(iter_json_array(req.iter_content(STREAM_CHUNK_SIZE), 'events', meta), 'decode')
+        finally:
+            req.close()
+
+    def _fetch_sharded_events(self, start_dt, end_dt, subcal_id, markdown, shard_days, subcal_batch_size,
+                              max_workers, max_shard_events):
+        """Fetches a collection as concurrent (window, subcalendar group) shards and merges them by event id"""
+        start_dt, end_dt = collection_range(start_dt, end_dt)
+        if shard_days:
+            windows = date_windows(start_dt, end_dt, shard_days)
         else:
-            para_markdown = ''
-            
-        parameters = f'&startDate={start_dt.strftime("%Y-%m-%d")}&endDate={end_dt.strftime("%Y-%m-%d")}' + subcal_par + para_markdown
-        req = requests.get(self._event_collection_url + parameters)
-        check_status_code(req.status_code)
-        self.events_json = json.loads(req.text)['events']
-
-        if returnas == 'events':
-            return [Event(self, **event_dict) for event_dict in self.events_json]
-        elif returnas == 'dataframe' and 'pandas' in sys.modules:
-            return pd.DataFrame.from_records(self.events_json)
+            windows = [(to_date(start_dt), to_date(end_dt))]
+        if subcal_batch_size and isinstance(subcal_id, (list, tuple)):
+            groups = chunked(subcal_id, subcal_batch_size)
         else:
-            return self.events_json
-
-    def _create_event_from_json(self, payload):
+            groups = [subcal_id]
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            pending = {}
+            for window in windows:
+                for group_idx, group in enumerate(groups):
+                    key = (window, group_idx)
+                    pending[pool.submit(self._fetch_events, window[0], window[1], group, markdown)] = key
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    window, group_idx = pending.pop(future)
+                    events = future.result()
+                    halves = split_window(window) if max_shard_events and len(events) >= max_shard_events else None
+                    if halves:
+                        for half in halves:
+                            future = pool.submit(self._fetch_events, half[0], half[1], groups[group_idx], markdown)
+                            pending[future] = (half, group_idx)
+                    else:
+                        results[(window, group_idx)] = events
+
+        merged = merge_unique_events(results[key] for key in sorted(results))
+        merged.sort(key=lambda event: event.get('start_dt') or '')
+        return merged
+
+    def _create_event_from_json(self, payload, call=None):
         """ Lazy Creation of Event by passing a formatted payload"""
-        resp = requests.post(self._event_collection_url, data=payload, headers=POST_HEADERS)
+        if call is None:
+            with self._instrumentation.call('POST', EVENTS_ENDPOINT) as call:
+                return self._create_event_from_json(payload, call)
+        call.sent(payload)
+        resp = call.response(self._transport.post(self._event_collection_url, data=payload, headers=POST_HEADERS))
         try:
-            check_status_code(resp.status_code)
+            check_status_code(resp.status_code, resp)
         except:
-            print(payload)
-            print(resp.text)
+            logger.error('Creating event failed with status %s: %s', resp.status_code, resp.text)
+            logger.debug('Rejected event payload: %s', payload)
             raise
         return resp.text
 
@@ -139,22 +586,63 @@ class Calendar:
         if returnas not in ('event', 'series', 'dict'):
             raise TypeError('Returnas not recognized. Recognized values: event, series, dict')
 
-        url = self._base_url + EVENTS_BASE + f'/{event_id}' + self.__token_str
-        resp = requests.get(url)
-        check_status_code(resp.status_code)
-        event_dict = json.loads(resp.text)['event']
-        if returnas == 'event':
-            return Event(self, **event_dict)
-        elif returnas == 'series' and 'pandas' in sys.modules:
-            return pd.Series(event_dict)
-        else:
-            return event_dict
+        if self._cache is not None:
+            event_dict = self._cached('event', str(event_id), lambda: self._fetch_event(event_id))
+            if returnas == 'dict':
+                event_dict = dict(event_dict)
+            return event_as(self, event_dict, returnas, Event)
+        with self._instrumentation.call('GET', EVENT_ENDPOINT) as call:
+            event_dict = self._fetch_event(event_id, call)
+            with call.phase('construct'):
+                return event_as(self, event_dict, returnas, Event)
+
+    def _fetch_event(self, event_id, call=None):
+        if call is None:
+            with self._instrumentation.call('GET', EVENT_ENDPOINT) as call:
+                return self._fetch_event(event_id, call)
+        def fetch():
+            resp = call.response(self._transport.get(self._event_url(event_id)))
+            check_status_code(resp.status_code, resp)
+            with call.phase('decode'):
+                return parse_event(resp.content)[0]
+        return self._coalesced(('event', str(event_id)), call, fetch)
+
+    def search_events(self, query, start_dt=None, end_dt=None, subcal_id=None, returnas='events', markdown=False):
+        """
+        Events between start_dt and end_dt matching a text search, answered by the api. The collection of the
+        calendar (events_json) is left as it is. For repeated searches over the same range see search_index.
 
-    def get_subcalendar(self):
-        raise NotImplementedError
+        :param query: <str> text searched in the title, notes, location and who of the events
+        :param start_dt: if set as None then set as today minus 30 days
+        :param end_dt:  if left as None then set as today plus 180 days
+        :param subcal_id: optional str or list-like if a different calendar should be queried
+        :param returnas: <str> `events` `dataframe` `dict` or `columnar`
+        :return: matching events in the form given by returnas
+        """
+        if returnas not in ('events', 'dataframe', 'dict', 'columnar'):
+            raise TypeError('Returnas not recognized. Recognized values: events, dataframe, dict, columnar')
+        parameters = collection_parameters(start_dt, end_dt, subcal_id, markdown, query=query)
+        with self._instrumentation.call('GET', EVENTS_ENDPOINT) as call:
+            req = call.response(self._transport.get(self._event_collection_url + parameters))
+            check_status_code(req.status_code, req)
+            with call.phase('decode'):
+                events_json = parse_events(req.content)
+            with call.phase('construct'):
+                return events_as(self, events_json, returnas, Event)
+
+    def search_index(self, start_dt=None, end_dt=None, subcal_id=None, fields=None, returnas='events'):
+        """
+        Fetches a collection once and returns a SearchIndex over it, answering later text searches locally. Keep it
+        current with SearchIndex.apply_changes and the output of get_changed_events or a ChangeWatcher.
 
-    def search_events(self):
-        raise NotImplementedError
+        :param fields: optional names of the text fields indexed, title, notes, location and who by default
+        :param returnas: <str> `events` or `dict`, the form of the indexed and returned events
+        """
+        from pyteamup.utils.search import SearchIndex, SEARCH_FIELDS
+        if returnas not in ('events', 'dict'):
+            raise TypeError('Returnas not recognized. Recognized values: events, dict')
+        return SearchIndex(self.get_event_collection(start_dt, end_dt, subcal_id, returnas=returnas),
+                           fields or SEARCH_FIELDS)
 
     def get_changed_events(self, modified_since, returnas='event'):
         """
@@ -165,18 +653,22 @@ class Calendar:
         """
         if returnas not in ('event', 'series', 'dict'):
             raise TypeError('Returnas not recognized. Recognized values: event, series, dict')
-        url = self._base_url + EVENTS_BASE + self.__token_str + '&modifiedSince=' + str(modified_since)
-        resp = requests.get(url)
-        check_status_code(resp.status_code)
-        events_json = json.loads(resp.text)['events']
-        timestamp = json.loads(resp.text)['timestamp']
-
-        if returnas == 'events':
-            return [Event(self, **event_dict) for event_dict in events_json], timestamp
-        elif returnas == 'dataframe' and 'pandas' in sys.modules:
-            return pd.DataFrame.from_records(events_json), timestamp
-        else:
-            return events_json, timestamp
+        url = self._event_collection_url + '&modifiedSince=' + str(modified_since)
+        with self._instrumentation.call('GET', EVENTS_ENDPOINT) as call:
+            resp = call.response(self._transport.get(url))
+            check_status_code(resp.status_code, resp)
+            with call.phase('decode'):
+                events_json, timestamp = parse_changed_events(resp.content)
+            with call.phase('construct'):
+                return events_as(self, events_json, returnas, Event), timestamp
+
+    def watch(self, **kwargs):
+        """
+        Returns a ChangeWatcher polling this calendar's changes in the background, see ChangeWatcher for the
+        arguments. Subscribe callbacks, then start it.
+        """
+        from pyteamup.ChangeWatcher import ChangeWatcher
+        return ChangeWatcher(self, **kwargs)
 
     def new_event(self, title, start_dt, end_dt, subcalendar_ids, all_day=False,
                   notes=None, location=None, who=None, remote_id=None, returnas='event'):
@@ -199,37 +691,84 @@ class Calendar:
         """
         if returnas not in ('event','dict','series'):
             raise ValueError(f'Unrecognized returnas paramter: {returnas}')
-        if not isinstance(start_dt, datetime.datetime) or not isinstance(end_dt, datetime.datetime):
+        payload = new_event_payload(title, start_dt, end_dt, subcalendar_ids, all_day=all_day, notes=notes,
+                                    location=location, who=who, remote_id=remote_id)
+
+        with self._instrumentation.call('POST', EVENTS_ENDPOINT) as call:
+            resp_text = self._create_event_from_json(json.dumps(payload), call)
+            with call.phase('decode'):
+                event_dict, undo_id = parse_event(resp_text)
+            self._invalidate_event(event_dict['id'])
+            with call.phase('construct'):
+                return event_as(self, event_dict, returnas, Event, undo_id=undo_id)
+
+    def new_events(self, specs, max_workers=DEFAULT_MAX_WORKERS, returnas='event'):
+        """
+        Creates many events concurrently. Every spec is validated and serialized before anything is sent, then the
+        payloads are posted with at most max_workers requests in flight. A failing item does not stop the others.
+
+        :param specs: iterable of dicts of new_event keyword arguments (title, start_dt, end_dt, subcalendar_ids, ...)
+        :param max_workers: <int> maximum number of concurrent requests
+        :param returnas: <str> `event` `series` `dict` are valid options
+        :return: list of BulkResult(index, ok, result, undo_id, error) in the order of specs
+        """
+        if returnas not in ('event', 'dict', 'series'):
+            raise ValueError(f'Unrecognized returnas paramter: {returnas}')
+
+        results = []
+        prepared = []
+        for index, spec in enumerate(specs):
+            results.append(None)
             try:
-                start_dt = to_datetime(start_dt)
-                end_dt = to_datetime(end_dt)
-            except:
-                raise ValueError('Parse failed, please pass all dates as a datetime object')
-        if isinstance(subcalendar_ids, (str, int)):
-            subcalendar_ids = [subcalendar_ids]
-        if not isinstance(subcalendar_ids, (tuple, list)):
-            raise ValueError(f'Unrecognized Type: Subcalendar_ids type: {type(subcalendar_ids)}')
-
-        dict = {'remote_id': remote_id,
-                'title': title,
-                'subcalendar_ids': subcalendar_ids,
-                'start_dt': format_date(start_dt),
-                'end_dt': format_date(end_dt),
-                'all_day': all_day,
-                'notes': notes,
-                'location': location,
-                'who': who
-                }
-
-        resp_text = self._create_event_from_json(json.dumps(dict))
-        resp_dict = json.loads(resp_text)
-        event_dict = resp_dict['event']
-        undo_id = resp_dict['undo_id']
-
-        if returnas == 'event':
-            return Event(self, undo_id = undo_id, **event_dict)
-        elif returnas == 'series' and 'pandas' in sys.modules:
-            return pd.Series(event_dict)
-        else:
-            return event_dict
+                prepared.append((index, json.dumps(new_event_payload(**spec))))
+            except Exception as error:
+                results[index] = BulkResult(index, False, None, None, error)
+
+        def post(item):
+            with self._instrumentation.call('POST', EVENTS_ENDPOINT) as call:
+                call.sent(item[1])
+                resp = call.response(self._transport.post(self._event_collection_url, data=item[1],
+                                                          headers=POST_HEADERS))
+                check_status_code(resp.status_code, resp)
+                with call.phase('decode'):
+                    return parse_event(resp.content)
+
+        for position, value, error in bounded_map(post, prepared, max_workers):
+            index = prepared[position][0]
+            if error is not None:
+                results[index] = BulkResult(index, False, None, None, error)
+            else:
+                event_dict, undo_id = value
+                results[index] = BulkResult(index, True, event_as(self, event_dict, returnas, Event, undo_id=undo_id),
+                                            undo_id, None)
+        if any(result.ok for result in results):
+            self.__windows.clear()
+        return results
+
+    def reconcile(self, desired_events, start_dt=None, end_dt=None, subcal_id=None, dry_run=False,
+                  delete_missing=True, fields=None, max_workers=DEFAULT_MAX_WORKERS):
+        """
+        Brings the events between start_dt and end_dt in line with desired_events, matched on remote_id. The window is
+        fetched once, each desired event is compared field by field with the current one, and only the events that
+        differ are sent: creates for new remote_ids, one update per changed event carrying all of its changed fields,
+        and deletes for managed events no longer desired. The requests are sent concurrently.
+
+        Events without a remote_id and recurring events are never touched. The window should cover every desired
+        event, a desired event outside of it is not found and would be created again.
 
+        :param desired_events: iterable of dicts of new_event keyword arguments, each with a remote_id
+        :param start_dt: if set as None then set as today minus 30 days
+        :param end_dt:  if left as None then set as today plus 180 days
+        :param subcal_id: optional str or list-like to limit the events fetched, and so deleted, to some subcalendars
+        :param dry_run: <bool> only compute the plan, nothing is sent
+        :param delete_missing: <bool> delete managed events of the window whose remote_id is not desired
+        :param fields: optional subset of RECONCILE_FIELDS to compare, all of them by default
+        :param max_workers: <int> maximum number of concurrent requests
+        :return: ReconcileReport
+        """
+        from pyteamup import Reconcile
+        current = self.get_event_collection(start_dt, end_dt, subcal_id, returnas='events')
+        report = Reconcile.plan(current, desired_events, fields or Reconcile.RECONCILE_FIELDS, delete_missing)
+        if dry_run:
+            return report
+        return Reconcile.apply(self, report, max_workers)
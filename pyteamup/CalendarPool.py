@@ -0,0 +1,244 @@
+"""Many calendars managed together: shared connections, concurrent key checks and fair fan-out requests"""
+
+import logging
+from collections import namedtuple, OrderedDict
+
+from pyteamup.utils.utilities import *
+from pyteamup.utils.constants import *
+from pyteamup.utils.transport import Transport
+from pyteamup.utils.responses import collection_range, events_as
+from pyteamup.utils.ratelimit import TokenBucket
+from pyteamup.utils.bulk import fair_map
+from pyteamup.utils.metrics import MetricsRegistry
+from pyteamup.Calendar import Calendar
+from pyteamup.Event import Event
+
+logger = logging.getLogger(__name__)
+
+PoolResult = namedtuple('PoolResult', ['calendar_id', 'ok', 'result', 'error'])
+PoolResult.__doc__ = """Outcome of one request of a fan-out operation. ``result`` holds the returned value when ``ok``
+and ``error`` the raised exception otherwise."""
+
+
+class CalendarPool:
+    """
+    Holds many calendars, each with its own key, that send their requests through one pool of keep-alive
+    connections. The keys are checked concurrently when the pool is built. Fan-out operations send one request per
+    calendar (or per window of a calendar) on a thread pool, taking work from the calendars in turn with at most
+    ``per_calendar`` requests of one calendar in flight, and yield PoolResults tagged with the calendar id as they
+    complete.
+
+        with CalendarPool({cal_a: key_a, cal_b: key_b}, max_workers=16) as pool:
+            for result in pool.iter_event_collections(start, end, window_days=30):
+                if result.ok:
+                    store(result.calendar_id, result.result)
+
+    Every calendar gets its own Transport over the shared session, so retries and the optional per key rate limit
+    apply per calendar, and closing one calendar leaves the pool open.
+
+    :param calendars: dict of calendar key to api key, or an iterable of (calendar key, api key) pairs
+    :param base_url: <str> root of the api
+    :param max_workers: <int> maximum number of requests in flight across all calendars
+    :param per_calendar: <int> maximum number of requests of one calendar in flight during fan-out operations
+    :param pool_size: <int> number of keep-alive connections, max_workers by default
+    :param validate: <bool> check every key while building the pool. Calendars with invalid keys are left out and
+                     listed in ``invalid``, those whose check failed for server trouble are kept and checked again on
+                     first use. With False no request is made until a calendar is used.
+    :param rate: <float> optional requests per second allowed per api key, with bursts of up to ``burst``
+    :param retry: RetryPolicy of every calendar
+    :param metrics: optional MetricsRegistry shared by every calendar, pass True for a new one
+    :param calendar_kwargs: other Calendar arguments (headers, timeout, cache, ...) given to every calendar
+    """
+    def __init__(self, calendars, base_url=BASE_URL, max_workers=DEFAULT_MAX_WORKERS,
+                 per_calendar=DEFAULT_PER_CALENDAR_WORKERS, pool_size=None, validate=True, rate=None, burst=None,
+                 retry=None, metrics=None, timeout=DEFAULT_TIMEOUT, headers=None, **calendar_kwargs):
+        keys = OrderedDict(calendars.items() if isinstance(calendars, dict) else calendars)
+        self.base_url = base_url
+        self.max_workers = max_workers
+        self.per_calendar = per_calendar
+        self.rate = rate
+        self.burst = burst
+        self.retry = retry
+        self._metrics = MetricsRegistry() if metrics is True else (metrics or None)
+        self._calendar_kwargs = calendar_kwargs
+        self._transport = Transport(pool_size=pool_size or max(max_workers, 1), timeout=timeout, headers=headers,
+                                    retry=retry)
+        self.__calendars = OrderedDict()
+        self.__invalid = OrderedDict()
+
+        if validate:
+            checked = Calendar.validate_keys(keys.values(), base_url=base_url, transport=self._transport,
+                                             max_workers=max_workers)
+        for cal_id, api_key in keys.items():
+            if validate and checked[api_key] is False:
+                logger.warning('Invalid api key for calendar %s, left out of the pool', cal_id)
+                self.__invalid[cal_id] = api_key
+                continue
+            if validate and checked[api_key] is None:
+                logger.warning('Api key of calendar %s could not be checked, it is checked again on first use', cal_id)
+            self.__calendars[cal_id] = self._new_calendar(cal_id, api_key)
+
+    def _new_calendar(self, cal_id, api_key):
+        rate_limiter = TokenBucket(self.rate, self.burst) if self.rate else None
+        transport = Transport(session=self._transport.session, timeout=self._transport.timeout, retry=self.retry,
+                              rate_limiter=rate_limiter)
+        return Calendar(cal_id, api_key, transport=transport, base_url=self.base_url, validate=False,
+                        metrics=self._metrics, **self._calendar_kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return len(self.__calendars)
+
+    def __iter__(self):
+        return iter(self.__calendars.values())
+
+    def __contains__(self, cal_id):
+        return cal_id in self.__calendars
+
+    def __getitem__(self, cal_id):
+        return self.__calendars[cal_id]
+
+    def close(self):
+        """Closes the shared connections"""
+        self._transport.close()
+
+    @property
+    def calendars(self):
+        """dict of calendar key to Calendar"""
+        return OrderedDict(self.__calendars)
+
+    @property
+    def invalid(self):
+        """dict of calendar key to api key of the calendars left out because their key was rejected"""
+        return OrderedDict(self.__invalid)
+
+    @property
+    def transport(self):
+        return self._transport
+
+    @property
+    def metrics(self):
+        """MetricsRegistry shared by the calendars of the pool or None"""
+        return self._metrics
+
+    def add(self, cal_id, api_key, validate=True):
+        """
+        Adds a calendar to the pool, sharing its connections.
+        :return: the new Calendar
+        :raises: Exception if validate is set and the key is rejected, the retryable TeamUpError if the server could not
+                 answer the check
+        """
+        calendar = self._new_calendar(cal_id, api_key)
+        if validate and not calendar.valid_api:
+            raise Exception(f'Invalid Api Key: {api_key}')
+        self.__calendars[cal_id] = calendar
+        return calendar
+
+    def remove(self, cal_id):
+        """Takes a calendar out of the pool and returns it"""
+        return self.__calendars.pop(cal_id)
+
+    def _selected(self, calendar_ids):
+        if calendar_ids is None:
+            return list(self.__calendars.values())
+        return [self.__calendars[cal_id] for cal_id in calendar_ids]
+
+    def map(self, fn, calendar_ids=None):
+        """
+        Calls fn(calendar) for every calendar concurrently.
+        :param fn: callable taking a Calendar
+        :param calendar_ids: optional iterable of calendar keys, every calendar of the pool by default
+        :return: generator of PoolResult in completion order
+        """
+        queues = OrderedDict((calendar.calendar_id, [calendar]) for calendar in self._selected(calendar_ids))
+        for cal_id, _, value, error in fair_map(fn, queues, self.max_workers, self.per_calendar):
+            yield PoolResult(cal_id, error is None, value, error)
+
+    def iter_event_collections(self, start_dt=None, end_dt=None, subcal_id=None, returnas='events', markdown=False,
+                               window_days=None, calendar_ids=None):
+        """
+        Fetches the events between start_dt and end_dt of every calendar concurrently and yields each response as soon
+        as it arrives, tagged with its calendar id. With window_days the range of every calendar is split into windows
+        fetched as separate requests, so calendars with many events do not hold up the others. Each event is only
+        yielded once per calendar even when it spans several windows.
+
+        :param start_dt: if set as None then set as today minus 30 days
+        :param end_dt:  if left as None then set as today plus 180 days
+        :param subcal_id: optional subcalendar id or list of ids, applied to every calendar
+        :param returnas: <str> `events` `dict` `columnar` `dataframe`
+        :param window_days: <int> optional number of days per request
+        :param calendar_ids: optional iterable of calendar keys, every calendar of the pool by default
+        :return: generator of PoolResult(calendar_id, ok, events, error), one per response
+        """
+        if returnas not in ('events', 'dataframe', 'dict', 'columnar'):
+            raise TypeError('Returnas not recognized. Recognized values: events, dataframe, dict, columnar')
+
+        start_dt, end_dt = collection_range(start_dt, end_dt)
+        if window_days:
+            windows = date_windows(start_dt, end_dt, window_days)
+        else:
+            windows = [(to_date(start_dt), to_date(end_dt))]
+        calendars = self._selected(calendar_ids)
+        queues = OrderedDict((calendar.calendar_id, [(calendar, window) for window in windows])
+                             for calendar in calendars)
+        # ids of the events seen crossing a window boundary, the only ones another window can return again
+        crossing = {calendar.calendar_id: set() for calendar in calendars}
+
+        def fetch(task):
+            calendar, window = task
+            return calendar._fetch_events(window[0], window[1], subcal_id, markdown)
+
+        for cal_id, (calendar, window), events_json, error in fair_map(fetch, queues, self.max_workers,
+                                                                       self.per_calendar):
+            if error is not None:
+                yield PoolResult(cal_id, False, None, error)
+                continue
+            if len(windows) > 1:
+                events_json = self._unseen(events_json, window, crossing[cal_id])
+            yield PoolResult(cal_id, True, events_as(calendar, events_json, returnas, Event), None)
+
+    @staticmethod
+    def _unseen(events_json, window, crossing):
+        window_start, window_end = window[0].isoformat(), window[1].isoformat()
+        unseen = []
+        for event_dict in events_json:
+            if ((event_dict.get('start_dt') or '')[:10] < window_start or
+                    (event_dict.get('end_dt') or '')[:10] > window_end):
+                if event_dict['id'] in crossing:
+                    continue
+                crossing.add(event_dict['id'])
+            unseen.append(event_dict)
+        return unseen
+
+    def get_event_collections(self, start_dt=None, end_dt=None, subcal_id=None, returnas='events', markdown=False,
+                              window_days=None, calendar_ids=None):
+        """
+        Collects iter_event_collections into a dict of calendar key to the list of its events. The first failed
+        request is raised once every other request has finished.
+        """
+        if returnas not in ('events', 'dict'):
+            raise TypeError('Returnas not recognized. Recognized values: events, dict')
+        collected = OrderedDict((calendar.calendar_id, []) for calendar in self._selected(calendar_ids))
+        error = None
+        for result in self.iter_event_collections(start_dt, end_dt, subcal_id, returnas, markdown, window_days,
+                                                  calendar_ids):
+            if result.ok:
+                collected[result.calendar_id].extend(result.result)
+            elif error is None:
+                error = result.error
+        if error is not None:
+            raise error
+        return collected
+
+    def get_changed_events(self, modified_since, returnas='event', calendar_ids=None):
+        """
+        Calls get_changed_events on every calendar concurrently.
+        :param modified_since: <int> Unix timestamp, must be less than 30 days old
+        :return: generator of PoolResult(calendar_id, ok, (events, timestamp), error) in completion order
+        """
+        return self.map(lambda calendar: calendar.get_changed_events(modified_since, returnas), calendar_ids)
@@ -0,0 +1,395 @@
+"""Background watcher turning modifiedSince deltas into created/updated/deleted callbacks"""
+
+import inspect
+import logging
+import threading
+import time
+from collections import namedtuple, OrderedDict
+
+from pyteamup.utils.utilities import *
+from pyteamup.utils.constants import *
+from pyteamup.utils.responses import event_as
+from pyteamup.Event import Event
+
+logger = logging.getLogger(__name__)
+
+CREATED, UPDATED, DELETED = 'created', 'updated', 'deleted'
+KINDS = (CREATED, UPDATED, DELETED)
+
+Change = namedtuple('Change', ['kind', 'event_id', 'event', 'subcalendar_ids'])
+Change.__doc__ = """One notification of a ChangeWatcher. ``event`` is the latest state of the event (an Event, or a dict
+with returnas='dict') and ``subcalendar_ids`` the subcalendars it is in or was in before the change."""
+
+_Subscription = namedtuple('_Subscription', ['callback', 'kinds', 'subcalendar_ids'])
+
+
+def _merge(previous, kind):
+    """Kind of two changes of one event collapsed into one notification, None if they cancel out"""
+    if previous == CREATED:
+        return None if kind == DELETED else CREATED
+    if previous == DELETED:
+        return DELETED if kind == DELETED else UPDATED
+    return DELETED if kind == DELETED else UPDATED
+
+
+class ChangeWatcher:
+    """
+    Polls ``Calendar.get_changed_events`` from a background thread and calls subscribers with a Change for every
+    created, updated and deleted event.
+
+    The interval follows the observed change rate: it shrinks towards ``min_interval`` while changes keep coming in
+    (aiming for about ``target_changes`` changes per poll) and grows towards ``max_interval`` while the calendar is
+    quiet. Failed polls back off exponentially. Changes to one event are held until it has been quiet for ``settle``
+    seconds (at most ``max_delay``), so a burst of edits produces one notification with the final state, and an
+    event created and deleted within the burst produces none.
+
+        watcher = calendar.watch(min_interval=5, max_interval=300)
+        watcher.subscribe(print, kinds=('created', 'deleted'), subcalendar_ids=[subcal_id])
+        watcher.start()
+        ...
+        watcher.stop()
+
+    Callbacks run on the watcher thread, exceptions they raise are logged.
+
+    :param calendar: Calendar to watch
+    :param since: <int> optional unix timestamp to report changes from, default now
+    :param min_interval: <float> shortest number of seconds between polls
+    :param max_interval: <float> longest number of seconds between polls
+    :param settle: <float> seconds an event has to stay unchanged before its change is dispatched, 0 to dispatch
+                   after every poll
+    :param max_delay: <float> longest number of seconds a change is held back by ``settle``
+    :param target_changes: <float> number of changes per poll the interval is tuned for
+    :param returnas: <str> `event` or `dict`, type of ``Change.event``
+    :param on_error: optional callable receiving the exception of a failed poll, failures are logged otherwise
+    :param max_tracked: <int> number of event versions remembered to tell updates from creations and skip repeats
+    """
+    _event_class = Event
+
+    def __init__(self, calendar, since=None, min_interval=WATCH_MIN_INTERVAL, max_interval=WATCH_MAX_INTERVAL,
+                 settle=WATCH_SETTLE, max_delay=None, target_changes=1.0, returnas='event', on_error=None,
+                 max_tracked=WATCH_MAX_TRACKED):
+        if returnas not in ('event', 'dict'):
+            raise TypeError('Returnas not recognized. Recognized values: event, dict')
+        if min_interval <= 0 or max_interval < min_interval:
+            raise ValueError('Expected 0 < min_interval <= max_interval')
+        self.calendar = calendar
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.settle = settle
+        self.max_delay = max_delay if max_delay is not None else max(settle * 10, min_interval)
+        self.target_changes = target_changes
+        self.returnas = returnas
+        self.on_error = on_error
+        self.max_tracked = max_tracked
+        self.smoothing = 0.3
+
+        self.timestamp = int(since if since is not None else time.time())
+        self.interval = min_interval
+        self.rate = None
+        self.polls = 0
+        self.errors = 0
+        self.dispatched = 0
+
+        self._subscriptions = []
+        self._known = OrderedDict()
+        self._pending = OrderedDict()
+        self._last_poll = None
+        self._next_poll = time.monotonic()
+        self._failures = 0
+        self._thread = None
+        self._stopping = threading.Event()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def pending(self):
+        """Number of changes held back until their event settles"""
+        return len(self._pending)
+
+    def subscribe(self, callback, kinds=KINDS, subcalendar_ids=None):
+        """
+        Registers a callback receiving a Change.
+        :param callback: callable taking a Change
+        :param kinds: iterable of `created` `updated` `deleted`, all by default
+        :param subcalendar_ids: optional subcalendar id or list of ids, only changes of events in (or moved out of)
+                                one of them are passed on
+        :return: the callback
+        """
+        kinds = frozenset([kinds] if isinstance(kinds, str) else kinds)
+        unknown = kinds - set(KINDS)
+        if unknown:
+            raise ValueError(f'Unknown change kinds {", ".join(sorted(unknown))}, expected: {", ".join(KINDS)}')
+        if subcalendar_ids is not None:
+            if isinstance(subcalendar_ids, (str, int)):
+                subcalendar_ids = [subcalendar_ids]
+            subcalendar_ids = frozenset(str(s) for s in subcalendar_ids)
+        # copied on write so the watcher thread iterates over a stable list
+        self._subscriptions = self._subscriptions + [_Subscription(callback, kinds, subcalendar_ids)]
+        return callback
+
+    def unsubscribe(self, callback):
+        self._subscriptions = [s for s in self._subscriptions if s.callback is not callback]
+
+    def start(self):
+        """Starts polling from a daemon thread"""
+        if self.running:
+            raise RuntimeError('The watcher is already running')
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name=f'pyteamup-watcher-{self.calendar.calendar_id}',
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, flush=True, timeout=None):
+        """
+        Stops the thread, waiting for a poll in progress to finish.
+        :param flush: <bool> dispatch the changes still held back instead of dropping them
+        :param timeout: <float> optional number of seconds to wait for the thread
+        """
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if flush:
+            self._flush(force=True)
+        else:
+            self._pending.clear()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            if time.monotonic() >= self._next_poll:
+                self.poll()
+            else:
+                self._flush()
+            self._stopping.wait(self._delay())
+
+    def _delay(self):
+        """Seconds until the next poll or the next held back change to dispatch"""
+        wake = self._next_poll
+        for _, _, first, last, _ in self._pending.values():
+            wake = min(wake, last + self.settle, first + self.max_delay)
+        return max(0.0, wake - time.monotonic())
+
+    def poll(self):
+        """
+        Fetches the changes since the last poll and dispatches those that settled. Called by the thread, can be called
+        directly to drive the watcher without one.
+        :return: <int> number of new changes received
+        """
+        since = self._since()
+        try:
+            events_json, timestamp = self.calendar.get_changed_events(since, returnas='dict')
+        except Exception as error:
+            self._failed(error)
+            return 0
+        changes = self._received(events_json, since, timestamp)
+        self._flush()
+        return changes
+
+    def _since(self):
+        if time.time() - self.timestamp >= MODIFIED_SINCE_MAX_AGE:
+            logger.warning('Changes of calendar %s since %s are too old for the api, watching from now on',
+                           self.calendar.calendar_id, self.timestamp)
+            self.timestamp = int(time.time())
+        return self.timestamp
+
+    def _failed(self, error):
+        self.errors += 1
+        self._failures += 1
+        self.interval = min(self.max_interval, self.min_interval * 2 ** self._failures)
+        self._next_poll = time.monotonic() + self.interval
+        if self.on_error is not None:
+            self.on_error(error)
+        else:
+            logger.warning('Polling changes of calendar %s failed: %r', self.calendar.calendar_id, error)
+
+    def _received(self, events_json, since, timestamp):
+        now = time.monotonic()
+        changes = 0
+        for event_dict in events_json:
+            changes += self._ingest(event_dict, since, now)
+        elapsed = now - self._last_poll if self._last_poll is not None else self.interval
+        self._adapt(changes, elapsed)
+        self.polls += 1
+        self._failures = 0
+        self._last_poll = now
+        self._next_poll = now + self.interval
+        self.timestamp = timestamp
+        return changes
+
+    def _adapt(self, changes, elapsed):
+        observed = changes / max(elapsed, 1e-3)
+        self.rate = observed if self.rate is None else self.smoothing * observed + (1 - self.smoothing) * self.rate
+        interval = self.target_changes / self.rate if self.rate > 0 else self.max_interval
+        self.interval = min(self.max_interval, max(self.min_interval, interval))
+
+    def _ingest(self, event_dict, since, now):
+        """Classifies one changed event and merges it into the pending changes, returns 0 for repeats"""
+        event_id = str(event_dict['id'])
+        deleted = bool(event_dict.get('delete_dt'))
+        version = event_dict.get('version')
+        known = self._known.get(event_id)
+        if known is not None and known[0] == version and known[1] == deleted:
+            return 0
+        subcalendar_ids = frozenset(str(s) for s in event_dict.get('subcalendar_ids') or ())
+        if deleted:
+            kind = DELETED
+        elif known is not None:
+            kind = CREATED if known[1] else UPDATED
+        else:
+            created = epoch_seconds(event_dict.get('creation_dt'))
+            kind = CREATED if created is not None and created >= since else UPDATED
+
+        self._known[event_id] = (version, deleted, subcalendar_ids)
+        self._known.move_to_end(event_id)
+        while len(self._known) > self.max_tracked:
+            self._known.popitem(last=False)
+
+        if known is not None:
+            subcalendar_ids = subcalendar_ids | known[2]
+        pending = self._pending.get(event_id)
+        if pending is None:
+            self._pending[event_id] = [kind, event_dict, now, now, subcalendar_ids]
+            return 1
+        kind = _merge(pending[0], kind)
+        if kind is None:
+            del self._pending[event_id]
+        else:
+            pending[0], pending[1], pending[3], pending[4] = kind, event_dict, now, pending[4] | subcalendar_ids
+            self._pending.move_to_end(event_id)
+        return 1
+
+    def _settled(self, force=False):
+        """Takes the pending changes ready to be dispatched"""
+        now = time.monotonic()
+        ready = []
+        for event_id, (kind, event_dict, first, last, subcalendar_ids) in list(self._pending.items()):
+            if force or now - last >= self.settle or now - first >= self.max_delay:
+                del self._pending[event_id]
+                ready.append((kind, event_id, event_dict, subcalendar_ids))
+        return ready
+
+    def _changes(self, force=False):
+        """Changes to dispatch with the subscriptions interested in each"""
+        for kind, event_id, event_dict, subcalendar_ids in self._settled(force):
+            subscriptions = [s for s in self._subscriptions if kind in s.kinds and
+                             (s.subcalendar_ids is None or s.subcalendar_ids & subcalendar_ids)]
+            if not subscriptions:
+                continue
+            event = event_as(self.calendar, event_dict, self.returnas, self._event_class)
+            yield Change(kind, event_id, event, subcalendar_ids), subscriptions
+
+    def _flush(self, force=False):
+        for change, subscriptions in self._changes(force):
+            self.dispatched += 1
+            for subscription in subscriptions:
+                try:
+                    subscription.callback(change)
+                except Exception:
+                    logger.exception('Change callback %r failed', subscription.callback)
+
+
+class AsyncChangeWatcher(ChangeWatcher):
+    """
+    ChangeWatcher running as an asyncio task. Works with an AsyncCalendar, or with a Calendar whose requests are then
+    sent from the default executor. Callbacks may be coroutine functions, they are awaited in turn.
+
+        watcher = calendar.watch()
+        watcher.subscribe(on_change)
+        await watcher.start()
+        ...
+        await watcher.stop()
+    """
+    def __init__(self, calendar, *args, **kwargs):
+        super().__init__(calendar, *args, **kwargs)
+        from pyteamup.AsyncEvent import AsyncEvent
+        if inspect.iscoroutinefunction(getattr(calendar, 'get_changed_events', None)):
+            self._event_class = AsyncEvent
+        self._task = None
+        self._wakeup = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
+
+    def __enter__(self):
+        raise TypeError('Use "async with" with an AsyncChangeWatcher')
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        """Starts polling from a task of the running loop"""
+        import asyncio
+        if self.running:
+            raise RuntimeError('The watcher is already running')
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.ensure_future(self._run_async())
+        return self
+
+    async def stop(self, flush=True, timeout=None):
+        """Stops the task, waiting for a poll in progress to finish, see ChangeWatcher.stop"""
+        import asyncio
+        if self._task is not None:
+            self._wakeup.set()
+            try:
+                await asyncio.wait_for(self._task, timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._task = None
+        if flush:
+            await self._flush_async(force=True)
+        else:
+            self._pending.clear()
+
+    async def _run_async(self):
+        import asyncio
+        while not self._wakeup.is_set():
+            if time.monotonic() >= self._next_poll:
+                await self.poll()
+            else:
+                await self._flush_async()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._delay())
+            except asyncio.TimeoutError:
+                pass
+
+    async def poll(self):
+        """Coroutine version of ChangeWatcher.poll"""
+        import asyncio
+        since = self._since()
+        try:
+            if inspect.iscoroutinefunction(self.calendar.get_changed_events):
+                events_json, timestamp = await self.calendar.get_changed_events(since, returnas='dict')
+            else:
+                loop = asyncio.get_running_loop()
+                events_json, timestamp = await loop.run_in_executor(None, self.calendar.get_changed_events, since,
+                                                                    'dict')
+        except Exception as error:
+            self._failed(error)
+            return 0
+        changes = self._received(events_json, since, timestamp)
+        await self._flush_async()
+        return changes
+
+    async def _flush_async(self, force=False):
+        for change, subscriptions in self._changes(force):
+            self.dispatched += 1
+            for subscription in subscriptions:
+                try:
+                    result = subscription.callback(change)
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception:
+                    logger.exception('Change callback %r failed', subscription.callback)
@@ -1,14 +1,38 @@
 from warnings import warn
-import requests
 import json
-from datetime import datetime
+import logging
+import threading
 from collections import OrderedDict
-from dateutil.parser import parse as to_datetime
+from contextlib import nullcontext
 
 from pyteamup.utils.utilities import *
 from pyteamup.utils.constants import *
+from pyteamup.utils.jsonstream import loads
+
+logger = logging.getLogger(__name__)
+
+# guards the lazy creation of the per event locks
+_LOCK_INIT = threading.Lock()
 
 class Event:
+    """
+    A TeamUp event. Date fields are kept as the strings sent by the api and parsed on first access, so building
+    large collections does not pay for parsing dates that are never read.
+
+    Updates, deletes and batch mode are serialized per event, so threads sharing an event do not send two PUTs built
+    from the same version or interleave their batch changes. The lock is only created once an event is changed.
+
+    Events are stored in slots. The api key and urls are read from the parent calendar when needed, subcalendar ids
+    are shared tuples and repeated strings (tz, rrule, visibilities) are interned, and the batch queue is created on
+    the first batched change, so large read only collections stay small.
+    """
+    __slots__ = ('surpress_warning', '__parent_calendar', '__id', '__remote_id', '__series_id', '__subcalendar_ids',
+                 '__start_dt', '__end_dt', '__all_day', '__title', '__who', '__location', '__notes', '__rrule',
+                 '__ristart_dt', '__rsstart_dt', '__tz', '__version', '__readonly', '__duration', '__signup_enabled',
+                 '__signup_deadline', '__signup_visibility', '__signup_limit', '__comments_enabled',
+                 '__comments_visibility', '__custom', '__creation_dt', '__update_dt', '__delete_dt', '__undo_id',
+                 '__aux', '__history', '__deleted', '__attachments', '__batch', '__batch_update_records', '__lock')
+
     def __init__(self, parent_calendar, id, remote_id=None, series_id=None,subcalendar_ids=None, subcalendar_id=None,
                start_dt=None, end_dt=None, all_day=None, title=None, who=None, location=None, notes=None,
                rrule=None, ristart_dt=None, rsstart_dt=None, tz=None, version=None, readonly=None, duration=None,
@@ -21,34 +45,33 @@ class Event:
         self.__id = id
         self.__remote_id = remote_id
         self.__series_id = series_id
-        self.__subcalendar_ids = subcalendar_ids
-        if subcalendar_id:
-            if not subcalendar_ids:
-                self.__subcalendar_ids = [subcalendar_id]
-        self.__start_dt = to_datetime(start_dt) if start_dt else None
-        self.__end_dt = to_datetime(end_dt) if end_dt else None
+        if subcalendar_id and not subcalendar_ids:
+            subcalendar_ids = (subcalendar_id,)
+        self.__subcalendar_ids = intern_ids(subcalendar_ids)
+        self.__start_dt = start_dt
+        self.__end_dt = end_dt
         self.__all_day = all_day
         self.__title = title
         self.__who = who
         self.__location = location
         self.__notes = notes
-        self.__rrule = rrule
-        self.__ristart_dt = to_datetime(ristart_dt) if ristart_dt else None
-        self.__rsstart_dt = to_datetime(rsstart_dt) if rsstart_dt else None
-        self.__tz = tz
+        self.__rrule = intern_str(rrule)
+        self.__ristart_dt = ristart_dt
+        self.__rsstart_dt = rsstart_dt
+        self.__tz = intern_str(tz)
         self.__version = version
         self.__readonly = readonly
         self.__duration = duration
         self.__signup_enabled = signup_enabled
         self.__signup_deadline = signup_deadline
-        self.__signup_visibility = signup_visibility
+        self.__signup_visibility = intern_str(signup_visibility)
         self.__signup_limit = signup_limit
         self.__comments_enabled = comments_enabled
-        self.__comments_visibility = comments_visibility
+        self.__comments_visibility = intern_str(comments_visibility)
         self.__custom = custom
-        self.__creation_dt = to_datetime(creation_dt)
-        self.__update_dt = to_datetime(update_dt) if update_dt else None
-        self.__delete_dt = to_datetime(delete_dt) if delete_dt else None
+        self.__creation_dt = creation_dt
+        self.__update_dt = update_dt
+        self.__delete_dt = delete_dt
         self.__undo_id = undo_id
         self.__aux = None
         self.__history = None
@@ -56,12 +79,9 @@ class Event:
         self.__attachments = attachments
 
         self.__batch = False
-        self.__batch_update_records = OrderedDict()
-
-        self.__api_key = self.parent_calendar.api_key
-        self.__token_str = f'?_teamup_token={self.api_key}'
-        self.__url = self.__parent_calendar._base_url + EVENTS_BASE + f'/{self.event_id}'
-        self.__api_url = self.__url + self.__token_str
+        self.__batch_update_records = None
+        # kept when the event is refreshed in place, the refresh runs while it is held
+        self.__lock = getattr(self, '_Event__lock', None)
 
     def __str__(self):
         return self.event_id
@@ -70,6 +90,10 @@ class Event:
     def event_id(self):
         return self.__id
 
+    @property
+    def undo_id(self):
+        return self.__undo_id
+
     @property
     def can_undo(self):
         return bool(self.__undo_id)
@@ -86,37 +110,41 @@ class Event:
     def remote_id(self, new_id):
         if new_id != self.remote_id:
             update_dict = {'remote_id': new_id}
-            self.execute_update(update_dict)
+            self._stage_update(update_dict)
         else:
             if not self.surpress_warning:
                 warn('New Remote Id is identical to current ID. No changes made')
 
     @property
     def start_dt(self):
+        if isinstance(self.__start_dt, str):
+            self.__start_dt = parse_datetime(self.__start_dt)
         return self.__start_dt
 
     @start_dt.setter
     def start_dt(self, new_dt):
-        if not isinstance(new_dt, datetime):
-            new_dt = to_datetime(new_dt)
+        if not isinstance(new_dt, datetime.datetime):
+            new_dt = parse_datetime(new_dt)
         if new_dt != self.start_dt:
             update_dict = {'start_dt': new_dt}
-            self.execute_update(update_dict)
+            self._stage_update(update_dict)
         else:
             if not self.surpress_warning:
                 warn('New Start Date is identical to current. No changes made')
 
     @property
     def end_dt(self):
+        if isinstance(self.__end_dt, str):
+            self.__end_dt = parse_datetime(self.__end_dt)
         return self.__end_dt
 
     @end_dt.setter
     def end_dt(self, new_dt):
-        if not isinstance(new_dt, datetime):
-            new_dt = to_datetime(new_dt)
+        if not isinstance(new_dt, datetime.datetime):
+            new_dt = parse_datetime(new_dt)
         if new_dt != self.end_dt:
             update_dict = {'end_dt': new_dt}
-            self.execute_update(update_dict)
+            self._stage_update(update_dict)
         else:
             if not self.surpress_warning:
                 warn('New End Date is identical to current. No changes made')
@@ -136,7 +164,7 @@ class Event:
 
         if value != self.all_day:
             update_dict = {'all_day': value}
-            self.execute_update(update_dict)
+            self._stage_update(update_dict)
         else:
             if not self.surpress_warning:
                 warn('New all_day value is identical to current. No changes made')
@@ -149,7 +177,7 @@ class Event:
     def title(self, new_title):
         if new_title != self.title:
             update_dict = {'title': new_title}
-            self.execute_update(update_dict)
+            self._stage_update(update_dict)
         else:
             if not self.surpress_warning:
                 warn('New title is identical to current. No changes made')
@@ -162,7 +190,7 @@ class Event:
     def who(self, who):
         if who != self.who:
             update_dict = {'who': who}
-            self.execute_update(update_dict)
+            self._stage_update(update_dict)
         else:
             if not self.surpress_warning:
                 warn('New location is identical to current. No changes made')
@@ -175,7 +203,7 @@ class Event:
     def location(self, location):
         if location != self.location:
             update_dict = {'location': location}
-            self.execute_update(update_dict)
+            self._stage_update(update_dict)
         else:
             if not self.surpress_warning:
                 warn('New location is identical to current. No changes made')
@@ -187,14 +215,15 @@ class Event:
     def notes(self, description):
         if description != self.notes:
             update_dict = {'notes': description}
-            self.execute_update(update_dict)
+            self._stage_update(update_dict)
         else:
             if not self.surpress_warning:
                 warn('New description is identical to current. No changes made')
 
     @property
     def subcalendar_ids(self):
-        return self.__subcalendar_ids
+        ids = self.__subcalendar_ids
+        return list(ids) if ids is not None else None
 
     @subcalendar_ids.setter
     def subcalendar_ids(self, ids):
@@ -205,7 +234,7 @@ class Event:
 
         if ids != self.subcalendar_ids:
             update_dict = {'subcalendar_ids': ids}
-            self.execute_update(update_dict)
+            self._stage_update(update_dict)
         else:
             if not self.surpress_warning:
                 warn('New description is identical to current. No changes made')
@@ -216,10 +245,14 @@ class Event:
 
     @property
     def ristart_dt(self):
+        if isinstance(self.__ristart_dt, str):
+            self.__ristart_dt = parse_datetime(self.__ristart_dt)
         return self.__ristart_dt
 
     @property
     def rsstart_dt(self):
+        if isinstance(self.__rsstart_dt, str):
+            self.__rsstart_dt = parse_datetime(self.__rsstart_dt)
         return self.__rsstart_dt
 
     @property
@@ -264,14 +297,20 @@ class Event:
 
     @property
     def creation_dt(self):
+        if isinstance(self.__creation_dt, str):
+            self.__creation_dt = parse_datetime(self.__creation_dt)
         return self.__creation_dt
 
     @property
     def update_dt(self):
+        if isinstance(self.__update_dt, str):
+            self.__update_dt = parse_datetime(self.__update_dt)
         return self.__update_dt
 
     @property
     def delete_dt(self):
+        if isinstance(self.__delete_dt, str):
+            self.__delete_dt = parse_datetime(self.__delete_dt)
         return self.__delete_dt
 
     @property
@@ -284,15 +323,15 @@ class Event:
 
     @property
     def api_key(self):
-        return self.__api_key
+        return self.__parent_calendar.api_key
 
     @property
     def url(self):
-        return self.__url
+        return self.__parent_calendar._base_url + EVENTS_BASE + f'/{self.__id}'
 
     @property
     def api_url(self):
-        return self.__api_url
+        return self.__parent_calendar._event_url(self.__id)
 
     @property
     def batch(self):
@@ -326,62 +365,150 @@ class Event:
     def attachments(self):
         return self.__attachments
 
+    def to_dict(self):
+        """The event as the dictionary the api returns, without the calendar and its credentials"""
+        def api_date(value):
+            return value.isoformat(timespec='seconds') if isinstance(value, datetime.datetime) else value
+        return {'id': self.__id,
+                'remote_id': self.__remote_id,
+                'series_id': self.__series_id,
+                'subcalendar_ids': self.subcalendar_ids,
+                'start_dt': api_date(self.__start_dt),
+                'end_dt': api_date(self.__end_dt),
+                'all_day': self.__all_day,
+                'title': self.__title,
+                'who': self.__who,
+                'location': self.__location,
+                'notes': self.__notes,
+                'rrule': self.__rrule,
+                'ristart_dt': api_date(self.__ristart_dt),
+                'rsstart_dt': api_date(self.__rsstart_dt),
+                'tz': self.__tz,
+                'version': self.__version,
+                'readonly': self.__readonly,
+                'duration': self.__duration,
+                'creation_dt': api_date(self.__creation_dt),
+                'update_dt': api_date(self.__update_dt),
+                'delete_dt': api_date(self.__delete_dt),
+                'signup_enabled': self.__signup_enabled,
+                'signup_deadline': self.__signup_deadline,
+                'signup_visibility': self.__signup_visibility,
+                'signup_limit': self.__signup_limit,
+                'comments_enabled': self.__comments_enabled,
+                'comments_visibility': self.__comments_visibility,
+                'custom': self.__custom,
+                'attachments': self.__attachments}
+
     def execute_update(self, update_dict):
         """Executes an update. if Batch Mode is enabled then it will store it in the queue until batch execute is called
         at which point batch mode is disabled and the queue passed as one single update.
         :param: update_dict: Required dictionary of update elements. Should conform to the api reference from types and
                             valid fields. Note that custom fields are not supported by the api currently.
         """
-        if self.batch:
-            if not self.surpress_warning:
-                warn('Batch Mode Enabled, Request not sent until Event.batch_submit() called')
+        with self._lock():
+            if self.batch:
+                if not self.surpress_warning:
+                    warn('Batch Mode Enabled, Request not sent until Event.batch_submit() called')
+                self._record_batch(update_dict)
+                return 'Batch Updated'
+            calendar = self.__parent_calendar
+            with calendar._instrumentation.call('PUT', EVENT_ENDPOINT) as call:
+                payload = self._update_payload(update_dict)
+                call.sent(payload)
+                resp = call.response(calendar._transport.put(self.api_url, data=payload, headers=POST_HEADERS))
+                check_status_code(resp.status_code, resp)
+                self._apply_update_response(resp.content, call)
+
+    def _lock(self):
+        """Reentrant lock of the event, created on first use"""
+        lock = self.__lock
+        if lock is None:
+            with _LOCK_INIT:
+                if self.__lock is None:
+                    self.__lock = threading.RLock()
+                lock = self.__lock
+        return lock
+
+    def _stage_update(self, update_dict):
+        """Entry point used by the property setters, subclasses may queue the change instead of sending it. Inside a
+        Calendar.unit_of_work() block the change is recorded by the unit of work."""
+        unit_of_work = getattr(self.__parent_calendar, '_active_unit_of_work', None)
+        if unit_of_work is not None:
+            unit_of_work.record(self, update_dict)
+            return
+        self.execute_update(update_dict)
+
+    def _invalidate_cache(self):
+        invalidate = getattr(self.__parent_calendar, '_invalidate_event', None)
+        if invalidate is not None:
+            invalidate(self.event_id)
+
+    def _record_batch(self, update_dict):
+        with self._lock():
+            if self.__batch_update_records is None:
+                self.__batch_update_records = OrderedDict()
             for k, v in update_dict.items():
                 self.__batch_update_records[k] = v
-            return 'Batch Updated'
-        else:
-            final_update_dict = self._update_dict
-            for k in update_dict:
-                val = update_dict[k]
-                if isinstance(val, datetime.datetime):
-                    val = format_date(val)
-                final_update_dict[k] = val
-            final_update_json = json.dumps(final_update_dict)
-            resp = requests.put(self.api_url, data=final_update_json, headers=POST_HEADERS)
-            check_status_code(resp.status_code)
-            resp_json = json.loads(resp.text)
-            event_data = resp_json['event']
-            undo_id = resp_json['undo_id']
-            self.__init__(self.__parent_calendar, undo_id=undo_id, **event_data)
+
+    def _take_batch_records(self):
+        """Returns the queued batch updates and empties the queue"""
+        with self._lock():
+            records = self.__batch_update_records
+            self.__batch_update_records = None
+            return records if records is not None else OrderedDict()
+
+    def _update_payload(self, update_dict):
+        """Merges update_dict into the current state of the event and returns the json body of the PUT request"""
+        final_update_dict = self._update_dict
+        for k in update_dict:
+            val = update_dict[k]
+            if isinstance(val, datetime.datetime):
+                val = format_date(val)
+            final_update_dict[k] = val
+        return json.dumps(final_update_dict)
+
+    def _apply_update_response(self, resp_text, call=None):
+        """Refreshes the event in place from the body of an update response, timing the steps on call if given"""
+        with call.phase('decode') if call is not None else nullcontext():
+            resp_json = loads(resp_text)
+        event_data = resp_json['event']
+        undo_id = resp_json['undo_id']
+        self._invalidate_cache()
+        with call.phase('construct') if call is not None else nullcontext():
+            self.__init__(self.__parent_calendar, undo_id=undo_id, surpress_warning=self.surpress_warning,
+                          **event_data)
 
     def enable_batch_update(self):
         """Interface for Batch Update mode to turn the mode On. In this mode all changes to the event are cached until
         batch_execute() is called"""
-        if not self.batch:
-            self.__batch = True
-            print('Batch Mode Enabled')
-        else:
-            if not self.surpress_warning:
-                warn('Batch mode already enabled')
+        with self._lock():
+            if not self.batch:
+                self.__batch = True
+                logger.info('Batch Mode Enabled')
+            else:
+                if not self.surpress_warning:
+                    warn('Batch mode already enabled')
 
     def disable_batch_update(self, clear=False, force=False):
         """Interface for Batch Update Mode to turn the mode off.
         :param: clear: Boolean, used if calling disable manually and wish to discard"""
-        if self.batch:
-            if self.__batch_update_records:
-                if clear:
-                    to_disp_len = len(self.__batch_update_records)
-                    if not self.surpress_warning:
-                        warn(f'Disposing of {to_disp_len} batch updates in queue')
-                    self.__batch_update_records = OrderedDict()
-                else:
-                    if not force:
-                        raise Exception('Non-Empty Queue, cannot turn off batch mode. Run batch_commit() or pass clear=True or pass force=True')
-                    print('Batch Cache not cleared')
-            self.__batch = False
-            print('Batch Update Disabled')
-        else:
-            if not self.surpress_warning:
-                warn('Batch mode already enabled')
+        with self._lock():
+            if self.batch:
+                if self.__batch_update_records:
+                    if clear:
+                        to_disp_len = len(self.__batch_update_records)
+                        if not self.surpress_warning:
+                            warn(f'Disposing of {to_disp_len} batch updates in queue')
+                        self.__batch_update_records = None
+                    else:
+                        if not force:
+                            raise Exception('Non-Empty Queue, cannot turn off batch mode. Run batch_commit() or pass clear=True or pass force=True')
+                        logger.info('Batch Cache not cleared')
+                self.__batch = False
+                logger.info('Batch Update Disabled')
+            else:
+                if not self.surpress_warning:
+                    warn('Batch mode already enabled')
 
     def batch_commit(self):
         """
@@ -390,16 +517,28 @@ class Event:
         No change is made if batch queue is empty
         :return:
         """
-        if self.batch:
-            if self.__batch_update_records:
-                self.disable_batch_update(force=True)
-                self.execute_update(self.__batch_update_records)
-                self.__batch_update_records = OrderedDict()
+        with self._lock():
+            if self.batch:
+                if self.__batch_update_records:
+                    self.disable_batch_update(force=True)
+                    self.execute_update(self._take_batch_records())
+                else:
+                    if not self.surpress_warning:
+                        warn('No Updates in Queue, no changes made, batch mode still enabled.')
             else:
-                if not self.surpress_warning:
-                    warn('No Updates in Queue, no changes made, batch mode still enabled.')
-        else:
-            raise Exception('Batch Mode is not enabled.')
+                raise Exception('Batch Mode is not enabled.')
+
+    def occurrences(self, start_dt, end_dt):
+        """
+        Occurrences of the series of this event overlapping [start_dt, end_dt), expanded locally from its rrule
+        without a request. A single instance does not tell which occurrences were changed or deleted, use
+        Calendar.get_recurrences for that.
+        :return: list of Occurrence(series_id, start_dt, end_dt, original_start_dt, event)
+        """
+        if not self.rrule:
+            raise AttributeError('Event is not a recurring event')
+        from pyteamup.Recurrence import RecurrenceEngine
+        return RecurrenceEngine([self]).occurrences(start_dt, end_dt)
 
     def delete(self, redit=None):
         """
@@ -407,6 +546,15 @@ class Event:
         :param subcalendar_id:
         :return:
         """
+        with self._lock():
+            calendar = self.__parent_calendar
+            with calendar._instrumentation.call('DELETE', EVENT_ENDPOINT) as call:
+                resp = call.response(calendar._transport.delete(self._delete_url(redit)))
+                check_status_code(resp.status_code, resp)
+                with call.phase('decode'):
+                    self._apply_delete_response(resp.content)
+
+    def _delete_url(self, redit=None):
         if redit:
             if not self.rrule:
                 raise AttributeError('rredit parameter included but event is not a recurring event')
@@ -416,16 +564,12 @@ class Event:
                 raise AttributeError('Recurring events require rredit paramter passed')
             redit_param = ''
 
-        url = self.api_url + f'&version={self.version}' + redit_param
-        resp = requests.delete(url)
-        check_status_code(resp.status_code)
-        resp_json = json.loads(resp.text)
+        return self.api_url + f'&version={self.version}' + redit_param
+
+    def _apply_delete_response(self, resp_text):
+        resp_json = loads(resp_text)
         self.__undo_id = resp_json['undo_id']
         self.__deleted = True
+        self._invalidate_cache()
         if not self.surpress_warning:
             warn('Event Deleted but delete_dt not set until event is refreshed from server. Use Calendar to get the event again')
-
-
-
-
-
@@ -0,0 +1,149 @@
+"""Columnar, NumPy backed view of an event collection"""
+
+from pyteamup.utils.utilities import epoch_seconds, optional_import
+from pyteamup.Event import Event
+
+_NAT = -2 ** 63
+
+# numpy is bound on first use so importing pyteamup does not pay for it
+np = None
+
+
+def _require_numpy():
+    global np
+    if np is None:
+        np = optional_import('numpy')
+        if np is None:
+            raise ImportError('numpy is required for columnar event collections: python -m pip install numpy')
+    return np
+
+
+def _epoch_seconds(value):
+    seconds = epoch_seconds(value)
+    return _NAT if seconds is None else seconds
+
+
+def _to_datetime64(value):
+    _require_numpy()
+    if isinstance(value, np.datetime64):
+        return value.astype('datetime64[s]')
+    return np.datetime64(_epoch_seconds(value), 's')
+
+
+class EventTable:
+    """
+    Event collection stored as contiguous arrays instead of one Event object per event.
+
+    Columns:
+        ``ids`` int64 event ids (object array of str if the collection holds recurring instance ids like ``1-rid-2``)
+        ``start_dt`` / ``end_dt`` ``datetime64[s]`` in UTC
+        ``all_day`` bool
+        ``subcalendar_ids`` / ``subcalendar_indptr`` CSR layout, the subcalendars of row i are
+        ``subcalendar_ids[subcalendar_indptr[i]:subcalendar_indptr[i + 1]]``
+
+    Filters return boolean masks that can be combined with ``&`` and ``|`` and passed to ``select``. Event objects are
+    only built when a row is indexed, as ``event_class`` (AsyncEvent for the tables of an AsyncCalendar). Returned by
+    ``Calendar.get_event_collection(returnas='columnar')``.
+    """
+    def __init__(self, parent_calendar, events_json, event_class=Event):
+        _require_numpy()
+        self.__parent_calendar = parent_calendar
+        self.__records = events_json
+        self.__event_class = event_class
+
+        n = len(events_json)
+        raw_ids = [event['id'] for event in events_json]
+        try:
+            self.ids = np.fromiter((int(i) for i in raw_ids), dtype=np.int64, count=n)
+        except ValueError:
+            self.ids = np.array([str(i) for i in raw_ids], dtype=object)
+        self.start_dt = np.fromiter((_epoch_seconds(e.get('start_dt')) for e in events_json), dtype=np.int64,
+                                    count=n).view('datetime64[s]')
+        self.end_dt = np.fromiter((_epoch_seconds(e.get('end_dt')) for e in events_json), dtype=np.int64,
+                                  count=n).view('datetime64[s]')
+        self.all_day = np.fromiter((bool(e.get('all_day')) for e in events_json), dtype=bool, count=n)
+
+        counts = np.fromiter((len(e.get('subcalendar_ids') or ()) for e in events_json), dtype=np.int64, count=n)
+        self.subcalendar_indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.subcalendar_indptr[1:])
+        self.subcalendar_ids = np.fromiter((int(s) for e in events_json for s in (e.get('subcalendar_ids') or ())),
+                                           dtype=np.int64, count=int(self.subcalendar_indptr[-1]))
+
+    def __len__(self):
+        return len(self.__records)
+
+    def __getitem__(self, index):
+        """Materializes the Event at a row index"""
+        return self.__event_class(self.__parent_calendar, **self.__records[index])
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    @property
+    def parent_calendar(self):
+        return self.__parent_calendar
+
+    @property
+    def event_class(self):
+        return self.__event_class
+
+    def record(self, index):
+        """Returns the event dictionary at a row index"""
+        return self.__records[index]
+
+    def to_dicts(self):
+        return list(self.__records)
+
+    def overlapping(self, start_dt, end_dt):
+        """Mask of events overlapping the half open range [start_dt, end_dt)"""
+        return (self.start_dt < _to_datetime64(end_dt)) & (self.end_dt > _to_datetime64(start_dt))
+
+    def in_subcalendars(self, subcalendar_ids):
+        """Mask of events belonging to at least one of the given subcalendar ids"""
+        if isinstance(subcalendar_ids, (str, int)):
+            subcalendar_ids = [subcalendar_ids]
+        hits = np.isin(self.subcalendar_ids, np.asarray([int(s) for s in subcalendar_ids], dtype=np.int64))
+        rows = np.repeat(np.arange(len(self)), np.diff(self.subcalendar_indptr))
+        mask = np.zeros(len(self), dtype=bool)
+        mask[rows[hits]] = True
+        return mask
+
+    def is_all_day(self, value=True):
+        """Mask of all day events, or of timed events if value is False"""
+        return self.all_day if value else ~self.all_day
+
+    def select(self, mask):
+        """Returns a new EventTable holding the rows selected by a boolean mask or an array of row indices"""
+        mask = np.asarray(mask)
+        indices = np.flatnonzero(mask) if mask.dtype == bool else mask.astype(np.int64)
+
+        subset = EventTable.__new__(EventTable)
+        subset.__parent_calendar = self.__parent_calendar
+        subset.__event_class = self.__event_class
+        subset.__records = [self.__records[i] for i in indices]
+        subset.ids = self.ids[indices]
+        subset.start_dt = self.start_dt[indices]
+        subset.end_dt = self.end_dt[indices]
+        subset.all_day = self.all_day[indices]
+
+        counts = np.diff(self.subcalendar_indptr)[indices]
+        subset.subcalendar_indptr = np.zeros(len(indices) + 1, dtype=np.int64)
+        np.cumsum(counts, out=subset.subcalendar_indptr[1:])
+        # position of every kept subcalendar id in the source array
+        offsets = np.repeat(self.subcalendar_indptr[indices] - subset.subcalendar_indptr[:-1], counts)
+        subset.subcalendar_ids = self.subcalendar_ids[offsets + np.arange(subset.subcalendar_indptr[-1])]
+        return subset
+
+    def filter(self, start_dt=None, end_dt=None, subcalendar_ids=None, all_day=None):
+        """Convenience wrapper combining the filters, any argument left as None is not applied"""
+        mask = np.ones(len(self), dtype=bool)
+        if start_dt is not None or end_dt is not None:
+            lower = start_dt if start_dt is not None else np.datetime64(_NAT + 1, 's')
+            upper = end_dt if end_dt is not None else np.datetime64(2 ** 62, 's')
+            mask &= self.overlapping(lower, upper)
+        if subcalendar_ids is not None:
+            mask &= self.in_subcalendars(subcalendar_ids)
+        if all_day is not None:
+            mask &= self.is_all_day(all_day)
+        return self.select(mask)
@@ -0,0 +1,207 @@
+"""Declarative sync of events keyed by remote_id: diff the desired state against the calendar and apply it"""
+
+import datetime
+from collections import namedtuple, OrderedDict
+
+from pyteamup.utils.utilities import *
+from pyteamup.utils.bulk import BulkResult, bounded_map
+
+CREATE, UPDATE, DELETE = 'create', 'update', 'delete'
+
+# fields of new_event a desired event can set, compared in this order
+RECONCILE_FIELDS = ('title', 'start_dt', 'end_dt', 'all_day', 'subcalendar_ids', 'notes', 'location', 'who')
+
+Action = namedtuple('Action', ['action', 'remote_id', 'event', 'changes'])
+Action.__doc__ = """One step of a reconcile plan. ``event`` is the current Event (None for a create) and ``changes`` the
+new_event arguments of a create or a dict of field to (current value, desired value) for an update."""
+
+
+def _as_datetime(value):
+    if isinstance(value, datetime.date) and not isinstance(value, datetime.datetime):
+        return datetime.datetime(value.year, value.month, value.day)
+    return parse_datetime(value)
+
+
+def _same_time(current, desired):
+    """
+    Whether two dates are the same instant. A naive date is wall clock time in the calendar's timezone, the api
+    returns dates with that offset, so it is compared with the local time of the other date rather than read as UTC.
+    """
+    current, desired = _as_datetime(current), _as_datetime(desired)
+    if current is None or desired is None:
+        return current is desired
+    if (current.tzinfo is None) != (desired.tzinfo is None):
+        return current.replace(tzinfo=None) == desired.replace(tzinfo=None)
+    return current == desired
+
+
+def _normalized(field, value):
+    """Comparable form of a field value, so equal values given in different types or formats match"""
+    if field == 'subcalendar_ids':
+        if value is None:
+            return frozenset()
+        if isinstance(value, (str, int)):
+            value = [value]
+        return frozenset(str(s) for s in value)
+    if field == 'all_day':
+        return bool(value)
+    # the api returns empty text fields as ''
+    return value or None
+
+
+def _desired_value(field, value):
+    """Value of a desired field as Event._update_payload expects it"""
+    if field in ('start_dt', 'end_dt') and not isinstance(value, datetime.datetime):
+        return parse_datetime(value)
+    if field == 'subcalendar_ids' and isinstance(value, (str, int)):
+        return [value]
+    return value
+
+
+def field_changes(event, desired, fields=RECONCILE_FIELDS):
+    """
+    Field level difference between an Event and a desired event dict. Only fields present in desired are compared.
+    :return: dict of field to (current value, desired value), empty if the event is up to date
+    """
+    changes = OrderedDict()
+    for field in fields:
+        if field not in desired:
+            continue
+        current = getattr(event, field)
+        if field in ('start_dt', 'end_dt'):
+            changed = not _same_time(current, desired[field])
+        else:
+            changed = _normalized(field, current) != _normalized(field, desired[field])
+        if changed:
+            changes[field] = (current, desired[field])
+    return changes
+
+
+class ReconcileReport:
+    """
+    Plan of a reconcile and, unless it was a dry run, the outcome of every step.
+
+        report = calendar.reconcile(desired, start_dt, end_dt, dry_run=True)
+        report.summary()        # {'create': 3, 'update': 12, 'delete': 1, 'unchanged': 840, 'skipped': 0, 'failed': 0}
+        for action in report.updates:
+            print(action.remote_id, action.changes)
+
+    ``results`` holds one BulkResult per action in the order of ``actions`` (creates, then updates, then deletes),
+    ``result`` being the created, updated or deleted Event.
+    """
+    def __init__(self, creates, updates, deletes, unchanged, skipped, dry_run):
+        self.creates = creates
+        self.updates = updates
+        self.deletes = deletes
+        self.unchanged = unchanged
+        self.skipped = skipped
+        self.dry_run = dry_run
+        self.results = []
+
+    def __repr__(self):
+        return f'ReconcileReport({self.summary()}, dry_run={self.dry_run})'
+
+    def __len__(self):
+        return len(self.creates) + len(self.updates) + len(self.deletes)
+
+    @property
+    def actions(self):
+        return self.creates + self.updates + self.deletes
+
+    @property
+    def failed(self):
+        """(Action, BulkResult) of the steps that failed"""
+        return [(action, result) for action, result in zip(self.actions, self.results) if not result.ok]
+
+    def summary(self):
+        return {CREATE: len(self.creates),
+                UPDATE: len(self.updates),
+                DELETE: len(self.deletes),
+                'unchanged': len(self.unchanged),
+                'skipped': len(self.skipped),
+                'failed': len(self.failed)}
+
+
+def plan(current_events, desired_events, fields=RECONCILE_FIELDS, delete_missing=True):
+    """
+    Compares the current events of a calendar with the desired ones, both keyed by remote_id.
+
+    Current events without a remote_id are not managed and are left alone, as are recurring events, which are listed
+    in ``skipped``: a desired event with the remote_id of a recurring one is neither created nor updated. When several
+    current events share a remote_id the first one is kept and, with delete_missing, the others are deleted.
+
+    :param current_events: iterable of Event
+    :param desired_events: iterable of dicts of new_event arguments, each with a remote_id
+    :param fields: fields compared, a subset of RECONCILE_FIELDS
+    :param delete_missing: <bool> delete managed events whose remote_id is not desired
+    :return: ReconcileReport without results
+    """
+    desired = OrderedDict()
+    for spec in desired_events:
+        remote_id = spec.get('remote_id')
+        if remote_id is None:
+            raise ValueError(f'Desired event without a remote_id: {spec}')
+        if str(remote_id) in desired:
+            raise ValueError(f'remote_id {remote_id} is desired more than once')
+        desired[str(remote_id)] = spec
+
+    current = OrderedDict()
+    duplicates, skipped = [], []
+    for event in current_events:
+        if event.remote_id is None or event.remote_id == '':
+            continue
+        if event.rrule:
+            skipped.append(event)
+            continue
+        key = str(event.remote_id)
+        if key in current:
+            duplicates.append(event)
+        else:
+            current[key] = event
+
+    skipped_ids = {str(event.remote_id) for event in skipped}
+    creates, updates, unchanged = [], [], []
+    for key, spec in desired.items():
+        event = current.get(key)
+        if event is None:
+            if key in skipped_ids:
+                continue
+            creates.append(Action(CREATE, spec['remote_id'], None, dict(spec)))
+            continue
+        changes = field_changes(event, spec, fields)
+        if changes:
+            updates.append(Action(UPDATE, spec['remote_id'], event, changes))
+        else:
+            unchanged.append(event)
+
+    deletes = []
+    if delete_missing:
+        deletes = [Action(DELETE, event.remote_id, event, None)
+                   for key, event in current.items() if key not in desired]
+        deletes.extend(Action(DELETE, event.remote_id, event, None) for event in duplicates)
+    return ReconcileReport(creates, updates, deletes, unchanged, skipped, dry_run=True)
+
+
+def apply(calendar, report, max_workers):
+    """Sends the actions of a plan concurrently and fills in report.results"""
+    def send(action):
+        if action.action == CREATE:
+            return calendar.new_event(**action.changes)
+        if action.action == UPDATE:
+            # one PUT carrying every changed field, built from the fetched state so the version is checked
+            action.event.execute_update({field: _desired_value(field, desired)
+                                         for field, (_, desired) in action.changes.items()})
+            return action.event
+        action.event.delete()
+        return action.event
+
+    actions = report.actions
+    results = [None] * len(actions)
+    for index, value, error in bounded_map(send, actions, max_workers):
+        if error is not None:
+            results[index] = BulkResult(index, False, None, None, error)
+        else:
+            results[index] = BulkResult(index, True, value, value.undo_id, None)
+    report.results = results
+    report.dry_run = False
+    return report
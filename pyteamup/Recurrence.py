@@ -0,0 +1,440 @@
+"""Local expansion of recurring (rrule) events"""
+
+import datetime
+import functools
+import re
+from collections import namedtuple
+
+from pyteamup.utils.utilities import parse_datetime, epoch_seconds, optional_import
+from pyteamup.utils.constants import RRULE_CACHE_SIZE
+
+Occurrence = namedtuple('Occurrence', ['series_id', 'start_dt', 'end_dt', 'original_start_dt', 'event'])
+Occurrence.__doc__ = """One occurrence of a series. ``original_start_dt`` is the start the rule gives it (``ristart_dt``)
+and ``event`` the event dictionary of the occurrence, the stored instance when it was changed on its own."""
+
+OccurrenceArrays = namedtuple('OccurrenceArrays', ['series_ids', 'start_dt', 'end_dt'])
+
+_UNTIL = re.compile(r'UNTIL=(\d{8})(T\d{6})?(Z)?', re.IGNORECASE)
+_SECONDS = {'DAILY': 86400, 'WEEKLY': 7 * 86400}
+# rule parts that keep occurrences exactly one period apart
+_PERIODIC_PARTS = frozenset(('FREQ', 'INTERVAL', 'COUNT', 'UNTIL', 'WKST'))
+# fields telling whether an instance was edited on its own
+_INSTANCE_FIELDS = ('title', 'who', 'location', 'notes', 'subcalendar_ids', 'all_day')
+_UNBOUNDED = 2 ** 40
+
+
+def _field(event, name):
+    return event.get(name) if isinstance(event, dict) else getattr(event, name)
+
+
+def _as_dict(event):
+    if isinstance(event, dict):
+        return event
+    return dict(event._update_dict, series_id=event.series_id, rrule=event.rrule, tz=event.tz,
+                ristart_dt=_isoformat(event.ristart_dt), rsstart_dt=_isoformat(event.rsstart_dt))
+
+
+def _series_key(event):
+    series_id = _field(event, 'series_id')
+    if series_id:
+        return str(series_id)
+    return str(_field(event, 'id')).split('-rid-')[0]
+
+
+def _zone(name):
+    """tzinfo of an IANA timezone name or None if it cannot be resolved"""
+    if not name:
+        return None
+    zoneinfo = optional_import('zoneinfo')
+    if zoneinfo is not None:
+        try:
+            return zoneinfo.ZoneInfo(name)
+        except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+            return None
+    from dateutil.tz import gettz
+    return gettz(name)
+
+
+def _bound(value, tzinfo):
+    """
+    Reads a date, datetime or string in tzinfo: dates and naive values are wall clock time there, aware values are
+    converted. Window bounds go through here so every query reads them the same way. Naive when tzinfo is None.
+    """
+    if isinstance(value, datetime.date) and not isinstance(value, datetime.datetime):
+        value = datetime.datetime(value.year, value.month, value.day)
+    value = parse_datetime(value)
+    if tzinfo is None:
+        return value.replace(tzinfo=None) if value.tzinfo is not None else value
+    if value.tzinfo is None:
+        return value.replace(tzinfo=tzinfo)
+    return value.astimezone(tzinfo)
+
+
+def _event_tzinfo(event):
+    """Timezone of a non recurring event dictionary: its tz when known, otherwise the offset of its start"""
+    start = parse_datetime(event.get('start_dt'))
+    return _zone(event.get('tz')) or (start.tzinfo if start is not None else None)
+
+
+def _isoformat(value):
+    return value.isoformat(timespec='seconds') if isinstance(value, datetime.datetime) else value
+
+
+def _periodic_starts(np, first, period, limit, duration, lower, upper):
+    """
+    Vectorized expansion of evenly spaced series, the k-th occurrence of series i starting at first[i] + k * period[i]
+    for k < limit[i]. Keeps occurrences overlapping [lower, upper) given in epoch seconds.
+    :return: (series position, start epoch) int64 arrays
+    """
+    first, period, limit, duration = (np.asarray(a, dtype=np.int64) for a in (first, period, limit, duration))
+    # start < upper, and end > lower (start >= lower for zero length events)
+    low = np.where(duration > 0, (lower - duration - first) // period + 1, -((first - lower) // period))
+    high = np.minimum(-((first - upper) // period), limit)
+    low = np.maximum(low, 0)
+    lengths = np.maximum(high - low, 0)
+    position = np.repeat(np.arange(len(first)), lengths)
+    k = np.repeat(low, lengths) + np.arange(int(lengths.sum())) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return position, first[position] + k * period[position]
+
+
+@functools.lru_cache(maxsize=RRULE_CACHE_SIZE)
+def compile_rrule(rrule, dtstart, zone_name=None):
+    """
+    Compiles an rrule string for a naive, wall clock dtstart. Results are cached, every series sharing a rule and a
+    start compiles it once. UNTIL values given in UTC are moved to wall clock time in ``zone_name`` (or UTC) and date
+    only UNTIL values include their whole day.
+    """
+    from dateutil.rrule import rrulestr
+    zone = _zone(zone_name) or datetime.timezone.utc
+
+    def naive_until(match):
+        day, time_part, utc = match.groups()
+        until = datetime.datetime.strptime(day + (time_part or 'T235959'), '%Y%m%dT%H%M%S')
+        if utc:
+            until = until.replace(tzinfo=datetime.timezone.utc).astimezone(zone).replace(tzinfo=None)
+        return 'UNTIL=' + until.strftime('%Y%m%dT%H%M%S')
+
+    rule = _UNTIL.sub(naive_until, rrule.strip())
+    if rule.upper().startswith('RRULE:'):
+        rule = rule[6:]
+    return rrulestr(rule, dtstart=dtstart, cache=True)
+
+
+class Series:
+    """
+    A recurring event: its rule, the first occurrence and the exceptions known for it.
+
+    Rules are expanded in the wall clock time of the series timezone (the event ``tz`` when it is a known IANA name,
+    otherwise the fixed offset of its start), so a weekly 09:00 meeting stays at 09:00 across daylight saving changes.
+
+    :param series_id: id of the series
+    :param rrule: <str> recurrence rule, e.g. ``FREQ=WEEKLY;BYDAY=MO,WE;UNTIL=20250101``
+    :param start_dt: start of the first occurrence (``rsstart_dt``)
+    :param end_dt: end of the first occurrence, gives the duration of every occurrence
+    :param tz: optional IANA timezone name of the series
+    :param template: optional event dictionary occurrences are built from
+    """
+    def __init__(self, series_id, rrule, start_dt, end_dt, tz=None, template=None):
+        self.series_id = series_id
+        self.rrule = rrule
+        start_dt, end_dt = parse_datetime(start_dt), parse_datetime(end_dt)
+        self.duration = end_dt - start_dt
+        self.template = dict(template or {})
+        zone = _zone(tz)
+        self.zone_name = tz if zone is not None else None
+        self.tzinfo = zone or start_dt.tzinfo
+        if self.tzinfo is not None:
+            start_dt = (start_dt.replace(tzinfo=self.tzinfo) if start_dt.tzinfo is None
+                        else start_dt.astimezone(self.tzinfo))
+        self.start_dt = start_dt
+        self.__wall_start = start_dt.replace(tzinfo=None)
+        self.__exdates = set()
+        self.__overrides = {}
+        self.__periodic = False
+
+    def __repr__(self):
+        return f'Series({self.series_id}, {self.rrule!r}, start_dt={self.start_dt.isoformat()})'
+
+    @property
+    def rule(self):
+        return compile_rrule(self.rrule, self.__wall_start, self.zone_name)
+
+    @property
+    def exdates(self):
+        return sorted(self.__exdates)
+
+    @property
+    def overrides(self):
+        return dict(self.__overrides)
+
+    def exclude(self, original_start_dt):
+        """Marks the occurrence the rule places at original_start_dt as deleted"""
+        self.__exdates.add(self._key(original_start_dt))
+
+    def override(self, original_start_dt, event):
+        """Replaces the occurrence the rule places at original_start_dt by an event changed on its own"""
+        key = self._key(original_start_dt)
+        self.__exdates.discard(key)
+        self.__overrides[key] = event
+
+    def _key(self, value):
+        return epoch_seconds(self._aware(value))
+
+    def _aware(self, value):
+        """Reads naive values and dates in the series timezone"""
+        return _bound(value, self.tzinfo)
+
+    def _localize(self, wall):
+        return wall.replace(tzinfo=self.tzinfo) if self.tzinfo is not None else wall
+
+    def _generated(self, start_dt, end_dt):
+        """Aware starts given by the rule for occurrences overlapping [start_dt, end_dt), before exceptions"""
+        # wall clock and absolute time drift apart by at most a day around offset changes
+        lower = (start_dt - self.duration - datetime.timedelta(days=1)).replace(tzinfo=None)
+        upper = (end_dt + datetime.timedelta(days=1)).replace(tzinfo=None)
+        for wall in self.rule.between(lower, upper, inc=True):
+            start = self._localize(wall)
+            end = start + self.duration
+            if start < end_dt and (end > start_dt or start >= start_dt):
+                yield start
+
+    def between(self, start_dt, end_dt):
+        """
+        Occurrences overlapping [start_dt, end_dt), deleted ones left out and ones changed on their own replaced by
+        the stored instance.
+        :return: list of Occurrence sorted by start
+        """
+        start_dt, end_dt = self._aware(start_dt), self._aware(end_dt)
+        found = []
+        for start in self._generated(start_dt, end_dt):
+            key = epoch_seconds(start)
+            if key in self.__exdates or key in self.__overrides:
+                continue
+            found.append(Occurrence(self.series_id, start, start + self.duration, start, self.instance(start)))
+        for key, event in self.__overrides.items():
+            start, end = self._aware(_field(event, 'start_dt')), self._aware(_field(event, 'end_dt'))
+            if start < end_dt and (end > start_dt or start >= start_dt):
+                original = datetime.datetime.fromtimestamp(key, self.tzinfo or datetime.timezone.utc)
+                if self.tzinfo is None:
+                    original = original.replace(tzinfo=None)
+                found.append(Occurrence(self.series_id, start, end, original, event))
+        found.sort(key=lambda occurrence: occurrence.start_dt)
+        return found
+
+    def instance(self, start):
+        """Event dictionary of the generated occurrence starting at start, in the shape the api returns instances"""
+        event = dict(self.template)
+        event.update(id=f'{self.series_id}-rid-{epoch_seconds(start)}', series_id=self.series_id, rrule=self.rrule,
+                     start_dt=_isoformat(start), end_dt=_isoformat(start + self.duration),
+                     ristart_dt=_isoformat(start), rsstart_dt=_isoformat(self.start_dt))
+        return event
+
+    @property
+    def exceptions(self):
+        """True when occurrences were deleted or changed on their own"""
+        return bool(self.__exdates or self.__overrides)
+
+    def _periodic(self):
+        """
+        (first start epoch, period, number of occurrences) of a rule whose occurrences are evenly spaced in absolute
+        time, i.e. DAILY or WEEKLY with only INTERVAL, COUNT and UNTIL in a fixed offset, otherwise None
+        """
+        if self.__periodic is not False:
+            return self.__periodic
+        self.__periodic = None
+        if self.tzinfo is not None and not isinstance(self.tzinfo, datetime.timezone):
+            return None
+        parts = dict(part.split('=', 1) for part in self.rrule.upper().replace('RRULE:', '').split(';') if '=' in part)
+        if not set(parts) <= _PERIODIC_PARTS or parts.get('FREQ') not in _SECONDS:
+            return None
+        first = epoch_seconds(self.start_dt)
+        period = _SECONDS[parts['FREQ']] * int(parts.get('INTERVAL', 1))
+        limit = int(parts['COUNT']) if 'COUNT' in parts else _UNBOUNDED
+        if 'UNTIL' in parts:
+            rule = self.rule
+            last = rule[-1] if rule.count() else None
+            limit = min(limit, (epoch_seconds(self._localize(last)) - first) // period + 1 if last is not None else 0)
+        self.__periodic = (first, period, limit)
+        return self.__periodic
+
+    def arrays(self, start_dt, end_dt):
+        """
+        Starts and ends of the occurrences overlapping [start_dt, end_dt) as ``datetime64[s]`` UTC arrays sorted by
+        start. Evenly spaced rules (DAILY/WEEKLY with INTERVAL, COUNT, UNTIL) in a fixed offset are computed with
+        array arithmetic without expanding the rule. Requires numpy.
+        """
+        np = optional_import('numpy')
+        if np is None:
+            raise ImportError('numpy is required for occurrence arrays: python -m pip install numpy')
+        start_dt, end_dt = self._aware(start_dt), self._aware(end_dt)
+        duration = int(self.duration.total_seconds())
+        periodic = self._periodic()
+        if periodic is not None:
+            first, period, limit = periodic
+            _, starts = _periodic_starts(np, [first], [period], [limit], [duration], epoch_seconds(start_dt),
+                                         epoch_seconds(end_dt))
+        else:
+            starts = np.fromiter((epoch_seconds(s) for s in self._generated(start_dt, end_dt)), dtype=np.int64)
+        if self.__exdates or self.__overrides:
+            removed = np.fromiter(list(self.__exdates) + list(self.__overrides), dtype=np.int64)
+            starts = starts[~np.isin(starts, removed)]
+        ends = starts + duration
+        moved = []
+        for event in self.__overrides.values():
+            start, end = self._aware(_field(event, 'start_dt')), self._aware(_field(event, 'end_dt'))
+            if start < end_dt and (end > start_dt or start >= start_dt):
+                moved.append((epoch_seconds(start), epoch_seconds(end)))
+        if moved:
+            starts = np.concatenate([starts, np.array([m[0] for m in moved], dtype=np.int64)])
+            ends = np.concatenate([ends, np.array([m[1] for m in moved], dtype=np.int64)])
+            order = np.argsort(starts, kind='stable')
+            starts, ends = starts[order], ends[order]
+        return starts.view('datetime64[s]'), ends.view('datetime64[s]')
+
+
+class RecurrenceEngine:
+    """
+    Answers window queries over recurring events locally. Series are built from the events of a collection (or any
+    series definitions): the first time a series is seen its rule and duration are taken, after that every window
+    is expanded from the rule without asking the api again.
+
+    Instances returned by the api for a window are compared with the rule: instances moved or edited on their own are
+    stored as overrides and, for the windows given to ``add``, occurrences the rule expects but the api did not return
+    are recorded as deleted.
+
+        engine = calendar.get_recurrences(start_dt, end_dt)
+        engine.expand(datetime.date(2025, 3, 1), datetime.date(2025, 4, 1))
+        engine.arrays(start_dt, end_dt)
+
+    :param events: optional iterable of Event objects or event dictionaries
+    :param start_dt: start of the window events were fetched for, enables deleted occurrence detection
+    :param end_dt: end of that window
+    """
+    def __init__(self, events=(), start_dt=None, end_dt=None):
+        self.__series = {}
+        self.__singles = []
+        self.add(events, start_dt, end_dt)
+
+    def __len__(self):
+        return len(self.__series)
+
+    def __contains__(self, series_id):
+        return str(series_id) in self.__series
+
+    def __getitem__(self, series_id):
+        return self.__series[str(series_id)]
+
+    @property
+    def series(self):
+        return list(self.__series.values())
+
+    def add_series(self, series):
+        self.__series[str(series.series_id)] = series
+        return series
+
+    def add(self, events, start_dt=None, end_dt=None):
+        """
+        Adds the events of a collection. Recurring instances are grouped into series, other events are kept as is.
+        :param start_dt: start of the window the collection covers, with end_dt enables deleted occurrence detection
+        """
+        seen = {}
+        for event in events:
+            if not _field(event, 'rrule'):
+                self.__singles.append(_as_dict(event))
+                continue
+            event = _as_dict(event)
+            key = _series_key(event)
+            series = self.__series.get(key)
+            if series is None:
+                first_start = event.get('rsstart_dt') or event.get('start_dt')
+                length = parse_datetime(event['end_dt']) - parse_datetime(event['start_dt'])
+                series = Series(key, event['rrule'], first_start, parse_datetime(first_start) + length,
+                                tz=event.get('tz'), template=event)
+                self.__series[key] = series
+            original = event.get('ristart_dt') or event.get('start_dt')
+            seen.setdefault(key, set()).add(series._key(original))
+            if self._changed(series, event, original):
+                series.override(original, event)
+
+        if start_dt is not None and end_dt is not None:
+            for key in seen:
+                series = self.__series[key]
+                for start in series._generated(series._aware(start_dt), series._aware(end_dt)):
+                    if epoch_seconds(start) not in seen[key]:
+                        series.exclude(start)
+        return self
+
+    @staticmethod
+    def _changed(series, event, original):
+        if series._key(event['start_dt']) != series._key(original):
+            return True
+        if parse_datetime(event['end_dt']) - parse_datetime(event['start_dt']) != series.duration:
+            return True
+        return any(event.get(name) != series.template.get(name) for name in _INSTANCE_FIELDS)
+
+    def occurrences(self, start_dt, end_dt, series_ids=None):
+        """Occurrence tuples of the series (all by default) overlapping [start_dt, end_dt), sorted by start"""
+        selected = self.__series.values() if series_ids is None else [self.__series[str(s)] for s in series_ids]
+        found = [occurrence for series in selected for occurrence in series.between(start_dt, end_dt)]
+        found.sort(key=lambda occurrence: epoch_seconds(occurrence.start_dt))
+        return found
+
+    def expand(self, start_dt, end_dt, subcalendar_ids=None):
+        """
+        Event dictionaries of every event overlapping [start_dt, end_dt): non recurring events and each occurrence of
+        the series, in the shape the api returns them, sorted by start. Dates and naive bounds are wall clock time in
+        the timezone of each series or event.
+        :param subcalendar_ids: optional list of subcalendar ids events have to belong to
+        """
+        wanted = set(subcalendar_ids) if subcalendar_ids is not None else None
+        found = [(epoch_seconds(o.start_dt), o.event) for o in self.occurrences(start_dt, end_dt)]
+        for event in self.__singles:
+            start, end = epoch_seconds(event.get('start_dt')), epoch_seconds(event.get('end_dt'))
+            if start is None:
+                continue
+            tzinfo = _event_tzinfo(event)
+            lower, upper = epoch_seconds(_bound(start_dt, tzinfo)), epoch_seconds(_bound(end_dt, tzinfo))
+            if start < upper and (end > lower or start >= lower):
+                found.append((start, event))
+        if wanted is not None:
+            found = [item for item in found if wanted.intersection(item[1].get('subcalendar_ids') or ())]
+        found.sort(key=lambda item: item[0])
+        return [event for _, event in found]
+
+    def arrays(self, start_dt, end_dt, series_ids=None):
+        """
+        Occurrences of the series overlapping [start_dt, end_dt) as OccurrenceArrays of parallel numpy arrays
+        (``series_ids`` object array, ``start_dt`` / ``end_dt`` ``datetime64[s]`` UTC) sorted by start. Dates and
+        naive bounds are wall clock time in the timezone of each series, as in Series.between.
+        """
+        np = optional_import('numpy')
+        if np is None:
+            raise ImportError('numpy is required for occurrence arrays: python -m pip install numpy')
+        selected = self.__series.values() if series_ids is None else [self.__series[str(s)] for s in series_ids]
+        ids, starts, ends = [], [], []
+
+        # evenly spaced series without exceptions are expanded together in one pass
+        periodic, others = [], []
+        for series in selected:
+            (periodic if series._periodic() is not None and not series.exceptions else others).append(series)
+        if periodic:
+            first, period, limit = zip(*(series._periodic() for series in periodic))
+            duration = [int(series.duration.total_seconds()) for series in periodic]
+            lower = np.array([epoch_seconds(series._aware(start_dt)) for series in periodic], dtype=np.int64)
+            upper = np.array([epoch_seconds(series._aware(end_dt)) for series in periodic], dtype=np.int64)
+            position, series_starts = _periodic_starts(np, first, period, limit, duration, lower, upper)
+            ids.append(np.array([series.series_id for series in periodic], dtype=object)[position])
+            starts.append(series_starts.view('datetime64[s]'))
+            ends.append((series_starts + np.asarray(duration, dtype=np.int64)[position]).view('datetime64[s]'))
+
+        for series in others:
+            series_starts, series_ends = series.arrays(start_dt, end_dt)
+            ids.append(np.full(len(series_starts), series.series_id, dtype=object))
+            starts.append(series_starts)
+            ends.append(series_ends)
+        if not starts:
+            empty = np.array([], dtype='datetime64[s]')
+            return OccurrenceArrays(np.array([], dtype=object), empty, empty.copy())
+        ids, starts, ends = np.concatenate(ids), np.concatenate(starts), np.concatenate(ends)
+        order = np.argsort(starts, kind='stable')
+        return OccurrenceArrays(ids[order], starts[order], ends[order])
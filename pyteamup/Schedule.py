@@ -0,0 +1,138 @@
+"""Conflict detection and free slot search over a set of events"""
+
+import datetime
+
+from pyteamup.utils.utilities import parse_datetime
+from pyteamup.utils.intervals import IntervalIndex
+
+
+def _field(event, name):
+    return event.get(name) if isinstance(event, dict) else getattr(event, name)
+
+
+class Schedule:
+    """
+    Interval index over events keyed by subcalendar, answering overlap queries in O(log n + k).
+
+    All comparisons are done on timezone aware datetimes: naive values (in events or arguments) are read in ``tz``,
+    dates as midnight in ``tz``. All day events block whole days from midnight of their start date to midnight after
+    their end date, in the timezone of the event.
+
+        schedule = Schedule(calendar.get_event_collection(start_dt, end_dt))
+        schedule.conflicts()
+        schedule.free_slots(datetime.timedelta(hours=1), start_dt, end_dt, subcalendar_ids=[room_a, room_b], count=5)
+
+    Subcalendars are keyed by ``str(id)`` like Calendar and SubCalendar, so ids can be given as int or str. Asking
+    about a subcalendar the schedule does not know raises KeyError, a known subcalendar without events is free.
+
+    :param events: iterable of Event objects or event dictionaries
+    :param tz: <tzinfo> timezone assumed for naive datetimes and used for returned slots, default UTC
+    :param subcalendar_ids: optional ids of every subcalendar the events were fetched for, by default the
+                            subcalendars of the events
+    """
+    def __init__(self, events, tz=datetime.timezone.utc, subcalendar_ids=None):
+        self.tz = tz
+        by_subcalendar = {str(subcal_id): [] for subcal_id in subcalendar_ids or ()}
+        self.__events = []
+        for event in events:
+            bounds = self.event_bounds(event)
+            if bounds is None:
+                continue
+            self.__events.append(event)
+            for subcal_id in _field(event, 'subcalendar_ids') or ():
+                by_subcalendar.setdefault(str(subcal_id), []).append((bounds[0], bounds[1], event))
+        self.__indexes = {subcal_id: IntervalIndex(intervals) for subcal_id, intervals in by_subcalendar.items()}
+
+    def __len__(self):
+        return len(self.__events)
+
+    @property
+    def subcalendar_ids(self):
+        return list(self.__indexes)
+
+    def _aware(self, value):
+        if isinstance(value, datetime.date) and not isinstance(value, datetime.datetime):
+            value = datetime.datetime(value.year, value.month, value.day)
+        value = parse_datetime(value)
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=self.tz)
+        return value
+
+    def event_bounds(self, event):
+        """Returns the (start, end) of the time an event blocks, or None if it has no dates"""
+        start, end = _field(event, 'start_dt'), _field(event, 'end_dt')
+        if not start or not end:
+            return None
+        start, end = self._aware(start), self._aware(end)
+        if _field(event, 'all_day'):
+            start = start.replace(hour=0, minute=0, second=0, microsecond=0)
+            end = end.replace(hour=0, minute=0, second=0, microsecond=0) + datetime.timedelta(1)
+        return start, end
+
+    def _selected(self, subcalendar_ids):
+        if subcalendar_ids is None:
+            return list(self.__indexes)
+        if isinstance(subcalendar_ids, (str, int)):
+            subcalendar_ids = [subcalendar_ids]
+        selected = [str(subcal_id) for subcal_id in subcalendar_ids]
+        unknown = [subcal_id for subcal_id in selected if subcal_id not in self.__indexes]
+        if unknown:
+            raise KeyError(f'Subcalendars not in the schedule: {", ".join(unknown)}')
+        return selected
+
+    def overlapping(self, start_dt, end_dt, subcalendar_ids=None):
+        """Events overlapping [start_dt, end_dt) in the given subcalendars (all by default), each listed once"""
+        start_dt, end_dt = self._aware(start_dt), self._aware(end_dt)
+        found = {}
+        for subcal_id in self._selected(subcalendar_ids):
+            for event in self.__indexes[subcal_id].overlapping(start_dt, end_dt):
+                found.setdefault(id(event), event)
+        return sorted(found.values(), key=lambda event: self.event_bounds(event)[0])
+
+    def is_free(self, start_dt, end_dt, subcalendar_ids=None):
+        start_dt, end_dt = self._aware(start_dt), self._aware(end_dt)
+        return not any(self.__indexes[subcal_id].overlapping_positions(start_dt, end_dt)
+                       for subcal_id in self._selected(subcalendar_ids))
+
+    def conflicts(self, subcalendar_ids=None):
+        """
+        Double bookings per subcalendar.
+        :return: dict of subcalendar id to a list of (event, event) pairs that overlap
+        """
+        return {subcal_id: list(self.__indexes[subcal_id].overlapping_pairs())
+                for subcal_id in self._selected(subcalendar_ids)}
+
+    def free_slots(self, duration, start_dt, end_dt, subcalendar_ids=None, count=1, step=None):
+        """
+        Finds the first ``count`` slots of length ``duration`` between start_dt and end_dt during which none of the
+        given subcalendars has an event.
+
+        :param duration: <timedelta> length of a slot
+        :param start_dt: start of the search range
+        :param end_dt: end of the search range
+        :param subcalendar_ids: subcalendars that all have to be free, default every indexed subcalendar
+        :param count: <int> number of slots to return
+        :param step: <timedelta> distance between consecutive slots inside one free gap, default ``duration``
+        :return: list of (start, end) datetime tuples in ``tz``
+        """
+        if duration <= datetime.timedelta(0):
+            raise ValueError('duration must be positive')
+        step = step or duration
+        start_dt, end_dt = self._aware(start_dt), self._aware(end_dt)
+
+        busy = []
+        for subcal_id in self._selected(subcalendar_ids):
+            index = self.__indexes[subcal_id]
+            busy.extend((index.starts[i], index.ends[i]) for i in index.overlapping_positions(start_dt, end_dt))
+        busy.sort()
+
+        slots = []
+        cursor = start_dt
+        for busy_start, busy_end in busy + [(end_dt, end_dt)]:
+            while len(slots) < count and cursor + duration <= min(busy_start, end_dt):
+                slots.append((cursor.astimezone(self.tz), (cursor + duration).astimezone(self.tz)))
+                cursor += step
+            if len(slots) >= count or busy_start >= end_dt:
+                break
+            cursor = max(cursor, busy_end)
+        return slots
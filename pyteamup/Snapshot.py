@@ -0,0 +1,538 @@
+"""
+Compact, versioned binary snapshots of event sets, opened through a memory map and decoded one event at a time.
+
+Layout (little endian, every section aligned to 8 bytes):
+
+    header      magic ``PTUPSNAP``, version, flags, column count, row count, metadata offset and size
+    directory   one entry per column: name, kind, offset and size of its data
+    columns     BOOL   int8 per row (-1 for None)
+                TIME   int64 epoch seconds per row (-2**63 for None), int16 utc offset in minutes (32767 if naive)
+                TEXT   int32 code per row (-1 for None) into a string table of the distinct utf-8 values
+                VALUE  like TEXT with a table of distinct JSON encoded values
+                LIST   int64 row offsets (rows + 1) and int32 codes into a table of JSON encoded values
+    metadata    JSON: calendar id, creation time and caller supplied values
+
+Columns holding no value at all are left out. String tables store every distinct value once: a uint64 count, uint64
+offsets (count + 1) and the bytes. Columns whose values do not fit their kind (a non ISO date, a utc offset that is not
+a whole number of minutes, a version that is not a string, ...) are stored as VALUE so nothing is lost.
+"""
+
+import datetime
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from pyteamup.utils.utilities import parse_datetime, optional_import
+
+MAGIC = b'PTUPSNAP'
+VERSION = 1
+
+_HEADER = struct.Struct('<8sHHIQQQ')
+_ENTRY = struct.Struct('<32sB7xQQ')
+_COUNT = struct.Struct('<Q')
+
+BOOL, TIME, TEXT, VALUE, LIST = 1, 2, 3, 4, 5
+
+_NONE_TIME = -2 ** 63
+_NAIVE = 32767
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+_NAIVE_EPOCH = datetime.datetime(1970, 1, 1)
+
+# columns of the fields Event takes, anything else an event dict holds is kept in _extra
+FIELDS = (('id', VALUE), ('series_id', VALUE), ('remote_id', VALUE), ('subcalendar_ids', LIST),
+          ('subcalendar_id', VALUE), ('start_dt', TIME), ('end_dt', TIME), ('all_day', BOOL), ('title', TEXT),
+          ('who', TEXT), ('location', TEXT), ('notes', TEXT), ('rrule', TEXT), ('ristart_dt', TIME),
+          ('rsstart_dt', TIME), ('tz', TEXT), ('version', TEXT), ('readonly', BOOL), ('duration', VALUE),
+          ('creation_dt', TIME), ('update_dt', TIME), ('delete_dt', TIME), ('signup_enabled', BOOL),
+          ('signup_deadline', VALUE), ('signup_visibility', VALUE), ('signup_limit', VALUE),
+          ('comments_enabled', BOOL), ('comments_visibility', VALUE), ('custom', VALUE), ('attachments', VALUE))
+_FIELD_NAMES = frozenset(name for name, _ in FIELDS)
+_EXTRA = '_extra'
+
+_LITTLE_ENDIAN = sys.byteorder == 'little'
+_SCALARS = frozenset((str, int, float, bool))
+_BOOLS = {-1: None, 0: False, 1: True}
+_MISSING = object()
+
+
+def _padding(size):
+    return b'\0' * (-size % 8)
+
+
+def _little_endian(values):
+    if not _LITTLE_ENDIAN:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+_JSON_ENCODER = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False)
+
+
+def _encode_json(value):
+    return _JSON_ENCODER.encode(value).encode('utf-8')
+
+
+def _time_parts(value):
+    """(epoch seconds, offset minutes) of an api date, raises ValueError if the value is not one"""
+    if value is None:
+        return _NONE_TIME, 0
+    if not isinstance(value, (str, datetime.datetime)):
+        raise ValueError(value)
+    try:
+        dt = datetime.datetime.fromisoformat(value) if isinstance(value, str) else value
+    except ValueError:
+        dt = parse_datetime(value)
+    if dt is None or dt.microsecond:
+        raise ValueError(value)
+    if dt.tzinfo is None:
+        return int((dt - _NAIVE_EPOCH).total_seconds()), _NAIVE
+    offset = int(dt.utcoffset().total_seconds())
+    if offset % 60:
+        # offsets are stored in whole minutes, such a column is kept as VALUE instead
+        raise ValueError(value)
+    return int(dt.timestamp()), offset // 60
+
+
+class _TableWriter:
+    def __init__(self, encode):
+        self.encode = encode
+        self.codes = {}
+        self.scalars = {}
+        self.values = []
+
+    def code(self, value):
+        if value is None:
+            return -1
+        # scalars and empty containers are looked up before being encoded, keyed with their type since 1, 1.0 and
+        # True are equal
+        if value.__class__ in _SCALARS:
+            scalar = (value.__class__, value)
+        elif not value and value.__class__ in (list, dict):
+            scalar = (value.__class__, None)
+        else:
+            scalar = None
+        if scalar is not None:
+            code = self.scalars.get(scalar)
+            if code is not None:
+                return code
+        encoded = self.encode(value)
+        code = self.codes.get(encoded)
+        if code is None:
+            code = self.codes[encoded] = len(self.values)
+            self.values.append(encoded)
+        if scalar is not None:
+            self.scalars[scalar] = code
+        return code
+
+    def to_bytes(self):
+        offsets = array('Q', [0])
+        for encoded in self.values:
+            offsets.append(offsets[-1] + len(encoded))
+        blob = b''.join(self.values)
+        return _COUNT.pack(len(self.values)) + _little_endian(offsets) + blob + _padding(len(blob))
+
+
+def _encode_column(kind, values):
+    """Bytes of one column, raises ValueError (or TypeError) if a value does not fit the kind"""
+    if kind == BOOL:
+        codes = array('b')
+        for value in values:
+            if value is not None and not isinstance(value, bool):
+                raise ValueError(value)
+            codes.append(-1 if value is None else int(value))
+        return codes.tobytes() + _padding(len(codes))
+    if kind == TIME:
+        seconds, offsets = array('q'), array('h')
+        for value in values:
+            second, offset = _time_parts(value)
+            seconds.append(second)
+            offsets.append(offset)
+        return _little_endian(seconds) + _little_endian(offsets) + _padding(len(offsets) * 2)
+    if kind in (TEXT, VALUE):
+        if kind == TEXT:
+            if any(value is not None and not isinstance(value, str) for value in values):
+                raise ValueError('not text')
+            table = _TableWriter(lambda value: value.encode('utf-8'))
+        else:
+            table = _TableWriter(_encode_json)
+        codes = array('i', (table.code(value) for value in values))
+        return _little_endian(codes) + _padding(len(codes) * 4) + table.to_bytes()
+    if kind == LIST:
+        table = _TableWriter(_encode_json)
+        indptr, codes = array('q', [0]), array('i')
+        for value in values:
+            if value is not None and not isinstance(value, (list, tuple)):
+                raise ValueError(value)
+            codes.extend(table.code(item) for item in (value or ()))
+            indptr.append(len(codes))
+        return _little_endian(indptr) + _little_endian(codes) + _padding(len(codes) * 4) + table.to_bytes()
+    raise ValueError(f'Unknown column kind {kind}')
+
+
+def _as_dict(event):
+    if isinstance(event, dict):
+        return event
+    return event.to_dict()
+
+
+def dumps_snapshot(events, calendar_id=None, metadata=None):
+    """
+    Encodes events as a snapshot.
+
+    :param events: iterable of Event objects or event dicts, or an EventTable
+    :param calendar_id: <str> optional calendar key recorded in the snapshot, taken from the first Event if not given.
+                        The api key is never stored.
+    :param metadata: <dict> optional JSON serializable values stored along with the events
+    :return: <bytes>
+    """
+    if hasattr(events, 'to_dicts'):
+        events = events.to_dicts()
+    records = []
+    for event in events:
+        if calendar_id is None and not isinstance(event, dict):
+            calendar_id = event.parent_calendar.calendar_id
+        records.append(_as_dict(event))
+
+    columns = []
+    for name, kind in FIELDS:
+        values = [record.get(name) for record in records]
+        if not any(value is not None for value in values):
+            # columns without values are left out and read back as None
+            continue
+        try:
+            data = _encode_column(kind, values)
+        except (ValueError, TypeError, OverflowError):
+            kind, data = VALUE, _encode_column(VALUE, values)
+        columns.append((name, kind, data))
+    extras = [{k: v for k, v in record.items() if k not in _FIELD_NAMES} or None for record in records]
+    if any(extras):
+        columns.append((_EXTRA, VALUE, _encode_column(VALUE, extras)))
+
+    meta = _encode_json({'calendar_id': calendar_id,
+                         'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+                         'metadata': metadata or {}})
+    offset = _HEADER.size + _ENTRY.size * len(columns)
+    directory = []
+    for name, kind, data in columns:
+        directory.append(_ENTRY.pack(name.encode('ascii'), kind, offset, len(data)))
+        offset += len(data)
+    header = _HEADER.pack(MAGIC, VERSION, 0, len(columns), len(records), offset, len(meta))
+    return b''.join([header] + directory + [data for _, _, data in columns] + [meta])
+
+
+def write_snapshot(path, events, calendar_id=None, metadata=None):
+    """
+    Writes events as a snapshot file, replacing it atomically. See dumps_snapshot.
+    :return: <int> size of the file in bytes
+    """
+    data = dumps_snapshot(events, calendar_id, metadata)
+    temporary = f'{path}.tmp'
+    with open(temporary, 'wb') as f:
+        f.write(data)
+    os.replace(temporary, path)
+    return len(data)
+
+
+class _Table:
+    """Distinct values of a TEXT, VALUE or LIST column, decoded on first use"""
+    def __init__(self, snapshot, start, decode):
+        count = _COUNT.unpack_from(snapshot._buffer, start)[0]
+        self.offsets = snapshot._typed(start + 8, start + 8 + (count + 1) * 8, 'Q')
+        self.blob_start = start + 8 + (count + 1) * 8
+        self.buffer = snapshot._buffer
+        self.decode = decode
+        self.values = {-1: None}
+
+    def __getitem__(self, code):
+        value = self.values.get(code, _MISSING)
+        if value is not _MISSING:
+            return value
+        raw = bytes(self.buffer[self.blob_start + self.offsets[code]:self.blob_start + self.offsets[code + 1]])
+        if raw == b'[]':
+            return []
+        value = self.decode(raw)
+        # lists and dicts are decoded again on every access so events never share a mutable value
+        if not isinstance(value, (list, dict)):
+            self.values[code] = value
+        return value
+
+    def take(self, codes):
+        """Values of a sequence of codes"""
+        get = self.values.get
+        values = []
+        for code in codes:
+            value = get(code, _MISSING)
+            values.append(self[code] if value is _MISSING else value)
+        return values
+
+
+def _decode_text(raw):
+    return raw.decode('utf-8')
+
+
+def _decode_json(raw):
+    return json.loads(raw)
+
+
+class _Column:
+    def __init__(self, snapshot, kind, start, rows):
+        self.kind = kind
+        self.start = start
+        self.__zones = {}
+        if kind == BOOL:
+            self.flags = snapshot._typed(start, start + rows, 'b')
+            self.get = self._bool
+        elif kind == TIME:
+            self.seconds = snapshot._typed(start, start + rows * 8, 'q')
+            self.offsets = snapshot._typed(start + rows * 8, start + rows * 10, 'h')
+            self.get = self._time
+        elif kind in (TEXT, VALUE):
+            self.codes = snapshot._typed(start, start + rows * 4, 'i')
+            table_start = start + rows * 4 + (-rows * 4 % 8)
+            self.table = _Table(snapshot, table_start, _decode_text if kind == TEXT else _decode_json)
+            self.get = self._value
+        elif kind == LIST:
+            self.indptr = snapshot._typed(start, start + (rows + 1) * 8, 'q')
+            n_codes = self.indptr[rows]
+            codes_start = start + (rows + 1) * 8
+            self.codes = snapshot._typed(codes_start, codes_start + n_codes * 4, 'i')
+            self.table = _Table(snapshot, codes_start + n_codes * 4 + (-n_codes * 4 % 8), _decode_json)
+            self.get = self._list
+        else:
+            raise ValueError(f'Unknown column kind {kind}, the snapshot may have been written by a newer pyteamup')
+
+    def __getitem__(self, row):
+        return self.get(row)
+
+    def values(self, start, stop):
+        """Decoded values of the rows start..stop, faster than reading them one by one"""
+        if self.kind == BOOL:
+            return [_BOOLS[value] for value in self.flags[start:stop]]
+        if self.kind in (TEXT, VALUE):
+            return self.table.take(self.codes[start:stop])
+        get = self.get
+        return [get(row) for row in range(start, stop)]
+
+    def _bool(self, row):
+        value = self.flags[row]
+        return None if value < 0 else bool(value)
+
+    def _value(self, row):
+        return self.table[self.codes[row]]
+
+    def _list(self, row):
+        return self.table.take(self.codes[self.indptr[row]:self.indptr[row + 1]])
+
+    def _time(self, row):
+        seconds = self.seconds[row]
+        if seconds == _NONE_TIME:
+            return None
+        offset = self.offsets[row]
+        if offset == _NAIVE:
+            return (_NAIVE_EPOCH + datetime.timedelta(seconds=seconds)).isoformat()
+        zone = self.__zones.get(offset)
+        if zone is None:
+            zone = self.__zones[offset] = datetime.timezone(datetime.timedelta(minutes=offset))
+        return datetime.datetime.fromtimestamp(seconds, zone).isoformat()
+
+
+class Snapshot:
+    """
+    Read side of a snapshot. Nothing is decoded when it is opened: ``record(i)`` builds the event dict of one row
+    from the columns and distinct strings are decoded once. Events are bound to the calendar given to ``open`` or
+    ``bind``, so a worker can load events saved by another process without their credentials ever touching the disk.
+
+        write_snapshot('events.snap', calendar.get_event_collection(start, end))
+        with Snapshot.open('events.snap', calendar) as snapshot:
+            evnt = snapshot[10]                  # Event bound to calendar
+            snapshot.get(event_id)
+            snapshot.epochs('start_dt')          # numpy int64 view of the start times, no copy
+
+    :param data: bytes-like object holding a snapshot
+    :param calendar: optional Calendar the events are bound to
+    """
+    def __init__(self, data, calendar=None):
+        self.__views = []
+        self._buffer = self._track(memoryview(data).cast('B'))
+        self.__mmap = None
+        self.__file = None
+        self.__calendar = calendar
+        self.__ids = None
+
+        if len(self._buffer) < _HEADER.size:
+            raise ValueError('Not a pyteamup snapshot')
+        magic, version, _, n_columns, rows, meta_offset, meta_size = _HEADER.unpack_from(self._buffer)
+        if magic != MAGIC:
+            raise ValueError('Not a pyteamup snapshot')
+        if version > VERSION:
+            raise ValueError(f'Snapshot version {version} is newer than the supported version {VERSION}')
+        self.version = version
+        self.__rows = rows
+        meta = json.loads(bytes(self._buffer[meta_offset:meta_offset + meta_size]))
+        self.calendar_id = meta.get('calendar_id')
+        self.created = meta.get('created')
+        self.metadata = meta.get('metadata') or {}
+
+        self.__columns = {}
+        for i in range(n_columns):
+            name, kind, offset, _ = _ENTRY.unpack_from(self._buffer, _HEADER.size + i * _ENTRY.size)
+            self.__columns[name.rstrip(b'\0').decode('ascii')] = _Column(self, kind, offset, rows)
+        self.__getters = [(name, self.__columns[name].get) for name, _ in FIELDS if name in self.__columns]
+        self.__absent = [name for name, _ in FIELDS if name not in self.__columns]
+        self.__extra = self.__columns.get(_EXTRA)
+
+    @classmethod
+    def open(cls, path, calendar=None):
+        """Opens a snapshot file through a read only memory map, the file is read as rows are accessed"""
+        f = open(path, 'rb')
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            f.close()
+            raise
+        snapshot = cls(mapped, calendar)
+        snapshot.__mmap = mapped
+        snapshot.__file = f
+        return snapshot
+
+    def _track(self, view):
+        self.__views.append(view)
+        return view
+
+    def _typed(self, start, end, typecode):
+        """Array of the little endian values between two byte offsets, a view of the buffer where possible"""
+        if _LITTLE_ENDIAN:
+            return self._track(self._buffer[start:end].cast(typecode))
+        values = array(typecode, bytes(self._buffer[start:end]))
+        values.byteswap()
+        return values
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        Releases the memory map, events already built stay usable. Arrays returned by ``epochs`` keep the map open
+        until they are garbage collected.
+        """
+        self.__columns = {}
+        self.__getters = []
+        self.__extra = None
+        try:
+            for view in reversed(self.__views):
+                view.release()
+            if self.__mmap is not None:
+                self.__mmap.close()
+        except BufferError:
+            pass
+        self.__views = []
+        if self.__file is not None:
+            self.__file.close()
+            self.__mmap = self.__file = None
+
+    def __len__(self):
+        return self.__rows
+
+    def __getitem__(self, index):
+        """Event at a row index, bound to the snapshot's calendar"""
+        if index < 0:
+            index += self.__rows
+        return self._event(self.record(index))
+
+    def __iter__(self):
+        for record in self.records():
+            yield self._event(record)
+
+    @property
+    def calendar(self):
+        return self.__calendar
+
+    @property
+    def columns(self):
+        return list(self.__columns)
+
+    def bind(self, calendar):
+        """Sets the Calendar events are bound to"""
+        self.__calendar = calendar
+        return self
+
+    def _event(self, record):
+        if self.__calendar is None:
+            raise ValueError('The snapshot is not bound to a calendar, pass one to Snapshot.open or bind')
+        from pyteamup.Event import Event
+        return Event(self.__calendar, **{k: v for k, v in record.items() if k in _FIELD_NAMES})
+
+    def record(self, index):
+        """The event dict of a row as the api returned it, fields absent when it was saved are None"""
+        if not 0 <= index < self.__rows:
+            raise IndexError('snapshot index out of range')
+        record = dict.fromkeys(self.__absent)
+        for name, get in self.__getters:
+            record[name] = get(index)
+        if self.__extra is not None:
+            record.update(self.__extra[index] or {})
+        return record
+
+    def records(self, chunk_size=4096):
+        """Generator of every event dict, decoded one column at a time for chunk_size rows at once"""
+        names = [name for name, _ in self.__getters]
+        columns = [self.__columns[name] for name in names]
+        for start in range(0, self.__rows, chunk_size):
+            stop = min(start + chunk_size, self.__rows)
+            extras = self.__extra.values(start, stop) if self.__extra is not None else None
+            for position, row in enumerate(zip(*[column.values(start, stop) for column in columns])):
+                record = dict.fromkeys(self.__absent)
+                record.update(zip(names, row))
+                if extras is not None and extras[position]:
+                    record.update(extras[position])
+                yield record
+
+    def events(self, calendar=None):
+        """
+        All events as Event objects.
+        :param calendar: optional Calendar to bind them to instead of the snapshot's
+        """
+        if calendar is not None:
+            self.bind(calendar)
+        return list(self)
+
+    def column(self, name):
+        """Decoded values of one column for every row"""
+        if name not in self.__columns and name in _FIELD_NAMES:
+            return [None] * self.__rows
+        return self.__columns[name].values(0, self.__rows)
+
+    def epochs(self, name):
+        """numpy int64 view of a date column in epoch seconds, -2**63 where the date is missing. Requires numpy."""
+        np = optional_import('numpy')
+        if np is None:
+            raise ImportError('numpy is required for column arrays: python -m pip install numpy')
+        column = self.__columns[name]
+        if column.kind != TIME:
+            raise TypeError(f'{name} is not a date column')
+        return np.frombuffer(self._buffer, dtype='<i8', count=self.__rows, offset=column.start)
+
+    def index(self, event_id):
+        """Row of an event id, the id index is built on first use"""
+        if self.__ids is None:
+            ids = self.__columns['id']
+            self.__ids = {str(ids[row]): row for row in range(self.__rows)}
+        return self.__ids[str(event_id)]
+
+    def get(self, event_id, returnas='event'):
+        """
+        Event of an id from the snapshot.
+        :param returnas: <str> `event` or `dict`
+        :raises: KeyError if the id is not in the snapshot
+        """
+        if returnas not in ('event', 'dict'):
+            raise TypeError('Returnas not recognized. Recognized values: event, dict')
+        record = self.record(self.index(event_id))
+        return record if returnas == 'dict' else self._event(record)
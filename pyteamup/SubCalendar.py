@@ -1,4 +1,102 @@
 """SubCalendar Class with respective control methods"""
 
+
 class SubCalendar:
-    raise NotImplementedError
\ No newline at end of file
+    """
+    A TeamUp subcalendar. Reads like the dictionary sent by the api (``subcal['id']``, ``subcal.get('color')``) so
+    code written against the raw list keeps working, and gives access to the events of the subcalendar.
+
+    Events are served from collections of the whole calendar shared by all of its subcalendars: the views of several
+    subcalendars over the same window cost one request, see Calendar.subcalendar_events.
+    """
+    def __init__(self, parent_calendar, data):
+        self.__parent_calendar = parent_calendar
+        self.__data = data
+
+    def __str__(self):
+        return str(self.name)
+
+    def __repr__(self):
+        return f'SubCalendar({self.subcalendar_id!r}, {self.name!r})'
+
+    def __eq__(self, other):
+        if isinstance(other, SubCalendar):
+            return self.__data == other.to_dict()
+        if isinstance(other, dict):
+            return self.__data == other
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(str(self.subcalendar_id))
+
+    def __getitem__(self, key):
+        return self.__data[key]
+
+    def __contains__(self, key):
+        return key in self.__data
+
+    def __iter__(self):
+        return iter(self.__data)
+
+    def __len__(self):
+        return len(self.__data)
+
+    def get(self, key, default=None):
+        return self.__data.get(key, default)
+
+    def keys(self):
+        return self.__data.keys()
+
+    def values(self):
+        return self.__data.values()
+
+    def items(self):
+        return self.__data.items()
+
+    def to_dict(self):
+        return dict(self.__data)
+
+    @property
+    def parent_calendar(self):
+        return self.__parent_calendar
+
+    @property
+    def subcalendar_id(self):
+        return self.__data['id']
+
+    @property
+    def name(self):
+        return self.__data.get('name')
+
+    @property
+    def active(self):
+        return self.__data.get('active')
+
+    @property
+    def color(self):
+        return self.__data.get('color')
+
+    @property
+    def overlap(self):
+        return self.__data.get('overlap')
+
+    @property
+    def parent_id(self):
+        return self.__data.get('parent_id')
+
+    @property
+    def readonly(self):
+        return self.__data.get('readonly')
+
+    def events(self, start_dt=None, end_dt=None, returnas='events', refresh=False):
+        """
+        Events of this subcalendar between start_dt and end_dt, from the collection of the calendar shared by every
+        subcalendar view of the same window.
+
+        :param start_dt: if set as None then set as today minus 30 days
+        :param end_dt:  if left as None then set as today plus 180 days
+        :param returnas: <str> `events` `dataframe` `dict` or `columnar`
+        :param refresh: <bool> fetch the window again instead of using the shared collection
+        """
+        return self.__parent_calendar.subcalendar_events(self.subcalendar_id, start_dt, end_dt, returnas=returnas,
+                                                         refresh=refresh)[self.subcalendar_id]
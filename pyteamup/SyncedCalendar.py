@@ -0,0 +1,219 @@
+"""Local SQLite mirror of a calendar kept up to date with get_changed_events"""
+
+import datetime
+import json
+import sqlite3
+import threading
+import time
+
+from pyteamup.utils.utilities import *
+from pyteamup.utils.constants import *
+from pyteamup.utils.responses import collection_range, events_as, event_as
+from pyteamup.Event import Event
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id TEXT PRIMARY KEY,
+    start_ts INTEGER,
+    end_ts INTEGER,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_start_ts ON events (start_ts);
+CREATE INDEX IF NOT EXISTS events_end_ts ON events (end_ts);
+CREATE TABLE IF NOT EXISTS event_subcalendars (
+    event_id TEXT NOT NULL,
+    subcalendar_id TEXT NOT NULL,
+    PRIMARY KEY (event_id, subcalendar_id)
+);
+CREATE INDEX IF NOT EXISTS event_subcalendars_subcalendar ON event_subcalendars (subcalendar_id);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# the server timestamp of a full resync is not known, so it is recorded this many seconds early and the overlap is
+# picked up again by the next delta
+RESYNC_MARGIN = 300
+
+
+class SyncedCalendar:
+    """
+    Keeps every event of a Calendar in a local SQLite database and brings it up to date from the modifiedSince
+    deltas of ``Calendar.get_changed_events``. Deleted events (those with a ``delete_dt``) are removed. When the last
+    sync is older than the 30 day limit of the api, or the mirror is empty, the window is downloaded again in full.
+
+    Reads (``get_event``, ``get_event_collection``) are answered from the database without any api call.
+
+        mirror = SyncedCalendar(calendar, 'calendar.sqlite')
+        mirror.sync()
+        events = mirror.get_event_collection(start_dt, end_dt)
+
+    :param calendar: Calendar to mirror
+    :param path: <str> SQLite database file, defaults to an in-memory database
+    :param start_dt: start of the window downloaded on a full resync, default today minus 30 days
+    :param end_dt: end of the window downloaded on a full resync, default today plus 180 days
+    :param window_days: <int> number of days fetched per request during a full resync
+    """
+    def __init__(self, calendar, path=':memory:', start_dt=None, end_dt=None, window_days=DEFAULT_WINDOW_DAYS):
+        self.__calendar = calendar
+        self.__path = path
+        self.start_dt = start_dt
+        self.end_dt = end_dt
+        self.window_days = window_days
+        self.__lock = threading.RLock()
+        self.__conn = sqlite3.connect(path, check_same_thread=False)
+        self.__conn.executescript(_SCHEMA)
+        stored_id = self._get_state('calendar_id')
+        if stored_id is None:
+            self._set_state('calendar_id', calendar.calendar_id)
+            self.__conn.commit()
+        elif stored_id != calendar.calendar_id:
+            raise ValueError(f'{path} mirrors calendar {stored_id}, not {calendar.calendar_id}')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        with self.__lock:
+            return self.__conn.execute('SELECT COUNT(*) FROM events').fetchone()[0]
+
+    def close(self):
+        with self.__lock:
+            self.__conn.close()
+
+    @property
+    def calendar(self):
+        return self.__calendar
+
+    @property
+    def path(self):
+        return self.__path
+
+    @property
+    def last_timestamp(self):
+        """Server timestamp the mirror is up to date with, None if it has never been synced"""
+        value = self._get_state('timestamp')
+        return int(value) if value is not None else None
+
+    def _get_state(self, key):
+        with self.__lock:
+            row = self.__conn.execute('SELECT value FROM sync_state WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, key, value):
+        self.__conn.execute('INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)', (key, str(value)))
+
+    @staticmethod
+    def _rows(event_dict):
+        """Row of the events table and rows of the event_subcalendars table of an event dictionary"""
+        event_id = str(event_dict['id'])
+        row = (event_id, epoch_seconds(event_dict.get('start_dt')), epoch_seconds(event_dict.get('end_dt')),
+               json.dumps(event_dict))
+        return row, [(event_id, str(s)) for s in event_dict.get('subcalendar_ids') or ()]
+
+    def _upsert(self, event_dict):
+        row, subcalendar_rows = self._rows(event_dict)
+        self.__conn.execute('INSERT OR REPLACE INTO events (id, start_ts, end_ts, data) VALUES (?, ?, ?, ?)', row)
+        self.__conn.execute('DELETE FROM event_subcalendars WHERE event_id = ?', (row[0],))
+        self.__conn.executemany('INSERT OR IGNORE INTO event_subcalendars (event_id, subcalendar_id) VALUES (?, ?)',
+                                subcalendar_rows)
+
+    def _remove(self, event_id):
+        self.__conn.execute('DELETE FROM events WHERE id = ?', (str(event_id),))
+        self.__conn.execute('DELETE FROM event_subcalendars WHERE event_id = ?', (str(event_id),))
+
+    def apply_changes(self, events_json, timestamp):
+        """
+        Applies a list of changed event dictionaries and records the server timestamp they are current to.
+        :return: tuple of (number of upserted events, number of deleted events)
+        """
+        upserted = deleted = 0
+        with self.__lock, self.__conn:
+            for event_dict in events_json:
+                if event_dict.get('delete_dt'):
+                    self._remove(event_dict['id'])
+                    deleted += 1
+                else:
+                    self._upsert(event_dict)
+                    upserted += 1
+            self._set_state('timestamp', timestamp)
+        return upserted, deleted
+
+    def full_resync(self):
+        """
+        Replaces the content of the mirror with a fresh download of the sync window. The window is downloaded and
+        turned into rows first, readers keep being answered from the old content meanwhile, then the rows are swapped
+        in by one short transaction.
+        """
+        timestamp = int(time.time()) - RESYNC_MARGIN
+        start_dt, end_dt = collection_range(self.start_dt, self.end_dt)
+        rows, subcalendar_rows = {}, {}
+        for event_dict in self.__calendar.iter_events(start_dt, end_dt, returnas='dict', window_days=self.window_days):
+            if not event_dict.get('delete_dt'):
+                row, subcalendars = self._rows(event_dict)
+                rows[row[0]] = row
+                subcalendar_rows[row[0]] = subcalendars
+
+        with self.__lock, self.__conn:
+            self.__conn.execute('DELETE FROM events')
+            self.__conn.execute('DELETE FROM event_subcalendars')
+            self.__conn.executemany('INSERT INTO events (id, start_ts, end_ts, data) VALUES (?, ?, ?, ?)',
+                                    rows.values())
+            self.__conn.executemany('INSERT OR IGNORE INTO event_subcalendars (event_id, subcalendar_id) '
+                                    'VALUES (?, ?)', (r for group in subcalendar_rows.values() for r in group))
+            self._set_state('timestamp', timestamp)
+        return len(rows)
+
+    def sync(self):
+        """
+        Brings the mirror up to date. Uses the modifiedSince delta when possible and falls back to a full resync
+        when the mirror was never synced or the last sync is too old for the api.
+        :return: tuple of (number of upserted events, number of deleted events)
+        """
+        last = self.last_timestamp
+        if last is None or time.time() - last >= MODIFIED_SINCE_MAX_AGE - RESYNC_MARGIN:
+            return self.full_resync(), 0
+        events_json, timestamp = self.__calendar.get_changed_events(last, returnas='dict')
+        return self.apply_changes(events_json, timestamp)
+
+    def get_event(self, event_id, returnas='event'):
+        """Returns an event from the mirror, raises KeyError if it is not stored"""
+        if returnas not in ('event', 'series', 'dict'):
+            raise TypeError('Returnas not recognized. Recognized values: event, series, dict')
+        with self.__lock:
+            row = self.__conn.execute('SELECT data FROM events WHERE id = ?', (str(event_id),)).fetchone()
+        if row is None:
+            raise KeyError(f'Event {event_id} is not in the local mirror')
+        return event_as(self.__calendar, json.loads(row[0]), returnas, Event)
+
+    def get_event_collection(self, start_dt=None, end_dt=None, subcal_id=None, returnas='events'):
+        """
+        Events from the mirror overlapping start_dt..end_dt. Dates cover whole days in UTC (end_dt inclusive),
+        datetimes are used as given.
+
+        :param start_dt: if set as None then set as today minus 30 days
+        :param end_dt:  if left as None then set as today plus 180 days
+        :param subcal_id: optional str or list-like of subcalendar ids to restrict to
+        :param returnas: <str> `events` `dataframe` `dict` or `columnar`
+        """
+        if returnas not in ('events', 'dataframe', 'dict', 'columnar'):
+            raise TypeError('Returnas not recognized. Recognized values: events, dataframe, dict, columnar')
+        start_dt, end_dt = collection_range(start_dt, end_dt)
+        if not isinstance(end_dt, datetime.datetime):
+            end_dt = to_date(end_dt) + datetime.timedelta(1)
+
+        query = 'SELECT data FROM events WHERE start_ts < ? AND end_ts > ?'
+        params = [epoch_seconds(end_dt), epoch_seconds(start_dt)]
+        if subcal_id:
+            ids = subcal_id if isinstance(subcal_id, (list, tuple)) else [subcal_id]
+            query += (' AND id IN (SELECT event_id FROM event_subcalendars WHERE subcalendar_id IN (%s))'
+                      % ','.join('?' * len(ids)))
+            params.extend(str(i) for i in ids)
+        query += ' ORDER BY start_ts, id'
+        with self.__lock:
+            rows = self.__conn.execute(query, params).fetchall()
+        return events_as(self.__calendar, [json.loads(row[0]) for row in rows], returnas, Event)
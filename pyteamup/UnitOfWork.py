@@ -0,0 +1,96 @@
+"""Calendar level unit of work collecting Event changes and flushing them concurrently"""
+
+from collections import OrderedDict
+
+from pyteamup.utils.utilities import *
+from pyteamup.utils.constants import *
+from pyteamup.utils.bulk import BulkResult, bounded_map
+
+
+class UnitOfWork:
+    """
+    Records the changes made through Event setters while it is active, instead of sending one PUT per change, and
+    sends one PUT per changed event with all of its changes merged when the block exits without an exception. Changes
+    are keyed by event_id, so changes made through several Event objects of the same event go out in a single PUT. The
+    PUTs are sent concurrently and every Event changed is refreshed in place from the response. Reading an attribute inside the
+    block returns the value from before the change, as in Event batch mode.
+
+        with calendar.unit_of_work() as uow:
+            for evnt in events:
+                evnt.title = evnt.title.strip()
+        uow.conflicts         # events whose version changed on the server meanwhile
+
+    The unit of work is bound to the thread that opened it. Obtain one with ``Calendar.unit_of_work``.
+    """
+    def __init__(self, calendar, max_workers=DEFAULT_MAX_WORKERS):
+        self.__calendar = calendar
+        self.max_workers = max_workers
+        self.__changes = OrderedDict()
+        self.results = []
+        self.conflicts = []
+
+    def __enter__(self):
+        self.__calendar._begin_unit_of_work(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.__calendar._end_unit_of_work(self)
+        if exc_type is None:
+            self.flush()
+        else:
+            self.discard()
+
+    def __len__(self):
+        return len(self.__changes)
+
+    @property
+    def pending(self):
+        """List of (event, changes) waiting to be flushed, event being the first Event changed for its event_id"""
+        return [(events[0], changes) for events, changes in self.__changes.values()]
+
+    def record(self, event, update_dict):
+        """Merges update_dict into the pending changes of the event with the same event_id"""
+        events, changes = self.__changes.setdefault(str(event.event_id), ([], OrderedDict()))
+        if not any(other is event for other in events):
+            events.append(event)
+        changes.update(update_dict)
+
+    def discard(self):
+        self.__changes = OrderedDict()
+
+    def flush(self):
+        """
+        Sends the pending changes, one PUT per event, with at most max_workers in flight.
+        :return: list of BulkResult(index, ok, result, undo_id, error) in the order events were first changed, result
+                 is the refreshed Event
+        """
+        pending = list(self.__changes.values())
+        self.__changes = OrderedDict()
+        transport = self.__calendar._transport
+        instrumentation = self.__calendar._instrumentation
+
+        def put(item):
+            (event, *aliases), changes = item
+            with event._lock(), instrumentation.call('PUT', EVENT_ENDPOINT) as call:
+                payload = event._update_payload(changes)
+                call.sent(payload)
+                resp = call.response(transport.put(event.api_url, data=payload, headers=POST_HEADERS))
+                check_status_code(resp.status_code, resp)
+                event._apply_update_response(resp.content, call)
+            for alias in aliases:
+                with alias._lock():
+                    alias._apply_update_response(resp.content)
+
+        results = [None] * len(pending)
+        conflicted = set()
+        for index, _, error in bounded_map(put, pending, self.max_workers):
+            event = pending[index][0][0]
+            if error is not None:
+                if isinstance(error, VersionConflict):
+                    conflicted.add(index)
+                results[index] = BulkResult(index, False, event, None, error)
+            else:
+                results[index] = BulkResult(index, True, event, event.undo_id, None)
+        self.results = results
+        self.conflicts = [pending[index][0][0] for index in sorted(conflicted)]
+        return results
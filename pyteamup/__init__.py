@@ -12,5 +12,21 @@ __author__ = 'David Jones'
 name = 'pyTeamUp'
 
 from pyteamup.Calendar import Calendar
+from pyteamup.CalendarPool import CalendarPool, PoolResult
 from pyteamup.Event import Event
-
+from pyteamup.SubCalendar import SubCalendar
+from pyteamup.utils.exceptions import (TeamUpError, BadRequest, Unauthorized, Forbidden, NotFound, VersionConflict,
+                                       RateLimited, ServerError, ServiceUnavailable)
+from pyteamup.utils.ratelimit import RetryPolicy, TokenBucket, AdaptiveConcurrency
+from pyteamup.utils.cache import ResponseCache
+from pyteamup.utils.search import SearchIndex
+from pyteamup.utils.metrics import MetricsRegistry, RequestInfo
+from pyteamup.AsyncCalendar import AsyncCalendar
+from pyteamup.AsyncEvent import AsyncEvent
+from pyteamup.EventTable import EventTable
+from pyteamup.SyncedCalendar import SyncedCalendar
+from pyteamup.Schedule import Schedule
+from pyteamup.Recurrence import RecurrenceEngine, Series
+from pyteamup.Snapshot import Snapshot, write_snapshot, dumps_snapshot
+from pyteamup.ChangeWatcher import ChangeWatcher, AsyncChangeWatcher, Change
+from pyteamup.Reconcile import ReconcileReport
@@ -0,0 +1,79 @@
+"""Helpers for running many api calls concurrently with a bounded number in flight"""
+
+from collections import Counter, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+BulkResult = namedtuple('BulkResult', ['index', 'ok', 'result', 'undo_id', 'error'])
+BulkResult.__doc__ = """Outcome of one item of a bulk operation. ``result`` holds the returned value when ``ok`` and
+``error`` the raised exception otherwise."""
+
+
+def bounded_map(fn, items, max_workers):
+    """
+    Calls fn on every item on a thread pool keeping at most 2 * max_workers calls submitted at once, so large inputs
+    do not queue a future per item. Exceptions are captured instead of stopping the remaining calls.
+
+    :return: generator of (position, value, exception) tuples in completion order
+    """
+    items = iter(enumerate(items))
+    limit = max(1, max_workers) * 2
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = {}
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < limit:
+                try:
+                    position, item = next(items)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending[pool.submit(fn, item)] = position
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                position = pending.pop(future)
+                error = future.exception()
+                yield position, (None if error else future.result()), error
+
+
+def fair_map(fn, queues, max_workers, per_key=1):
+    """
+    Calls fn on the items of several queues on a thread pool, taking items from the queues in turn and keeping at
+    most per_key calls of one queue in flight, so a long queue cannot hold every worker while the others wait. Items
+    are only pulled from the queues when a worker is free. Exceptions are captured like in bounded_map.
+
+    :param queues: dict of key to an iterable of items
+    :return: generator of (key, item, value, exception) tuples in completion order
+    """
+    waiting = deque((key, iter(items)) for key, items in queues.items())
+    in_flight = Counter()
+    per_key = max(1, per_key)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = {}
+        while waiting or pending:
+            # round robin over the queues below their limit until every worker is busy
+            blocked = 0
+            while waiting and len(pending) < max_workers and blocked < len(waiting):
+                key, items = waiting[0]
+                if in_flight[key] >= per_key:
+                    waiting.rotate(-1)
+                    blocked += 1
+                    continue
+                try:
+                    item = next(items)
+                except StopIteration:
+                    waiting.popleft()
+                    continue
+                waiting.rotate(-1)
+                blocked = 0
+                in_flight[key] += 1
+                pending[pool.submit(fn, item)] = (key, item)
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                key, item = pending.pop(future)
+                in_flight[key] -= 1
+                error = future.exception()
+                yield key, item, (None if error else future.result()), error
@@ -0,0 +1,81 @@
+"""Bounded TTL + LRU cache for api responses"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from pyteamup.utils.constants import DEFAULT_CACHE_SIZE, DEFAULT_CACHE_TTL
+
+
+class ResponseCache:
+    """
+    Thread safe cache of decoded api responses keyed by (resource type, key). Entries expire after the time to live of
+    their resource type and the least recently used entry is evicted once ``maxsize`` entries are stored.
+
+    :param maxsize: <int> maximum number of entries
+    :param ttl: <dict> seconds to live per resource type (``event``, ``configuration``, ``subcalendars``), merged over
+                the defaults. A type mapped to 0 or None is not cached.
+    """
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = dict(DEFAULT_CACHE_TTL)
+        self.ttl.update(ttl or {})
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def get(self, kind, key=None, default=None):
+        """Returns the cached value or default, counting a hit or a miss"""
+        with self.__lock:
+            entry = self.__entries.get((kind, key))
+            if entry is not None:
+                expires, value = entry
+                if expires > time.monotonic():
+                    self.__entries.move_to_end((kind, key))
+                    self.hits += 1
+                    return value
+                del self.__entries[(kind, key)]
+                self.expirations += 1
+            self.misses += 1
+            return default
+
+    def set(self, kind, key, value):
+        ttl = self.ttl.get(kind)
+        if not ttl:
+            return
+        with self.__lock:
+            self.__entries[(kind, key)] = (time.monotonic() + ttl, value)
+            self.__entries.move_to_end((kind, key))
+            while len(self.__entries) > self.maxsize:
+                self.__entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, kind, key=None):
+        with self.__lock:
+            self.__entries.pop((kind, key), None)
+
+    def clear(self, kind=None):
+        """Drops every entry, or only those of one resource type"""
+        with self.__lock:
+            if kind is None:
+                self.__entries.clear()
+            else:
+                for entry_key in [k for k in self.__entries if k[0] == kind]:
+                    del self.__entries[entry_key]
+
+    def stats(self):
+        with self.__lock:
+            lookups = self.hits + self.misses
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'hit_rate': self.hits / lookups if lookups else 0.0,
+                    'evictions': self.evictions,
+                    'expirations': self.expirations,
+                    'size': len(self.__entries),
+                    'maxsize': self.maxsize}
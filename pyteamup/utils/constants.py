@@ -3,4 +3,31 @@ CHECK_ACCESS_BASE = '/check-access'
 EVENTS_BASE = '/events'
 SUBCALENDARS_BASE = '/subcalendars'
 CONFIGURATION_BASE = '/configuration'
-POST_HEADERS = {'Content-type': 'application/json'}
\ No newline at end of file
+CHECK_ACCESS_ENDPOINT = CHECK_ACCESS_BASE
+CONFIGURATION_ENDPOINT = '/{calendar}' + CONFIGURATION_BASE
+SUBCALENDARS_ENDPOINT = '/{calendar}' + SUBCALENDARS_BASE
+EVENTS_ENDPOINT = '/{calendar}' + EVENTS_BASE
+EVENT_ENDPOINT = '/{calendar}' + EVENTS_BASE + '/{event_id}'
+POST_HEADERS = {'Content-type': 'application/json'}
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = (5, 30)
+DEFAULT_MAX_CONCURRENCY = 100
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_PER_CALENDAR_WORKERS = 2
+DEFAULT_WINDOW_DAYS = 30
+MODIFIED_SINCE_MAX_AGE = 30 * 24 * 60 * 60
+RETRY_STATUSES = (429, 502, 503, 504)
+OVERLOAD_STATUSES = (429, 503)
+# statuses telling the request was refused without being processed, safe to retry for any method
+UNPROCESSED_STATUSES = (429,)
+DEFAULT_CACHE_SIZE = 1024
+DEFAULT_CACHE_TTL = {'event': 60, 'configuration': 3600, 'subcalendars': 600}
+SUBCALENDAR_VIEW_WINDOWS = 8
+SUBCALENDAR_VIEW_TTL = 30
+STREAM_CHUNK_SIZE = 64 * 1024
+RRULE_CACHE_SIZE = 512
+INTERN_CACHE_SIZE = 65536
+WATCH_MIN_INTERVAL = 5
+WATCH_MAX_INTERVAL = 300
+WATCH_SETTLE = 2.0
+WATCH_MAX_TRACKED = 100000
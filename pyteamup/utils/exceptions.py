@@ -0,0 +1,85 @@
+"""Exceptions raised for TeamUp api error responses"""
+
+from pyteamup.utils.constants import RETRY_STATUSES
+
+
+class TeamUpError(Exception):
+    """
+    Base class of api errors. ``status_code`` is the HTTP status of the response and ``retryable`` tells whether
+    sending the same request again later may succeed, i.e. whether the status is one RetryPolicy retries
+    (RETRY_STATUSES). A 500 is a ServerError but is not retryable.
+    """
+    retryable = False
+
+    def __init__(self, message, status_code=None, response_text=None, retry_after=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.response_text = response_text
+        self.retry_after = retry_after
+        if status_code is not None:
+            self.retryable = status_code in RETRY_STATUSES
+
+
+class BadRequest(TeamUpError):
+    pass
+
+
+class Unauthorized(TeamUpError):
+    pass
+
+
+class Forbidden(TeamUpError):
+    pass
+
+
+class NotFound(TeamUpError):
+    pass
+
+
+class MethodNotAllowed(TeamUpError):
+    pass
+
+
+class NotAcceptable(TeamUpError):
+    pass
+
+
+class VersionConflict(TeamUpError):
+    pass
+
+
+class UnsupportedMediaType(TeamUpError):
+    pass
+
+
+class RateLimited(TeamUpError):
+    retryable = True
+
+
+class ServerError(TeamUpError):
+    retryable = True
+
+
+class ServiceUnavailable(ServerError):
+    pass
+
+
+STATUS_ERRORS = {
+    400: BadRequest,
+    401: Unauthorized,
+    403: Forbidden,
+    404: NotFound,
+    405: MethodNotAllowed,
+    406: NotAcceptable,
+    409: VersionConflict,
+    415: UnsupportedMediaType,
+    429: RateLimited,
+    503: ServiceUnavailable,
+}
+
+
+def error_class(status_code):
+    """Exception class for an error status code"""
+    if status_code in STATUS_ERRORS:
+        return STATUS_ERRORS[status_code]
+    return ServerError if status_code >= 500 else TeamUpError
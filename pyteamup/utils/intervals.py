@@ -0,0 +1,80 @@
+"""Static interval index answering overlap queries in O(log n + k)"""
+
+import heapq
+
+
+class IntervalIndex:
+    """
+    Immutable index over half open intervals [start, end) with an attached item each.
+
+    Intervals are sorted by start and viewed as an implicit balanced binary tree (the middle element of every range is
+    the root of that range). Every node stores the largest end in its subtree, which lets ``overlapping`` skip whole
+    subtrees that end before the query starts.
+
+    :param intervals: iterable of (start, end, item) tuples, start and end can be any mutually comparable values
+    """
+    def __init__(self, intervals):
+        ordered = sorted(intervals, key=lambda interval: (interval[0], interval[1]))
+        self.starts = [interval[0] for interval in ordered]
+        self.ends = [interval[1] for interval in ordered]
+        self.items = [interval[2] for interval in ordered]
+        self.__max_end = list(self.ends)
+        self._build(0, len(ordered))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def _build(self, lo, hi):
+        # post order over an explicit stack so large indexes do not hit the recursion limit
+        stack = [(lo, hi, False)]
+        while stack:
+            lo, hi, children_done = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            if not children_done:
+                stack.append((lo, hi, True))
+                stack.append((lo, mid, False))
+                stack.append((mid + 1, hi, False))
+                continue
+            max_end = self.ends[mid]
+            if lo < mid:
+                max_end = max(max_end, self.__max_end[(lo + mid) // 2])
+            if mid + 1 < hi:
+                max_end = max(max_end, self.__max_end[(mid + 1 + hi) // 2])
+            self.__max_end[mid] = max_end
+
+    def overlapping_positions(self, start, end):
+        """Positions (in start order) of the intervals overlapping [start, end)"""
+        found = []
+        stack = [(0, len(self.starts))]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            if self.__max_end[mid] <= start:
+                continue
+            if self.starts[mid] < end:
+                if self.ends[mid] > start:
+                    found.append(mid)
+                stack.append((mid + 1, hi))
+            stack.append((lo, mid))
+        found.sort()
+        return found
+
+    def overlapping(self, start, end):
+        """Items whose interval overlaps [start, end), in start order"""
+        return [self.items[i] for i in self.overlapping_positions(start, end)]
+
+    def overlapping_pairs(self):
+        """
+        Yields every pair of overlapping items with a sweep over the start order, O(n log n + k) for k pairs.
+        """
+        active = []
+        for position, (start, end, item) in enumerate(zip(self.starts, self.ends, self.items)):
+            while active and active[0][0] <= start:
+                heapq.heappop(active)
+            for _, _, other in active:
+                yield other, item
+            heapq.heappush(active, (end, position, item))
@@ -0,0 +1,118 @@
+"""JSON decoding helpers: a faster backend when installed and incremental decoding of large event arrays"""
+
+import codecs
+import json
+import re
+
+from pyteamup.utils.utilities import optional_import
+
+
+def loads(data):
+    """Decodes a JSON document from str or bytes, using orjson when it is installed"""
+    orjson = optional_import('orjson')
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_DECODER = json.JSONDecoder()
+
+
+class _Buffer:
+    """Growing window over a stream of str or bytes chunks with incremental UTF-8 decoding"""
+    def __init__(self, chunks):
+        self.__chunks = iter(chunks)
+        self.__decoder = codecs.getincrementaldecoder('utf-8')()
+        self.text = ''
+        self.pos = 0
+        self.exhausted = False
+
+    def more(self):
+        """Reads the next chunk, returns False once the stream is exhausted"""
+        while not self.exhausted:
+            try:
+                chunk = next(self.__chunks)
+            except StopIteration:
+                self.exhausted = True
+                self.text += self.__decoder.decode(b'', final=True)
+                return False
+            if isinstance(chunk, bytes):
+                chunk = self.__decoder.decode(chunk)
+            if chunk:
+                # drop what has been consumed so the buffer only holds the value being decoded
+                self.text = self.text[self.pos:] + chunk
+                self.pos = 0
+                return True
+        return False
+
+    def peek(self):
+        """Skips whitespace and returns the next character, or '' at the end of the stream"""
+        while True:
+            self.pos = _WHITESPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.more():
+                return ''
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f'Expected {char!r} at position {self.pos} of the JSON stream')
+        self.pos += 1
+
+    def value(self):
+        """Decodes the next complete JSON value, reading more chunks until it is complete"""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if not self.more():
+                    raise
+                continue
+            # a number running to the end of the buffer may continue in the next chunk
+            if end == len(self.text) and not self.exhausted and self.more():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_array(chunks, key='events', meta=None):
+    """
+    Incrementally decodes a JSON object of the form ``{"events": [{...}, {...}], "timestamp": ...}`` and yields the
+    elements of the array under ``key`` one at a time as soon as each is complete, without holding the whole body.
+
+    :param chunks: iterable of str or bytes chunks, e.g. ``response.iter_content(65536)``
+    :param key: <str> top level key of the array to stream
+    :param meta: optional dict receiving the other top level values (filled as they are reached)
+    """
+    buf = _Buffer(chunks)
+    buf.expect('{')
+    if buf.peek() == '}':
+        return
+    while True:
+        name = buf.value()
+        buf.expect(':')
+        if name == key and buf.peek() == '[':
+            buf.pos += 1
+            if buf.peek() == ']':
+                buf.pos += 1
+            else:
+                while True:
+                    yield buf.value()
+                    char = buf.peek()
+                    buf.pos += 1
+                    if char == ']':
+                        break
+                    if char != ',':
+                        raise ValueError(f'Expected "," or "]" at position {buf.pos - 1} of the JSON stream')
+        else:
+            value = buf.value()
+            if meta is not None:
+                meta[name] = value
+        char = buf.peek()
+        buf.pos += 1
+        if char == '}':
+            return
+        if char != ',':
+            raise ValueError(f'Expected "," or "}}" at position {buf.pos - 1} of the JSON stream')
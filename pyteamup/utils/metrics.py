@@ -0,0 +1,257 @@
+"""Request instrumentation: before/after request hooks and an in-process metrics registry"""
+
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+HOOKS = ('before_request', 'after_request')
+PHASES = ('connect', 'wait', 'backoff', 'decode', 'construct', 'total')
+# upper bounds in seconds of the latency histogram buckets, the last bucket is unbounded
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class RequestInfo:
+    """
+    One api call as seen by the hooks. ``endpoint`` is a template such as ``/{calendar}/events/{event_id}`` so calls
+    can be grouped without the ids and the token. Times are in seconds:
+
+        ``connect``   opening new connections (0 when a pooled connection was reused)
+        ``wait``      sending the request and reading the response, without connect and backoff
+        ``backoff``   held back on the client: sleeping between retries, rate limiter and concurrency limit
+        ``decode``    parsing the JSON body
+        ``construct`` building Event objects (or other return types) from the decoded data
+        ``total``     the whole call as seen by the caller
+
+    ``coalesced`` is True when the call was answered by an identical request another thread already had in flight,
+    nothing was sent for it.
+    """
+    def __init__(self, method, endpoint):
+        self.method = method
+        self.endpoint = endpoint
+        self.status_code = None
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.attempts = 0
+        self.connect = 0.0
+        self.wait = 0.0
+        self.backoff = 0.0
+        self.decode = 0.0
+        self.construct = 0.0
+        self.total = 0.0
+        self.error = None
+        self.coalesced = False
+        self.started = time.perf_counter()
+
+    def __repr__(self):
+        return (f'RequestInfo({self.method} {self.endpoint} status={self.status_code} '
+                f'total={self.total * 1000:.1f}ms)')
+
+    def sent(self, data=None):
+        """Records the size of the request body"""
+        if data:
+            self.request_bytes = len(data)
+
+    def response(self, resp, streamed=False):
+        """Records status, size and transport timings of a response returned by a Transport"""
+        self.status_code = resp.status_code
+        length = resp.headers.get('Content-Length') if getattr(resp, 'headers', None) is not None else None
+        if length is not None:
+            self.response_bytes = int(length)
+        elif not streamed:
+            self.response_bytes = len(resp.content)
+        timings = getattr(resp, 'timings', None)
+        if timings is not None:
+            self.connect, self.wait, self.backoff, self.attempts = timings
+        return resp
+
+    @contextmanager
+    def phase(self, name):
+        """Adds the time spent inside the block to ``decode`` or ``construct``"""
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            setattr(self, name, getattr(self, name) + time.perf_counter() - start)
+
+    def timed(self, iterable, name):
+        """Yields from iterable adding the time spent producing each item to ``decode`` or ``construct``"""
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                setattr(self, name, getattr(self, name) + time.perf_counter() - start)
+            yield item
+
+    def as_dict(self):
+        return {'method': self.method,
+                'endpoint': self.endpoint,
+                'status_code': self.status_code,
+                'request_bytes': self.request_bytes,
+                'response_bytes': self.response_bytes,
+                'attempts': self.attempts,
+                'connect': self.connect,
+                'wait': self.wait,
+                'backoff': self.backoff,
+                'decode': self.decode,
+                'construct': self.construct,
+                'total': self.total,
+                'coalesced': self.coalesced,
+                'error': repr(self.error) if self.error is not None else None}
+
+
+class Histogram:
+    """Fixed bucket latency histogram, percentiles are interpolated inside the bucket they fall in"""
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, pct):
+        if not self.count:
+            return None
+        rank = pct / 100 * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                low = self.buckets[i - 1] if i else 0.0
+                high = self.buckets[i] if i < len(self.buckets) else self.max
+                low, high = max(low, self.min), min(high, self.max)
+                return low + (high - low) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.max
+
+    def snapshot(self):
+        return {'count': self.count,
+                'sum': self.sum,
+                'mean': self.sum / self.count if self.count else None,
+                'min': self.min,
+                'max': self.max,
+                'p50': self.percentile(50),
+                'p95': self.percentile(95),
+                'p99': self.percentile(99),
+                'buckets': {str(le): n for le, n in zip(self.buckets + ('inf',), self.counts)}}
+
+
+class MetricsRegistry:
+    """
+    Thread safe counters and latency histograms per endpoint, filled from the RequestInfo of every call made by the
+    calendars it is given to. ``snapshot()`` returns everything as plain dicts ready to be exported.
+
+        metrics = MetricsRegistry()
+        calendar = Calendar(calendar_id, api_key, metrics=metrics)
+        ...
+        metrics.snapshot()['endpoints']['GET /{calendar}/events']['total']['p95']
+    """
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.__counters = {}
+        self.__endpoints = {}
+        self.__lock = threading.Lock()
+
+    def increment(self, name, value=1):
+        """Adds value to a free form counter"""
+        with self.__lock:
+            self.__counters[name] = self.__counters.get(name, 0) + value
+
+    def record(self, info):
+        """Accounts for one finished call"""
+        key = f'{info.method} {info.endpoint}'
+        with self.__lock:
+            stats = self.__endpoints.get(key)
+            if stats is None:
+                stats = self.__endpoints[key] = {'requests': 0, 'coalesced': 0, 'errors': 0, 'retries': 0,
+                                                 'status': {}, 'request_bytes': 0, 'response_bytes': 0,
+                                                 'histograms': {p: Histogram(self.buckets) for p in PHASES}}
+            if info.coalesced:
+                stats['coalesced'] += 1
+            else:
+                stats['requests'] += 1
+            stats['retries'] += max(0, info.attempts - 1)
+            if info.error is not None or (info.status_code or 0) >= 400:
+                stats['errors'] += 1
+            if info.status_code is not None:
+                stats['status'][info.status_code] = stats['status'].get(info.status_code, 0) + 1
+            stats['request_bytes'] += info.request_bytes
+            stats['response_bytes'] += info.response_bytes
+            for phase, histogram in stats['histograms'].items():
+                histogram.observe(getattr(info, phase))
+
+    def snapshot(self):
+        with self.__lock:
+            endpoints = {}
+            for key, stats in self.__endpoints.items():
+                entry = {k: (dict(v) if isinstance(v, dict) else v) for k, v in stats.items() if k != 'histograms'}
+                for phase, histogram in stats['histograms'].items():
+                    entry[phase] = histogram.snapshot()
+                endpoints[key] = entry
+            return {'counters': dict(self.__counters), 'endpoints': endpoints}
+
+    def reset(self):
+        with self.__lock:
+            self.__counters.clear()
+            self.__endpoints.clear()
+
+
+class Instrumentation:
+    """
+    Hooks and metrics of one Calendar. ``call`` wraps an api call: before_request hooks get the RequestInfo before
+    anything is sent and after_request hooks once the result has been built (or the call failed). Exceptions raised
+    by hooks are logged and never break the call.
+    """
+    def __init__(self, metrics=None):
+        self.metrics = metrics
+        self.__hooks = {name: [] for name in HOOKS}
+
+    def add_hook(self, name, callback):
+        if name not in self.__hooks:
+            raise ValueError(f'Unknown hook {name!r}, expected one of: {", ".join(HOOKS)}')
+        # hooks are copied on write so calls in flight iterate over a stable list
+        self.__hooks[name] = self.__hooks[name] + [callback]
+
+    def remove_hook(self, name, callback):
+        self.__hooks[name] = [hook for hook in self.__hooks.get(name, []) if hook is not callback]
+
+    def _fire(self, name, info):
+        for hook in self.__hooks[name]:
+            try:
+                hook(info)
+            except Exception:
+                logger.exception('%s hook %r failed', name, hook)
+
+    @contextmanager
+    def call(self, method, endpoint):
+        info = RequestInfo(method, endpoint)
+        self._fire('before_request', info)
+        try:
+            yield info
+        except Exception as error:
+            info.error = error
+            raise
+        finally:
+            info.total = time.perf_counter() - info.started
+            if self.metrics is not None:
+                self.metrics.record(info)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug('%s %s -> %s in %.1f ms (connect %.1f, wait %.1f, backoff %.1f, decode %.1f, '
+                             'construct %.1f)', method, endpoint, info.status_code, info.total * 1000,
+                             info.connect * 1000, info.wait * 1000, info.backoff * 1000, info.decode * 1000,
+                             info.construct * 1000)
+            self._fire('after_request', info)
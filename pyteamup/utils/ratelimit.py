@@ -0,0 +1,130 @@
+"""Client side rate limiting, retry backoff and adaptive concurrency shared through a Transport"""
+
+import email.utils
+import random
+import threading
+import time
+
+from pyteamup.utils.constants import RETRY_STATUSES, UNPROCESSED_STATUSES
+
+
+class TokenBucket:
+    """
+    Token bucket allowing ``rate`` requests per second on average with bursts of up to ``burst`` requests.
+    Thread safe, one bucket is meant to be shared by everything sending requests with the same api key.
+    """
+    def __init__(self, rate, burst=None):
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1, rate))
+        self.__tokens = self.burst
+        self.__updated = time.monotonic()
+        self.__lock = threading.Lock()
+
+    def reserve(self):
+        """Takes a token and returns how many seconds the caller has to wait before using it"""
+        with self.__lock:
+            now = time.monotonic()
+            self.__tokens = min(self.burst, self.__tokens + (now - self.__updated) * self.rate)
+            self.__updated = now
+            self.__tokens -= 1
+            if self.__tokens >= 0:
+                return 0.0
+            return -self.__tokens / self.rate
+
+    def acquire(self):
+        """Blocks until a request may be sent"""
+        wait = self.reserve()
+        if wait:
+            time.sleep(wait)
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD limit on the number of requests in flight. Every successful response raises the limit by ``increase`` divided
+    by the current limit (about +increase per round trip of the whole window) and every overload response (429/503)
+    multiplies it by ``decrease``, converging on the highest concurrency the server accepts.
+    """
+    def __init__(self, initial=4, minimum=1, maximum=64, increase=1.0, decrease=0.5):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.__limit = float(initial)
+        self.__in_flight = 0
+        self.__condition = threading.Condition()
+
+    @property
+    def limit(self):
+        return int(self.__limit)
+
+    @property
+    def in_flight(self):
+        return self.__in_flight
+
+    def acquire(self):
+        with self.__condition:
+            while self.__in_flight >= max(self.minimum, int(self.__limit)):
+                self.__condition.wait()
+            self.__in_flight += 1
+
+    def release(self, overloaded=False):
+        with self.__condition:
+            self.__in_flight -= 1
+            if overloaded:
+                self.__limit = max(self.minimum, self.__limit * self.decrease)
+            else:
+                self.__limit = min(self.maximum, self.__limit + self.increase / max(self.__limit, 1.0))
+            self.__condition.notify_all()
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header given either as seconds or as an HTTP date, None if absent"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter. Responses with a status in ``statuses`` are retried up to ``max_retries``
+    times, waiting ``Retry-After`` when the server sends one and otherwise a random delay up to
+    ``min(max_delay, base_delay * 2 ** attempt)``, never more than ``max_delay``.
+
+    Non-idempotent methods (POST) are only retried when the server cannot have acted on the request: a 429 response
+    or a connection error raised before anything was sent. A 502/503/504 or a dropped connection may come after the
+    event was created, so retrying would create it twice. ``RetryPolicy(max_retries=0)`` turns retries off.
+    """
+    IDEMPOTENT_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'))
+
+    def __init__(self, max_retries=3, base_delay=0.5, max_delay=30.0, statuses=RETRY_STATUSES):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.statuses = frozenset(statuses)
+
+    def should_retry_status(self, status_code, attempt, method='GET'):
+        if attempt >= self.max_retries or status_code not in self.statuses:
+            return False
+        return method.upper() in self.IDEMPOTENT_METHODS or status_code in UNPROCESSED_STATUSES
+
+    def should_retry_error(self, method, attempt, sent=True):
+        """
+        :param sent: <bool> False when the error was raised before the request was sent (connection refused or
+            connect timeout), then any method may be retried
+        """
+        return attempt < self.max_retries and (not sent or method.upper() in self.IDEMPOTENT_METHODS)
+
+    def delay(self, attempt, retry_after=None):
+        if retry_after is not None:
+            return min(self.max_delay, retry_after)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
@@ -0,0 +1,123 @@
+"""Request building and response parsing shared by the synchronous and asyncio clients"""
+
+import datetime
+from urllib.parse import quote
+
+from pyteamup.utils.utilities import format_date, parse_datetime, optional_import
+from pyteamup.utils.jsonstream import loads
+
+
+def collection_range(start_dt=None, end_dt=None):
+    """Fills in the default collection range of the current date -30 and +180 days"""
+    if start_dt is None:
+        start_dt = datetime.date.today() - datetime.timedelta(30)
+    if end_dt is None:
+        end_dt = datetime.date.today() + datetime.timedelta(180)
+    return start_dt, end_dt
+
+
+def collection_parameters(start_dt=None, end_dt=None, subcal_id=None, markdown=False, query=None):
+    """
+    Builds the query string for an event collection request. If no dates are given the current date -30 and +180 days
+    is used. query restricts the collection to the events matching a text search.
+    """
+    start_dt, end_dt = collection_range(start_dt, end_dt)
+
+    subcal_par = ''
+    if subcal_id:
+        if isinstance(subcal_id, (list, tuple)):
+            for id in subcal_id:
+                subcal_par += f'&subcalendarId[]={id}'
+        else:
+            subcal_par = f'&subcalendarId[]={subcal_id}'
+
+    if markdown == True:
+        para_markdown = '&format[]=markdown'
+    else:
+        para_markdown = ''
+
+    para_query = f'&query={quote(query)}' if query else ''
+
+    return (f'&startDate={start_dt.strftime("%Y-%m-%d")}&endDate={end_dt.strftime("%Y-%m-%d")}' + subcal_par +
+            para_markdown + para_query)
+
+
+def new_event_payload(title, start_dt, end_dt, subcalendar_ids, all_day=False, notes=None, location=None, who=None,
+                      remote_id=None):
+    """Validates the arguments of a new event and returns the dictionary to be posted"""
+    if not isinstance(start_dt, datetime.datetime) or not isinstance(end_dt, datetime.datetime):
+        try:
+            start_dt = parse_datetime(start_dt)
+            end_dt = parse_datetime(end_dt)
+        except:
+            raise ValueError('Parse failed, please pass all dates as a datetime object')
+    if isinstance(subcalendar_ids, (str, int)):
+        subcalendar_ids = [subcalendar_ids]
+    if not isinstance(subcalendar_ids, (tuple, list)):
+        raise ValueError(f'Unrecognized Type: Subcalendar_ids type: {type(subcalendar_ids)}')
+
+    return {'remote_id': remote_id,
+            'title': title,
+            'subcalendar_ids': subcalendar_ids,
+            'start_dt': format_date(start_dt),
+            'end_dt': format_date(end_dt),
+            'all_day': all_day,
+            'notes': notes,
+            'location': location,
+            'who': who
+            }
+
+
+def parse_events(text):
+    """Returns the list of event dictionaries from an event collection response. All parse functions accept the body
+    as str or bytes, passing bytes skips building an intermediate str."""
+    return loads(text)['events']
+
+
+def parse_changed_events(text):
+    """Returns the event dictionaries and server timestamp of a modifiedSince response, decoding the body once"""
+    resp_json = loads(text)
+    return resp_json['events'], resp_json['timestamp']
+
+
+def parse_event(text):
+    """Returns the event dictionary and undo id (None if absent) of a single event response"""
+    resp_json = loads(text)
+    return resp_json['event'], resp_json.get('undo_id')
+
+
+def parse_undo_id(text):
+    return loads(text)['undo_id']
+
+
+def parse_configuration(text):
+    return loads(text)['configuration']
+
+
+def parse_subcalendars(text):
+    return loads(text)['subcalendars']
+
+
+def events_as(parent_calendar, events_json, returnas, event_class):
+    """Converts a list of event dictionaries to the requested return type"""
+    if returnas in ('event', 'events'):
+        return [event_class(parent_calendar, **event_dict) for event_dict in events_json]
+    elif returnas == 'columnar':
+        from pyteamup.EventTable import EventTable
+        return EventTable(parent_calendar, events_json, event_class)
+    elif returnas in ('series', 'dataframe') and optional_import('pandas') is not None:
+        return optional_import('pandas').DataFrame.from_records(events_json)
+    else:
+        return events_json
+
+
+def event_as(parent_calendar, event_dict, returnas, event_class, undo_id=None):
+    """Converts a single event dictionary to the requested return type"""
+    if returnas == 'event':
+        if undo_id is not None:
+            return event_class(parent_calendar, undo_id=undo_id, **event_dict)
+        return event_class(parent_calendar, **event_dict)
+    elif returnas == 'series' and optional_import('pandas') is not None:
+        return optional_import('pandas').Series(event_dict)
+    else:
+        return event_dict
@@ -0,0 +1,204 @@
+"""Local inverted index for full text search over event titles, notes, locations and attendees"""
+
+import re
+import heapq
+import datetime
+from bisect import bisect_left, insort
+from html import unescape
+
+from pyteamup.utils.utilities import epoch_seconds, to_date
+
+SEARCH_FIELDS = ('title', 'notes', 'location', 'who')
+
+_TAG = re.compile(r'<[^>]+>')
+_WORD = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Lower cased words of a text, HTML tags (event notes are HTML) and punctuation dropped"""
+    if not text:
+        return []
+    if '<' in text:
+        text = _TAG.sub(' ', text)
+    if '&' in text:
+        text = unescape(text)
+    return _WORD.findall(text.casefold())
+
+
+def _field(event, name):
+    return event.get(name) if isinstance(event, dict) else getattr(event, name)
+
+
+def _event_id(event):
+    return str(event['id'] if isinstance(event, dict) else event.event_id)
+
+
+def _bound(value, end=False):
+    """Epoch seconds of a search bound, dates cover the whole day"""
+    if isinstance(value, datetime.date) and not isinstance(value, datetime.datetime):
+        value = to_date(value) + datetime.timedelta(1) if end else value
+    return epoch_seconds(value)
+
+
+class SearchIndex:
+    """
+    Inverted index over Event objects or event dictionaries, answering word and prefix queries without network calls.
+
+    Every word of the indexed fields maps to the set of event ids containing it, and the vocabulary is kept sorted so
+    a prefix is expanded with a binary search. A query matches the events holding every one of its words (AND), each
+    word matching as a prefix unless prefix is False. Events are replaced or removed one at a time as they change.
+
+        index = calendar.search_index(start_dt, end_dt)
+        index.search('board meet', start_dt=monday, end_dt=friday, subcalendar_ids=[room_a])
+        index.apply_changes(calendar.get_changed_events(since, returnas='dict')[0])
+
+    :param events: optional iterable of Event objects or event dictionaries
+    :param fields: names of the text fields indexed
+    """
+    def __init__(self, events=(), fields=SEARCH_FIELDS):
+        self.fields = tuple(fields)
+        self.__postings = {}
+        self.__terms = []
+        self.__events = {}
+        self.__tokens = {}
+        self.__bounds = {}
+        self.__order = {}
+        self.__subcalendars = {}
+        for event in events:
+            self.add(event)
+
+    def __len__(self):
+        return len(self.__events)
+
+    def __contains__(self, event_id):
+        return str(event_id) in self.__events
+
+    def __iter__(self):
+        return iter(self.__events.values())
+
+    @property
+    def vocabulary_size(self):
+        return len(self.__terms)
+
+    def add(self, event):
+        """Indexes an event, replacing the indexed version of the same id. Deleted events are removed instead."""
+        event_id = _event_id(event)
+        if _field(event, 'delete_dt'):
+            self.remove(event_id)
+            return
+        if event_id in self.__events:
+            self.remove(event_id)
+        tokens = set()
+        for name in self.fields:
+            tokens.update(tokenize(_field(event, name)))
+        postings = self.__postings
+        for token in tokens:
+            ids = postings.get(token)
+            if ids is None:
+                postings[token] = {event_id}
+                insort(self.__terms, token)
+            else:
+                ids.add(event_id)
+        self.__events[event_id] = event
+        self.__tokens[event_id] = tokens
+        start = epoch_seconds(_field(event, 'start_dt'))
+        self.__bounds[event_id] = (start, epoch_seconds(_field(event, 'end_dt')))
+        self.__order[event_id] = (start or 0, event_id)
+        self.__subcalendars[event_id] = frozenset(str(s) for s in _field(event, 'subcalendar_ids') or ())
+
+    def remove(self, event_id):
+        """Removes an event from the index, returns False if it was not indexed"""
+        event_id = str(event_id)
+        if self.__events.pop(event_id, None) is None:
+            return False
+        postings = self.__postings
+        for token in self.__tokens.pop(event_id):
+            ids = postings[token]
+            ids.discard(event_id)
+            if not ids:
+                del postings[token]
+                del self.__terms[bisect_left(self.__terms, token)]
+        del self.__bounds[event_id]
+        del self.__order[event_id]
+        del self.__subcalendars[event_id]
+        return True
+
+    def apply_changes(self, events):
+        """
+        Applies changed events, as returned by Calendar.get_changed_events or ChangeWatcher: deleted ones are removed,
+        the others added or replaced.
+        :return: tuple of (number of indexed events, number of removed events)
+        """
+        added = removed = 0
+        for event in events:
+            if _field(event, 'delete_dt'):
+                removed += self.remove(_event_id(event))
+            else:
+                self.add(event)
+                added += 1
+        return added, removed
+
+    def _matching(self, token, prefix):
+        """Ids of the events holding token, or any word starting with it"""
+        if not prefix:
+            return self.__postings.get(token, set())
+        terms = self.__terms
+        first = end = bisect_left(terms, token)
+        while end < len(terms) and terms[end].startswith(token):
+            end += 1
+        if end - first == 1:
+            return self.__postings[terms[first]]
+        ids = set()
+        for term in terms[first:end]:
+            ids.update(self.__postings[term])
+        return ids
+
+    def search(self, query, start_dt=None, end_dt=None, subcalendar_ids=None, prefix=True, limit=None):
+        """
+        Events matching every word of query, in start order.
+
+        :param query: <str> words to look for, an empty query matches every event
+        :param start_dt: optional datetime or date, only events ending after it
+        :param end_dt: optional datetime or date (inclusive), only events starting before it
+        :param subcalendar_ids: optional id or list-like, only events in one of these subcalendars
+        :param prefix: <bool> match words starting with the query words instead of whole words only
+        :param limit: <int> optional maximum number of events returned
+        :return: list of the indexed Event objects or dicts
+        """
+        tokens = set(tokenize(query))
+        if tokens:
+            # intersect from the rarest word so the candidate set stays small
+            matches = sorted((self._matching(token, prefix) for token in tokens), key=len)
+            candidates = set(matches[0])
+            for ids in matches[1:]:
+                if not candidates:
+                    return []
+                candidates.intersection_update(ids)
+        else:
+            candidates = self.__events.keys()
+
+        low = _bound(start_dt) if start_dt is not None else None
+        high = _bound(end_dt, end=True) if end_dt is not None else None
+        if subcalendar_ids is not None:
+            if isinstance(subcalendar_ids, (str, int)):
+                subcalendar_ids = [subcalendar_ids]
+            wanted = {str(s) for s in subcalendar_ids}
+        if low is None and high is None and subcalendar_ids is None:
+            found = list(candidates)
+        else:
+            found = []
+            for event_id in candidates:
+                start, end = self.__bounds[event_id]
+                if low is not None and end is not None and end <= low:
+                    continue
+                if high is not None and start is not None and start >= high:
+                    continue
+                if subcalendar_ids is not None and self.__subcalendars[event_id].isdisjoint(wanted):
+                    continue
+                found.append(event_id)
+        order = self.__order.__getitem__
+        if limit is not None and limit < len(found):
+            found = heapq.nsmallest(limit, found, key=order)
+        else:
+            found.sort(key=order)
+        return [self.__events[event_id] for event_id in found]
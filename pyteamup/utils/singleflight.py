@@ -0,0 +1,68 @@
+"""Coalescing of identical calls in flight across threads"""
+
+import threading
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time. Threads asking for a key while its call is in flight wait for it and
+    get the same result, or the same exception, instead of making the call again. Nothing is kept once the call
+    returns, so a later call for the key runs again.
+
+        flights = SingleFlight()
+        value, shared = flights.do(('event', event_id), lambda: fetch(event_id))
+
+    Waiters receive the very object returned to the caller that ran it, mutable results are shared.
+    """
+    def __init__(self):
+        self.__flights = {}
+        self.__lock = threading.Lock()
+        self.calls = 0
+        self.coalesced = 0
+
+    def __len__(self):
+        """Number of calls in flight"""
+        return len(self.__flights)
+
+    def do(self, key, fn):
+        """
+        Returns fn()'s result, from the call already in flight for key if there is one.
+        :return: tuple of (value, shared) where shared is True when the value came from another thread's call
+        """
+        with self.__lock:
+            flight = self.__flights.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                flight = self.__flights[key] = _Flight()
+                self.calls += 1
+                leader = True
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value, True
+
+        try:
+            flight.value = fn()
+        except BaseException as error:
+            flight.error = error
+            raise
+        finally:
+            with self.__lock:
+                del self.__flights[key]
+            flight.done.set()
+        return flight.value, False
+
+    def stats(self):
+        with self.__lock:
+            return {'calls': self.calls, 'coalesced': self.coalesced, 'in_flight': len(self.__flights)}
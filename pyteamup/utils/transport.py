@@ -0,0 +1,285 @@
+"""Pooled HTTP transports shared by a Calendar and every Event it creates"""
+
+import threading
+import time
+from collections import namedtuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+from pyteamup.utils.constants import DEFAULT_POOL_SIZE, DEFAULT_TIMEOUT, DEFAULT_MAX_CONCURRENCY, OVERLOAD_STATUSES
+from pyteamup.utils.ratelimit import RetryPolicy, parse_retry_after
+from pyteamup.utils.utilities import optional_import
+
+AsyncResponse = namedtuple('AsyncResponse', ['status_code', 'text', 'headers'])
+TransportTimings = namedtuple('TransportTimings', ['connect', 'wait', 'backoff', 'attempts'])
+TransportTimings.__doc__ = """Seconds a Transport spent opening connections, waiting on the server and held back on the
+client (retry sleeps, rate limiter and concurrency limit) for one response, set as ``response.timings``"""
+
+# seconds spent in connect() by the current thread, read back by Transport.request
+_connect_time = threading.local()
+
+
+class _TimedConnectionMixin:
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            _connect_time.seconds = getattr(_connect_time, 'seconds', 0.0) + time.perf_counter() - start
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+def _sent(error):
+    """Whether a requests connection error may have come after the request reached the server"""
+    if isinstance(error, requests.ConnectTimeout):
+        return False
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return not isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+
+
+class _TimedAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections record how long opening them took"""
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http': _TimedHTTPConnectionPool,
+                                                   'https': _TimedHTTPSConnectionPool}
+
+
+class Transport:
+    """
+    Thin wrapper around a ``requests.Session`` that keeps a pool of keep-alive connections open to the TeamUp API.
+
+    A Calendar owns one Transport and hands it to every Event it creates so that all requests made on behalf of the
+    calendar reuse the same connections instead of paying for a new TCP + TLS handshake each time.
+
+    :param session: optional pre-configured ``requests.Session`` (or any object with a compatible ``request`` method)
+    :param pool_size: <int> number of connections kept open per host
+    :param keep_alive: <bool> if False every response closes its connection (mostly useful for comparison)
+    :param headers: <dict> default headers sent with every request
+    :param timeout: <float or tuple> default (connect, read) timeout used when a request does not pass its own
+    :param retry: RetryPolicy for 429/5xx responses and connection errors, default ``RetryPolicy()``
+    :param rate_limiter: optional TokenBucket every request takes a token from before being sent
+    :param concurrency: optional AdaptiveConcurrency (AIMD) limit on requests in flight
+    """
+    def __init__(self, session=None, pool_size=DEFAULT_POOL_SIZE, keep_alive=True, headers=None,
+                 timeout=DEFAULT_TIMEOUT, retry=None, rate_limiter=None, concurrency=None):
+        self.timeout = timeout
+        self.retry = retry if retry is not None else RetryPolicy()
+        self.rate_limiter = rate_limiter
+        self.concurrency = concurrency
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self.__owns_session = session is None
+
+        if session is None:
+            session = requests.Session()
+            adapter = _TimedAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+        if headers:
+            session.headers.update(headers)
+        if not keep_alive:
+            session.headers['Connection'] = 'close'
+        self.session = session
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def request(self, method, url, **kwargs):
+        """
+        Sends a request through the pooled session, applying the default timeout if none is given. The request waits
+        for the rate limiter and concurrency limit, and retryable failures are retried according to the retry policy.
+        The final response is returned whatever its status, check_status_code turns it into a typed error. Its
+        ``timings`` attribute holds the TransportTimings of the call (connect is only measured on pooled sessions).
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        attempt = 0
+        backoff = 0.0
+        _connect_time.seconds = 0.0
+        started = time.perf_counter()
+        while True:
+            if self.rate_limiter is not None or self.concurrency is not None:
+                queued = time.perf_counter()
+                if self.rate_limiter is not None:
+                    self.rate_limiter.acquire()
+                if self.concurrency is not None:
+                    self.concurrency.acquire()
+                backoff += time.perf_counter() - queued
+            overloaded = False
+            try:
+                resp = self.session.request(method, url, **kwargs)
+                overloaded = resp.status_code in OVERLOAD_STATUSES
+            except (requests.ConnectionError, requests.Timeout) as error:
+                overloaded = True
+                if not self.retry.should_retry_error(method, attempt, sent=_sent(error)):
+                    raise
+                backoff += self._sleep(self.retry.delay(attempt))
+                attempt += 1
+                continue
+            finally:
+                if self.concurrency is not None:
+                    self.concurrency.release(overloaded=overloaded)
+
+            if not self.retry.should_retry_status(resp.status_code, attempt, method):
+                connect = _connect_time.seconds
+                resp.timings = TransportTimings(connect, time.perf_counter() - started - connect - backoff, backoff,
+                                                attempt + 1)
+                return resp
+            resp.close()
+            backoff += self._sleep(self.retry.delay(attempt, parse_retry_after(resp.headers.get('Retry-After'))))
+            attempt += 1
+
+    @staticmethod
+    def _sleep(seconds):
+        time.sleep(seconds)
+        return seconds
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request('PUT', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+    def close(self):
+        """Closes the pooled connections. Sessions passed in by the caller are left for the caller to close."""
+        if self.__owns_session:
+            self.session.close()
+
+
+class AsyncTransport:
+    """
+    asyncio counterpart of Transport backed by a single ``aiohttp.ClientSession``.
+
+    Every coroutine sent through the transport shares one connection pool and a semaphore bounds how many requests
+    are in flight at once. Responses are returned as ``AsyncResponse`` tuples exposing ``status_code`` and ``text``
+    like a ``requests.Response`` so the same parsing code can be used for both clients.
+
+    :param session: optional ``aiohttp.ClientSession`` to send requests through
+    :param pool_size: <int> maximum number of open connections
+    :param max_concurrency: <int> maximum number of requests awaiting a response at once
+    :param keep_alive: <bool> if False connections are closed after every response
+    :param headers: <dict> default headers sent with every request
+    :param timeout: <float or tuple> default total timeout in seconds, a (connect, read) tuple is accepted as well
+    :param retry: RetryPolicy for 429/5xx responses and connection errors, default ``RetryPolicy()``
+    :param rate_limiter: optional TokenBucket every request takes a token from before being sent
+    """
+    def __init__(self, session=None, pool_size=DEFAULT_MAX_CONCURRENCY, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                 keep_alive=True, headers=None, timeout=DEFAULT_TIMEOUT, retry=None, rate_limiter=None):
+        self.__aiohttp = optional_import('aiohttp')
+        if self.__aiohttp is None and session is None:
+            raise ImportError('aiohttp is required for the asyncio client: python -m pip install aiohttp')
+        self.pool_size = pool_size
+        self.max_concurrency = max_concurrency
+        self.keep_alive = keep_alive
+        self.headers = dict(headers or {})
+        self.timeout = timeout
+        self.retry = retry if retry is not None else RetryPolicy()
+        self.rate_limiter = rate_limiter
+        self.session = session
+        self.__owns_session = session is None
+        self.__semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @property
+    def _connection_errors(self):
+        return self.__aiohttp.ClientConnectionError if self.__aiohttp is not None else OSError
+
+    def _client_timeout(self):
+        if isinstance(self.timeout, tuple):
+            connect, read = self.timeout
+            return self.__aiohttp.ClientTimeout(connect=connect, sock_read=read)
+        return self.__aiohttp.ClientTimeout(total=self.timeout)
+
+    def _ensure_session(self):
+        # aiohttp sessions and semaphores must be created from inside the running loop. asyncio is imported by the
+        # coroutines that need it, by then the running loop has already loaded it so synchronous users never pay for it
+        import asyncio
+        if self.__semaphore is None:
+            self.__semaphore = asyncio.Semaphore(self.max_concurrency)
+        if self.session is None:
+            connector = self.__aiohttp.TCPConnector(limit=self.pool_size, force_close=not self.keep_alive)
+            self.session = self.__aiohttp.ClientSession(connector=connector, headers=self.headers,
+                                                 timeout=self._client_timeout())
+        return self.session
+
+    async def _send(self, session, method, url, **kwargs):
+        import asyncio
+        if self.rate_limiter is not None:
+            wait = self.rate_limiter.reserve()
+            if wait:
+                await asyncio.sleep(wait)
+        async with self.__semaphore:
+            async with session.request(method, url, **kwargs) as resp:
+                text = await resp.text()
+                return AsyncResponse(resp.status, text, resp.headers)
+
+    async def request(self, method, url, **kwargs):
+        """Sends a request through the shared session once a concurrency slot is free, retrying per the policy"""
+        import asyncio
+        session = self._ensure_session()
+        attempt = 0
+        while True:
+            try:
+                resp = await self._send(session, method, url, **kwargs)
+            except (self._connection_errors, asyncio.TimeoutError) as error:
+                sent = self.__aiohttp is None or not isinstance(error, self.__aiohttp.ClientConnectorError)
+                if not self.retry.should_retry_error(method, attempt, sent=sent):
+                    raise
+                await asyncio.sleep(self.retry.delay(attempt))
+                attempt += 1
+                continue
+            if not self.retry.should_retry_status(resp.status_code, attempt, method):
+                return resp
+            await asyncio.sleep(self.retry.delay(attempt, parse_retry_after(resp.headers.get('Retry-After'))))
+            attempt += 1
+
+    async def get(self, url, **kwargs):
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request('POST', url, **kwargs)
+
+    async def put(self, url, **kwargs):
+        return await self.request('PUT', url, **kwargs)
+
+    async def delete(self, url, **kwargs):
+        return await self.request('DELETE', url, **kwargs)
+
+    async def close(self):
+        """Closes the session if the transport created it"""
+        if self.__owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
@@ -1,4 +1,11 @@
+import sys
 import datetime
+import importlib
+import threading
+
+from pyteamup.utils.constants import INTERN_CACHE_SIZE
+from pyteamup.utils.exceptions import *
+from pyteamup.utils.ratelimit import parse_retry_after
 
 RESPONSES = {
     400: '400: Bad Request -- Invalid Request',
@@ -7,6 +14,8 @@ RESPONSES = {
     404: '404: Not Found -- Resource missing, not found or not visible by your request',
     405: '405: Method Not Allowed -- You tried to access a resource with an invalid method (i.e. GET instead of POST)',
     406: '406: Not Acceptable -- You requested a format that is not json',
+    409: '409: Conflict -- The event was modified since it was fetched (version mismatch), fetch it again and retry',
+    429: '429: Too Many Requests -- Rate limit exceeded, slow down and retry after the delay given by the server',
     415: '415: Unsupported Media Type -- The server is refusing to service the request because the payload is in a format not supported. Make sure you have the headers Content-Type: application/json and Content-Encoding properly set.',
     500: '500: Internal Server Error -- Application error on TeamUp side, TeamUp will look into it but feel free to reach out with details.',
     503: '503: Service Unavailable -- We are temporarially offline for maintanance. Please try again later.',
@@ -16,12 +25,93 @@ RESPONSES = {
 }
 
 
-def check_status_code(status_code):
+def check_status_code(status_code, response=None):
+    """
+    Raises the TeamUpError subclass matching an error status code, e.g. NotFound for 404 or RateLimited for 429.
+    :param response: optional response, its body and Retry-After header are attached to the raised error
+    """
     if status_code >= 400:
-        raise Exception(RESPONSES.get(status_code))
+        text = getattr(response, 'text', None)
+        headers = getattr(response, 'headers', None) or {}
+        raise error_class(status_code)(RESPONSES.get(status_code, f'{status_code}: Error'), status_code=status_code,
+                                       response_text=text, retry_after=parse_retry_after(headers.get('Retry-After')))
     return RESPONSES.get(status_code, f'Unknown but Ok: {status_code}')
 
 
+_TZ_CACHE = {datetime.timedelta(0): datetime.timezone.utc}
+
+
+def _shared_tz(offset):
+    """Returns one shared tzinfo object per utc offset instead of a new object for every parsed datetime"""
+    tz = _TZ_CACHE.get(offset)
+    if tz is None:
+        tz = _TZ_CACHE.setdefault(offset, datetime.timezone(offset))
+    return tz
+
+
+_OPTIONAL_MODULES = {}
+
+
+def optional_import(name):
+    """
+    Imports an optional dependency the first time it is needed instead of when pyteamup is imported, so the heavy
+    libraries only used by a few code paths (pandas, numpy, aiohttp, orjson) do not slow down every cold start.
+    The result is remembered, None when the module is not installed.
+    """
+    try:
+        return _OPTIONAL_MODULES[name]
+    except KeyError:
+        pass
+    try:
+        module = importlib.import_module(name)
+    except ImportError:
+        module = None
+    _OPTIONAL_MODULES[name] = module
+    return module
+
+
+def to_datetime(value, **kwargs):
+    """dateutil's parser, imported on first use since ISO-8601 strings never need it"""
+    from dateutil.parser import parse
+    return parse(value, **kwargs)
+
+
+def parse_datetime(value):
+    """
+    Parses a TeamUp date string. ISO-8601 strings (what the api sends) go through ``datetime.fromisoformat`` with a
+    shared tzinfo per offset, anything else falls back to dateutil. datetimes are returned as is and empty values as None.
+    """
+    if not value:
+        return None
+    if isinstance(value, datetime.datetime):
+        return value
+    try:
+        parsed = datetime.datetime.fromisoformat(value)
+    except (ValueError, TypeError):
+        return to_datetime(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.replace(tzinfo=_shared_tz(parsed.utcoffset()))
+    return parsed
+
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def epoch_seconds(value):
+    """
+    Seconds since the epoch of an api date string, datetime or date. Naive values are read as UTC and dates as
+    midnight UTC. Returns None for empty values.
+    """
+    if isinstance(value, datetime.date) and not isinstance(value, datetime.datetime):
+        value = datetime.datetime(value.year, value.month, value.day)
+    dt = parse_datetime(value)
+    if dt is None:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.timezone.utc)
+    return int((dt - _EPOCH).total_seconds())
+
+
 def format_date(date):
     if not isinstance(date, datetime.datetime):
         raise TypeError
@@ -31,3 +121,84 @@ def format_date(date):
     else:
         return date.strftime('%Y-%m-%dT%H:%M:%S%z')
 
+
+
+def to_date(value):
+    """Returns the date part of a date or datetime"""
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    raise TypeError(f'Expected a date or datetime, got {type(value)}')
+
+
+# tuples of ids shared by every event holding the same ids, bounded by INTERN_CACHE_SIZE
+_INTERNED_IDS = {}
+_INTERNED_IDS_LOCK = threading.Lock()
+
+
+def intern_ids(ids):
+    """
+    Returns a tuple of ids shared with every other caller passing the same ids, so events in the same subcalendars
+    hold one tuple between them. Once INTERN_CACHE_SIZE distinct tuples are held new ones are returned unshared.
+    """
+    if ids is None:
+        return None
+    key = tuple(ids)
+    shared = _INTERNED_IDS.get(key)
+    if shared is not None:
+        return shared
+    with _INTERNED_IDS_LOCK:
+        if len(_INTERNED_IDS) < INTERN_CACHE_SIZE:
+            return _INTERNED_IDS.setdefault(key, key)
+    return key
+
+
+def intern_str(value):
+    """sys.intern for strings, other values are returned as is"""
+    return sys.intern(value) if type(value) is str else value
+
+
+def date_windows(start_dt, end_dt, days):
+    """
+    Splits the inclusive date range start_dt..end_dt into consecutive inclusive windows of at most ``days`` days.
+    :return: list of (start date, end date) tuples
+    """
+    if days < 1:
+        raise ValueError('Window size must be at least one day')
+    start, end = to_date(start_dt), to_date(end_dt)
+    step = datetime.timedelta(days)
+    windows = []
+    while start <= end:
+        window_end = min(start + step - datetime.timedelta(1), end)
+        windows.append((start, window_end))
+        start = window_end + datetime.timedelta(1)
+    return windows
+
+
+def split_window(window):
+    """Splits an inclusive (start date, end date) window in two halves, or returns None for a single day"""
+    start, end = window
+    span = (end - start).days
+    if span < 1:
+        return None
+    middle = start + datetime.timedelta(span // 2)
+    return (start, middle), (middle + datetime.timedelta(1), end)
+
+
+def chunked(items, size):
+    """Splits a list into consecutive lists of at most ``size`` items"""
+    items = list(items)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def merge_unique_events(event_lists):
+    """Concatenates lists of event dictionaries dropping repeated event ids, first occurrence wins"""
+    seen = set()
+    merged = []
+    for events in event_lists:
+        for event in events:
+            if event['id'] not in seen:
+                seen.add(event['id'])
+                merged.append(event)
+    return merged
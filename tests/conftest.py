@@ -0,0 +1,41 @@
+import warnings
+
+import pytest
+
+from pyteamup import Calendar
+from benchmarks.mock_server import MockTeamUpServer
+
+
+@pytest.fixture(autouse=True)
+def quiet_warnings():
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', UserWarning)
+        yield
+
+
+@pytest.fixture
+def make_server():
+    """Starts MockTeamUpServers with the given arguments and stops them after the test"""
+    servers = []
+
+    def make(**kwargs):
+        server = MockTeamUpServer(**kwargs).start()
+        servers.append(server)
+        return server
+    yield make
+    for server in servers:
+        server.stop()
+
+
+@pytest.fixture
+def make_calendar():
+    """Calendars on a mock server, closed after the test"""
+    calendars = []
+
+    def make(server, **kwargs):
+        calendar = Calendar(server.calendar_id, server.api_key, base_url=server.base_url, **kwargs)
+        calendars.append(calendar)
+        return calendar
+    yield make
+    for calendar in calendars:
+        calendar.close()
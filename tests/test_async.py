@@ -0,0 +1,127 @@
+import asyncio
+import datetime
+import threading
+
+import pytest
+
+from pyteamup import AsyncCalendar, AsyncEvent, RetryPolicy, ServerError
+
+START = datetime.datetime(2026, 7, 6, 9)
+HOUR = datetime.timedelta(hours=1)
+
+
+def run_with(server, test, **kwargs):
+    """Runs test(calendar) on an AsyncCalendar of the server and closes the calendar after it"""
+    async def run():
+        async with AsyncCalendar(server.calendar_id, server.api_key, base_url=server.base_url, **kwargs) as calendar:
+            return await test(calendar)
+    return asyncio.run(run())
+
+
+def test_get_is_retried_on_503(make_server):
+    server = make_server()
+
+    async def test(calendar):
+        server.reset_counts()
+        server.inject_errors(503, count=2)
+        return await calendar.get_event_collection(START, START + HOUR)
+
+    assert run_with(server, test, retry=RetryPolicy(base_delay=0)) == []
+    assert server.requests == {'GET /events': 3}
+
+
+def test_post_is_not_retried_on_503(make_server):
+    server = make_server()
+
+    async def test(calendar):
+        server.reset_counts()
+        server.inject_errors(503)
+        with pytest.raises(ServerError):
+            await calendar.new_event('Retried', START, START + HOUR, [1])
+
+    run_with(server, test, retry=RetryPolicy(base_delay=0))
+    assert server.requests == {'POST /events': 1}
+    assert server.events == {}
+
+
+def test_max_concurrency_bounds_requests_in_flight(make_server):
+    server = make_server(latency=0.05)
+    lock, in_flight, peak = threading.Lock(), [0], [0]
+    wait = server.wait
+
+    def counted_wait():
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        try:
+            wait()
+        finally:
+            with lock:
+                in_flight[0] -= 1
+    server.wait = counted_wait
+
+    async def test(calendar):
+        peak[0] = 0
+        return await asyncio.gather(*(calendar.get_event_collection(START, START + HOUR) for _ in range(12)))
+
+    assert run_with(server, test, max_concurrency=3, pool_size=12) == [[]] * 12
+    assert peak[0] == 3
+
+
+def test_new_event_batch_commit_and_delete(make_server):
+    server = make_server()
+
+    async def test(calendar):
+        event = await calendar.new_event('Draft', START, START + HOUR, [1], notes='first')
+        assert isinstance(event, AsyncEvent)
+        assert server.events[str(event.event_id)]['title'] == 'Draft'
+
+        server.reset_counts()
+        event.title = 'Final'
+        event.location = 'Room 4'
+        # setters only queue the changes until they are committed in one request
+        assert server.requests == {} and event.title == 'Draft'
+        await event.batch_commit()
+        assert server.requests == {'PUT /events': 1}
+        stored = server.events[str(event.event_id)]
+        assert (stored['title'], stored['location'], stored['notes']) == ('Final', 'Room 4', 'first')
+        assert event.title == 'Final' and event.version == stored['version']
+
+        await event.batch_commit()
+        assert server.requests == {'PUT /events': 1}
+
+        fetched = await calendar.get_event(event.event_id)
+        assert fetched.title == 'Final'
+        await event.delete()
+        assert event.is_deleted
+        return event.event_id
+
+    event_id = run_with(server, test)
+    assert str(event_id) not in server.events
+
+
+def test_failed_batch_commit_keeps_the_queue(make_server):
+    server = make_server()
+
+    async def test(calendar):
+        event = await calendar.new_event('Draft', START, START + HOUR, [1])
+        event.title = 'Final'
+        server.inject_errors(400)
+        with pytest.raises(Exception):
+            await event.batch_commit()
+        assert server.events[str(event.event_id)]['title'] == 'Draft'
+        await event.batch_commit()
+        return event.event_id
+
+    event_id = run_with(server, test)
+    assert server.events[str(event_id)]['title'] == 'Final'
+
+
+def test_invalid_key_raises_on_enter(make_server):
+    server = make_server()
+
+    async def run():
+        async with AsyncCalendar(server.calendar_id, 'wrong-key', base_url=server.base_url):
+            pass
+    with pytest.raises(Exception, match='Invalid Api Key'):
+        asyncio.run(run())
@@ -0,0 +1,140 @@
+import datetime
+
+import pytest
+
+from pyteamup import ResponseCache, NotFound
+from pyteamup.utils import cache as cache_module
+
+START = datetime.datetime(2026, 8, 3, 9)
+HOUR = datetime.timedelta(hours=1)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake monotonic clock of the cache, advanced by assigning clock.now"""
+    class Clock:
+        now = 1000.0
+    monkeypatch.setattr(cache_module.time, 'monotonic', lambda: Clock.now)
+    return Clock
+
+
+def test_entries_expire_after_the_ttl_of_their_kind(clock):
+    cache = ResponseCache(ttl={'event': 10, 'configuration': 100})
+    cache.set('event', '1', {'id': 1})
+    cache.set('configuration', None, {'timezone': 'UTC'})
+    clock.now += 9.9
+    assert cache.get('event', '1') == {'id': 1}
+    clock.now += 0.1
+    assert cache.get('event', '1') is None
+    assert cache.get('configuration') == {'timezone': 'UTC'}
+    clock.now += 90
+    assert cache.get('configuration', default='missing') == 'missing'
+    assert len(cache) == 0
+    assert cache.stats()['expirations'] == 2
+
+
+def test_kinds_without_ttl_are_not_cached():
+    cache = ResponseCache(ttl={'event': 0, 'subcalendars': None})
+    cache.set('event', '1', {'id': 1})
+    cache.set('subcalendars', None, [])
+    cache.set('window', None, {})
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = ResponseCache(maxsize=3)
+    for event_id in '123':
+        cache.set('event', event_id, event_id)
+    # reading 1 makes 2 the least recently used
+    assert cache.get('event', '1') == '1'
+    cache.set('event', '4', '4')
+    assert [cache.get('event', event_id) for event_id in '1234'] == ['1', None, '3', '4']
+    # setting an existing key refreshes it as well
+    cache.set('event', '1', 'one')
+    cache.set('event', '5', '5')
+    assert [cache.get('event', event_id) for event_id in '1345'] == ['one', None, '4', '5']
+    stats = cache.stats()
+    assert (stats['evictions'], stats['size'], stats['maxsize']) == (2, 3, 3)
+    assert (stats['hits'], stats['misses']) == (7, 2)
+
+
+def test_invalidate_and_clear(clock):
+    cache = ResponseCache()
+    cache.set('event', '1', 1)
+    cache.set('event', '2', 2)
+    cache.set('subcalendars', None, [])
+    cache.invalidate('event', '1')
+    cache.invalidate('event', 'unknown')
+    assert cache.get('event', '1') is None and cache.get('event', '2') == 2
+    cache.clear('event')
+    assert len(cache) == 1
+    cache.clear()
+    assert len(cache) == 0
+
+
+@pytest.fixture
+def server(make_server):
+    return make_server(subcalendars=[{'id': 1, 'name': 'Room A', 'active': True},
+                                     {'id': 2, 'name': 'Room B', 'active': True}])
+
+
+@pytest.fixture
+def calendar(server, make_calendar):
+    return make_calendar(server, cache=True)
+
+
+def test_get_event_is_served_from_the_cache(server, calendar):
+    event_id = calendar.new_event('Cached', START, START + HOUR, [1]).event_id
+    server.reset_counts()
+    assert calendar.get_event(event_id).title == 'Cached'
+    assert calendar.get_event(event_id, returnas='dict')['title'] == 'Cached'
+    assert server.requests == {'GET /events': 1}
+    assert calendar.cache.stats()['hits'] == 1
+
+
+def test_no_stale_read_after_an_update(server, calendar):
+    event = calendar.new_event('Before', START, START + HOUR, [1])
+    # an update through another Event object of the same id invalidates the entry as well
+    calendar.get_event(event.event_id).title = 'After'
+    server.reset_counts()
+    assert calendar.get_event(event.event_id).title == 'After'
+    assert server.requests == {'GET /events': 1}
+
+    event = calendar.get_event(event.event_id)
+    event.enable_batch_update()
+    event.location = 'Room 4'
+    event.batch_commit()
+    assert calendar.get_event(event.event_id).location == 'Room 4'
+
+
+def test_no_stale_read_after_a_delete(calendar):
+    event = calendar.new_event('Deleted', START, START + HOUR, [1])
+    assert calendar.get_event(event.event_id).title == 'Deleted'
+    event.delete()
+    with pytest.raises(NotFound):
+        calendar.get_event(event.event_id)
+
+
+def test_writes_refresh_the_subcalendar_window(server, calendar):
+    event = calendar.new_event('First', START, START + HOUR, [1])
+    assert [e.title for e in calendar.subcalendar_events(1, START, START + HOUR)[1]] == ['First']
+    server.reset_counts()
+    assert [e.title for e in calendar.subcalendar_events(1, START, START + HOUR)[1]] == ['First']
+    assert server.requests == {}
+
+    calendar.new_event('Second', START, START + HOUR, [1])
+    assert sorted(e.title for e in calendar.subcalendar_events(1, START, START + HOUR)[1]) == ['First', 'Second']
+    event.title = 'Renamed'
+    assert sorted(e.title for e in calendar.subcalendar_events(1, START, START + HOUR)[1]) == ['Renamed', 'Second']
+    event.delete()
+    assert [e.title for e in calendar.subcalendar_events(1, START, START + HOUR)[1]] == ['Second']
+    assert server.requests == {'POST /events': 1, 'PUT /events': 1, 'DELETE /events': 1, 'GET /events': 3}
+
+
+def test_configuration_and_subcalendars_are_cached(server, calendar):
+    server.reset_counts()
+    calendar.clear_calendar_cache()
+    for _ in range(2):
+        assert [s.subcalendar_id for s in calendar.subcalendars] == [1, 2]
+        calendar.configuration
+    assert server.requests == {'GET /subcalendars': 1, 'GET /configuration': 1}
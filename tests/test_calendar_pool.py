@@ -0,0 +1,106 @@
+import datetime
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+from pyteamup import Calendar, CalendarPool
+from pyteamup.utils.bulk import fair_map
+from benchmarks.mock_server import synthetic_calendar
+
+START = datetime.date(2026, 1, 1)
+END = datetime.date(2026, 1, 31)
+
+
+def spanning(event_id, first_day, days):
+    start = datetime.datetime(2026, 1, first_day, 18, tzinfo=datetime.timezone.utc)
+    end = start + datetime.timedelta(days=days)
+    return {'id': event_id, 'series_id': None, 'remote_id': None, 'subcalendar_ids': [1], 'subcalendar_id': 1,
+            'all_day': False, 'rrule': '', 'title': f'Spanning {event_id}', 'who': '', 'location': '', 'notes': '',
+            'version': 'v1', 'readonly': False, 'tz': None, 'attachments': [], 'start_dt': start.isoformat(),
+            'end_dt': end.isoformat(), 'creation_dt': start.isoformat(), 'update_dt': None, 'delete_dt': None}
+
+
+@pytest.fixture(autouse=True)
+def forget_keys():
+    Calendar.clear_validation_cache()
+
+
+@pytest.fixture
+def server(make_server):
+    events, subcalendars = synthetic_calendar(60, subcalendars=1, recurring=0,
+                                              start=datetime.datetime(2026, 1, 2, tzinfo=datetime.timezone.utc))
+    events += [spanning(9001, 2, 1), spanning(9002, 5, 9), spanning(9003, 1, 29), spanning(9004, 14, 0)]
+    return make_server(events=events, subcalendars=subcalendars,
+                       calendars={'kssecond': 'second-key', 'ksthird': 'third-key'})
+
+
+@pytest.fixture
+def pool(server):
+    keys = {server.calendar_id: server.api_key, 'kssecond': 'second-key', 'ksthird': 'third-key'}
+    with CalendarPool(keys, base_url=server.base_url, max_workers=4, per_calendar=2) as pool:
+        yield pool
+
+
+def test_calendars_share_one_connection_pool(pool):
+    sessions = {id(calendar.transport.session) for calendar in pool}
+    assert sessions == {id(pool.transport.session)}
+    assert [calendar.calendar_id for calendar in pool] == ['ksmockcal', 'kssecond', 'ksthird']
+
+
+def test_windows_return_each_event_once(server, pool):
+    unsplit = pool.get_event_collections(START, END, returnas='dict')
+    windowed = pool.get_event_collections(START, END, returnas='dict', window_days=3)
+    for cal_id, events in windowed.items():
+        ids = [e['id'] for e in events]
+        assert len(ids) == len(set(ids)), cal_id
+        assert set(ids) == {e['id'] for e in unsplit[cal_id]}
+        assert {9001, 9002, 9003, 9004} <= set(ids)
+
+
+def test_invalid_key_is_reported_per_calendar(server):
+    keys = {server.calendar_id: server.api_key, 'kssecond': 'wrong-key', 'ksthird': 'third-key'}
+    with CalendarPool(keys, base_url=server.base_url) as pool:
+        assert pool.invalid == {'kssecond': 'wrong-key'}
+        assert list(pool.calendars) == [server.calendar_id, 'ksthird']
+
+
+def test_keys_are_checked_once_for_the_pool(server):
+    keys = {server.calendar_id: server.api_key, 'kssecond': 'second-key', 'ksthird': 'third-key'}
+    server.reset_counts()
+    with CalendarPool(keys, base_url=server.base_url):
+        pass
+    with CalendarPool(keys, base_url=server.base_url):
+        pass
+    assert server.requests == {'GET /check-access': 3}
+
+
+def test_failures_are_tagged_with_their_calendar(server, pool):
+    pool.add('ksmissing', 'missing-key', validate=False)
+    results = {result.calendar_id: result for result in pool.iter_event_collections(START, END)}
+    assert not results['ksmissing'].ok and results['ksmissing'].error is not None
+    assert all(results[cal_id].ok for cal_id in (server.calendar_id, 'kssecond', 'ksthird'))
+
+
+def test_fan_out_is_fair():
+    in_flight, peak, lock = Counter(), Counter(), threading.Lock()
+    order = []
+
+    def work(item):
+        key = item[0]
+        with lock:
+            in_flight[key] += 1
+            peak[key] = max(peak[key], in_flight[key])
+        time.sleep(0.01)
+        with lock:
+            in_flight[key] -= 1
+        return item
+
+    queues = {'big': [('big', i) for i in range(10)], 'small': [('small', i) for i in range(2)]}
+    for key, item, value, error in fair_map(work, queues, max_workers=2, per_key=1):
+        assert error is None and value == item
+        order.append(key)
+    assert peak == Counter({'big': 1, 'small': 1})
+    # the short queue is not held up behind the long one
+    assert order.index('small') < 2 and order[:4].count('small') == 2
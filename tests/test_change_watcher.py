@@ -0,0 +1,184 @@
+import asyncio
+import datetime
+import time
+
+import pytest
+
+from pyteamup import AsyncCalendar, AsyncEvent, Event
+
+START = datetime.datetime(2026, 6, 1, 9)
+HOUR = datetime.timedelta(hours=1)
+
+
+@pytest.fixture
+def server(make_server):
+    return make_server(subcalendars=[{'id': 1, 'name': 'Room A', 'active': True},
+                                     {'id': 2, 'name': 'Room B', 'active': True}])
+
+
+@pytest.fixture
+def calendar(server, make_calendar):
+    return make_calendar(server)
+
+
+def watched(calendar, **kwargs):
+    kwargs.setdefault('since', time.time() - 5)
+    watcher = calendar.watch(min_interval=1, max_interval=100, **kwargs)
+    received = []
+    watcher.subscribe(received.append)
+    return watcher, received
+
+
+def test_created_and_updated_collapse_into_one_created(calendar):
+    watcher, received = watched(calendar, settle=60)
+    event = calendar.new_event('Draft', START, START + HOUR, [1])
+    assert watcher.poll() == 1
+    event.title = 'Final'
+    assert watcher.poll() == 1
+    assert received == [] and watcher.pending == 1
+    watcher.stop(flush=True)
+    assert [(c.kind, c.event_id, c.event.title) for c in received] == [('created', str(event.event_id), 'Final')]
+    assert isinstance(received[0].event, Event)
+
+
+def test_created_then_deleted_is_dropped(calendar):
+    watcher, received = watched(calendar, settle=60)
+    event = calendar.new_event('Short lived', START, START + HOUR, [1])
+    watcher.poll()
+    event.delete()
+    watcher.poll()
+    assert watcher.pending == 0
+    watcher.stop(flush=True)
+    assert received == []
+
+
+def test_updated_then_deleted_is_reported_as_deleted(calendar):
+    event = calendar.new_event('Existing', START, START + HOUR, [1])
+    watcher, received = watched(calendar, settle=60, since=time.time())
+    watcher._known[str(event.event_id)] = (event.version, False, frozenset(['1']))
+    event.title = 'Renamed'
+    watcher.poll()
+    event.delete()
+    watcher.poll()
+    watcher.stop(flush=True)
+    assert [(c.kind, c.event_id) for c in received] == [('deleted', str(event.event_id))]
+
+
+def test_repeat_poll_delivers_nothing(calendar):
+    watcher, received = watched(calendar, settle=0)
+    calendar.new_event('Once', START, START + HOUR, [1])
+    assert watcher.poll() == 1
+    assert [c.kind for c in received] == ['created']
+    assert watcher.poll() == 0
+    assert len(received) == 1 and watcher.dispatched == 1
+
+
+def test_subscription_filters_with_str_ids(calendar):
+    watcher, everything = watched(calendar, settle=0, returnas='dict')
+    room_b, deletions = [], []
+    watcher.subscribe(room_b.append, subcalendar_ids='2')
+    watcher.subscribe(deletions.append, kinds='deleted', subcalendar_ids=['1', '2'])
+    with pytest.raises(ValueError):
+        watcher.subscribe(print, kinds=('moved',))
+
+    in_a = calendar.new_event('A', START, START + HOUR, [1])
+    in_b = calendar.new_event('B', START, START + HOUR, [2])
+    watcher.poll()
+    in_a.subcalendar_ids = [2]
+    watcher.poll()
+    in_b.delete()
+    watcher.poll()
+    assert [(c.kind, c.event['title']) for c in everything] == [('created', 'A'), ('created', 'B'), ('updated', 'A'),
+                                                                ('deleted', 'B')]
+    # the move into room B is seen by its subscriber, the event being in room A before does not hide it
+    assert [(c.kind, c.event['title']) for c in room_b] == [('created', 'B'), ('updated', 'A'), ('deleted', 'B')]
+    assert [(c.kind, c.event_id) for c in deletions] == [('deleted', str(in_b.event_id))]
+    assert room_b[1].subcalendar_ids == frozenset(['1', '2'])
+
+
+def test_stop_without_flush_drops_held_changes(calendar):
+    watcher, received = watched(calendar, settle=60)
+    calendar.new_event('Held', START, START + HOUR, [1])
+    watcher.poll()
+    watcher.stop(flush=False)
+    assert received == [] and watcher.pending == 0
+
+
+def test_interval_shrinks_with_changes_and_grows_when_quiet(calendar):
+    watcher, _ = watched(calendar, settle=0, since=time.time())
+    watcher.poll()
+    assert watcher.interval == watcher.max_interval
+    for i in range(3):
+        calendar.new_event(f'Busy {i}', START, START + HOUR, [1])
+    watcher.poll()
+    assert watcher.interval == watcher.min_interval
+
+    intervals = []
+    for _ in range(40):
+        watcher.poll()
+        intervals.append(watcher.interval)
+    assert intervals == sorted(intervals) and intervals[-1] == watcher.max_interval
+
+
+def test_failed_poll_backs_off(server, calendar):
+    errors = []
+    watcher, _ = watched(calendar, on_error=errors.append)
+    server.inject_errors(500)
+    assert watcher.poll() == 0
+    assert watcher.errors == 1 and len(errors) == 1
+    assert watcher.interval == 2 * watcher.min_interval
+    watcher.poll()
+    assert watcher.errors == 1
+
+
+def test_background_thread_dispatches(calendar):
+    watcher, received = watched(calendar, settle=0)
+    watcher.min_interval = watcher.interval = 0.05
+    calendar.new_event('Background', START, START + HOUR, [1])
+    with watcher:
+        deadline = time.monotonic() + 5
+        while not received and time.monotonic() < deadline:
+            time.sleep(0.02)
+    assert not watcher.running
+    assert [c.kind for c in received] == ['created']
+
+
+def test_async_watcher(server, calendar):
+    async def run():
+        async_calendar = AsyncCalendar(server.calendar_id, server.api_key, base_url=server.base_url)
+        try:
+            received = []
+
+            async def on_change(change):
+                received.append(change)
+            watcher = async_calendar.watch(since=time.time() - 5, min_interval=1, settle=60)
+            watcher.subscribe(on_change)
+            event = await async_calendar.new_event('Draft', START, START + HOUR, [1])
+            await watcher.poll()
+            await event.execute_update({'title': 'Final'})
+            await watcher.poll()
+            assert received == []
+            await watcher.stop(flush=True)
+            return received
+        finally:
+            await async_calendar.close()
+
+    received = asyncio.run(run())
+    assert [(c.kind, c.event.title) for c in received] == [('created', 'Final')]
+    assert isinstance(received[0].event, AsyncEvent)
+
+
+def test_async_watcher_over_a_sync_calendar(calendar):
+    from pyteamup import AsyncChangeWatcher
+
+    async def run():
+        watcher = AsyncChangeWatcher(calendar, since=time.time() - 5, min_interval=1, settle=0)
+        received = []
+        watcher.subscribe(received.append)
+        calendar.new_event('Sync', START, START + HOUR, [1])
+        assert await watcher.poll() == 1
+        assert await watcher.poll() == 0
+        return received
+
+    received = asyncio.run(run())
+    assert [c.kind for c in received] == ['created'] and type(received[0].event) is Event
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from pyteamup import AsyncCalendar, Calendar, CalendarPool
+from pyteamup.utils.exceptions import ServerError, TeamUpError
+from pyteamup.utils.ratelimit import RetryPolicy
+from pyteamup.utils.transport import Transport
+
+NO_RETRY = RetryPolicy(max_retries=0)
+
+
+@pytest.fixture(autouse=True)
+def forget_keys():
+    Calendar.clear_validation_cache()
+    yield
+    Calendar.clear_validation_cache()
+
+
+def test_outage_on_check_access_is_not_an_invalid_key(make_server, make_calendar):
+    server = make_server()
+    server.inject_errors(503)
+    with pytest.raises(ServerError) as raised:
+        make_calendar(server, retry=NO_RETRY)
+    assert raised.value.retryable and 'Invalid Api Key' not in str(raised.value)
+    # the outage is not remembered, the next check goes to the server again
+    calendar = make_calendar(server, retry=NO_RETRY)
+    assert calendar.valid_api is True
+
+
+def test_rejected_key_is_still_invalid(make_server, make_calendar):
+    server = make_server()
+    with pytest.raises(Exception, match='Invalid Api Key'):
+        Calendar(server.calendar_id, 'wrong-key', base_url=server.base_url, retry=NO_RETRY)
+
+
+def test_validate_keys_tells_outage_from_bad_key(make_server):
+    server = make_server()
+    server.reset_counts()
+    server.inject_errors(503)
+    checked = Calendar.validate_keys([server.api_key], base_url=server.base_url)
+    # the default policy retries the 503
+    assert checked == {server.api_key: True}
+
+    Calendar.clear_validation_cache()
+    server.inject_errors(503, count=10)
+    with Transport(retry=NO_RETRY) as transport:
+        checked = Calendar.validate_keys([server.api_key, 'wrong-key'], base_url=server.base_url, transport=transport,
+                                         max_workers=1)
+    assert checked == {server.api_key: None, 'wrong-key': None}
+    server.errors.clear()
+    assert Calendar.validate_keys([server.api_key, 'wrong-key'], base_url=server.base_url) == \
+        {server.api_key: True, 'wrong-key': False}
+
+
+def test_pool_keeps_calendars_whose_check_failed(make_server):
+    server = make_server(calendars={'kssecond': 'second-key'})
+    server.inject_errors(503, count=10)
+    pool = CalendarPool({server.calendar_id: server.api_key, 'kssecond': 'second-key', 'ksbad': 'bad-key'},
+                        base_url=server.base_url, retry=NO_RETRY, max_workers=1)
+    try:
+        assert pool.invalid == {}
+        assert len(pool) == 3
+        server.errors.clear()
+        with pytest.raises(Exception, match='Invalid Api Key'):
+            pool.add('ksother', 'other-bad-key')
+        server.inject_errors(503)
+        with pytest.raises(TeamUpError):
+            pool.add('ksthird', 'third-key')
+    finally:
+        pool.close()
+
+
+def test_async_outage_is_raised(make_server):
+    server = make_server()
+
+    async def enter():
+        async with AsyncCalendar(server.calendar_id, server.api_key, base_url=server.base_url, retry=NO_RETRY):
+            return True
+
+    server.inject_errors(503)
+    with pytest.raises(ServerError):
+        asyncio.run(enter())
+    assert asyncio.run(enter())
+
+    async def bad_key():
+        async with AsyncCalendar(server.calendar_id, 'wrong-key', base_url=server.base_url, retry=NO_RETRY):
+            pass
+    with pytest.raises(Exception, match='Invalid Api Key'):
+        asyncio.run(bad_key())
@@ -0,0 +1,39 @@
+import asyncio
+import datetime
+
+from pyteamup import AsyncCalendar, AsyncEvent, Event
+from benchmarks.mock_server import synthetic_calendar
+
+START = datetime.date(2000, 1, 1)
+END = datetime.date(2100, 1, 1)
+
+
+def test_rows_filter_and_materialize(make_server, make_calendar):
+    events, subcalendars = synthetic_calendar(40, subcalendars=4, recurring=0)
+    server = make_server(events=events, subcalendars=subcalendars)
+    table = make_calendar(server).get_event_collection(START, END, returnas='columnar')
+    assert len(table) == 40 and type(table[0]) is Event
+
+    subcal_id = subcalendars[0]['id']
+    selected = table.select(table.in_subcalendars(subcal_id))
+    assert len(selected) == sum(subcal_id in e['subcalendar_ids'] for e in events)
+    assert all(subcal_id in e.subcalendar_ids for e in selected)
+    timed = table.filter(all_day=False)
+    assert len(timed) == sum(not e['all_day'] for e in events)
+
+
+def test_async_calendar_rows_are_async_events(make_server):
+    events, subcalendars = synthetic_calendar(5, subcalendars=2, recurring=0)
+    server = make_server(events=events, subcalendars=subcalendars)
+
+    async def fetch():
+        calendar = AsyncCalendar(server.calendar_id, server.api_key, base_url=server.base_url)
+        try:
+            return await calendar.get_event_collection(START, END, returnas='columnar')
+        finally:
+            await calendar.close()
+
+    table = asyncio.run(fetch())
+    assert table.event_class is AsyncEvent
+    assert all(type(event) is AsyncEvent for event in table)
+    assert type(table.select([0, 1])[1]) is AsyncEvent
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+from pyteamup.utils import jsonstream
+from pyteamup.utils.jsonstream import iter_json_array, loads
+
+EVENTS = [
+    {'id': 1, 'title': 'Café ☕ meeting', 'notes': '<p>"quoted" \\ back\\slash   and \t tab</p>', 'version': 12},
+    {'id': 2, 'title': 'Brackets ] } [ {, "commas"', 'custom': {'nested': [1, 2.5, {'deep': None}], 'flag': True}},
+    {'id': 3, 'title': '\U0001f4c5 calendar', 'subcalendar_ids': [], 'score': -1.25e3, 'count': 1234567890},
+]
+
+
+def body(events=EVENTS, ensure_ascii=True, **meta):
+    return json.dumps({'timestamp': 1780000000, 'events': events, **meta}, ensure_ascii=ensure_ascii)
+
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 64, 1 << 20])
+@pytest.mark.parametrize('as_bytes', [False, True])
+def test_any_chunk_boundary(size, as_bytes):
+    data = body(ensure_ascii=False)
+    if as_bytes:
+        # multi-byte characters split across chunks are decoded incrementally
+        data = data.encode()
+    meta = {}
+    assert list(iter_json_array(chunked(data, size), meta=meta)) == EVENTS
+    assert meta == {'timestamp': 1780000000}
+
+
+@pytest.mark.parametrize('data, expected', [
+    (r'{"events": ["a\"b", "c\\", "\\\"", "é📅", "]}"]}', ['a"b', 'c\\', '\\"', 'é\U0001f4c5', ']}']),
+    ('{"events": [{"a": {"b": {"c": [[], [{}], [[1]]]}}}, {"}": "{"}]}', [{'a': {'b': {'c': [[], [{}], [[1]]]}}},
+                                                                       {'}': '{'}]),
+    (' \n{ "events" : [ 1 ,\t22 , 333 ] } ', [1, 22, 333]),
+    ('{"events": []}', []),
+    ('{}', []),
+])
+@pytest.mark.parametrize('size', [1, 5])
+def test_escapes_nesting_and_whitespace(data, expected, size):
+    assert list(iter_json_array(chunked(data, size))) == expected
+
+
+def test_metadata_around_the_array_and_other_keys():
+    data = body(next_page={'after': 'x', 'events': [9]}, total=3)
+    meta = {}
+    assert list(iter_json_array(chunked(data, 4), meta=meta)) == EVENTS
+    assert meta == {'timestamp': 1780000000, 'next_page': {'after': 'x', 'events': [9]}, 'total': 3}
+    assert list(iter_json_array([data], key='missing')) == []
+
+
+def test_elements_are_yielded_before_the_stream_ends():
+    def chunks():
+        yield '{"events": [{"id": 1}, '
+        yield '{"id": 2}'
+        raise AssertionError('read past the second event')
+    stream = iter_json_array(chunks())
+    assert next(stream) == {'id': 1}
+
+
+@pytest.mark.parametrize('data', ['{"events": [1 2]}', '["events"]', '{"events": [1, 2', '{"events": [{"id": 1]}'])
+def test_malformed_streams_raise(data):
+    with pytest.raises(ValueError):
+        list(iter_json_array(chunked(data, 3)))
+
+
+@pytest.mark.parametrize('backend', ['orjson', 'stdlib'])
+@pytest.mark.parametrize('data', [body(), body().encode(), body(ensure_ascii=False).encode()])
+def test_loads_backends_agree(monkeypatch, backend, data):
+    if backend == 'orjson':
+        pytest.importorskip('orjson')
+    else:
+        monkeypatch.setattr(jsonstream, 'optional_import', lambda name: None)
+    assert loads(data) == {'timestamp': 1780000000, 'events': EVENTS}
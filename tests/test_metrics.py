@@ -0,0 +1,150 @@
+import datetime
+import logging
+import threading
+
+import pytest
+
+from pyteamup import MetricsRegistry, RequestInfo, NotFound
+from pyteamup.utils.metrics import Histogram
+
+START = datetime.datetime(2026, 9, 7, 9)
+HOUR = datetime.timedelta(hours=1)
+
+
+def recorded(calendar):
+    """Lists the RequestInfo every before_request and after_request hook of the calendar gets"""
+    before, after = [], []
+    calendar.add_hook('before_request', before.append)
+    calendar.add_hook('after_request', after.append)
+    return before, after
+
+
+def test_hooks_get_the_request_info(make_server, make_calendar):
+    server = make_server()
+    calendar = make_calendar(server)
+    before, after = recorded(calendar)
+    event = calendar.new_event('Hooked', START, START + HOUR, [1])
+    event.title = 'Renamed'
+    with pytest.raises(NotFound):
+        calendar.get_event('404')
+
+    assert before == after
+    assert [(i.method, i.endpoint, i.status_code) for i in after] == [
+        ('POST', '/{calendar}/events', 201),
+        ('PUT', '/{calendar}/events/{event_id}', 200),
+        ('GET', '/{calendar}/events/{event_id}', 404)]
+    post, put, get = after
+    assert post.request_bytes > 0 and post.response_bytes > 0 and post.attempts == 1
+    assert post.total >= post.wait > 0 and post.error is None and not post.coalesced
+    assert isinstance(get.error, NotFound)
+    assert get.as_dict()['error'] == repr(get.error)
+
+
+def test_coalesced_calls_are_flagged(make_server, make_calendar):
+    server = make_server(latency=0.2)
+    calendar = make_calendar(server)
+    event_id = calendar.new_event('Shared', START, START + HOUR, [1]).event_id
+    _, after = recorded(calendar)
+    server.reset_counts()
+    barrier = threading.Barrier(4)
+
+    def get():
+        barrier.wait()
+        assert calendar.get_event(event_id).title == 'Shared'
+    threads = [threading.Thread(target=get) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert server.requests == {'GET /events': 1}
+    assert sorted(info.coalesced for info in after) == [False, True, True, True]
+    assert all(info.status_code is None for info in after if info.coalesced)
+
+
+def test_a_failing_hook_does_not_break_the_request(make_server, make_calendar, caplog):
+    server = make_server()
+    calendar = make_calendar(server, metrics=True)
+
+    def broken(info):
+        raise RuntimeError('hook bug')
+    calendar.add_hook('before_request', broken)
+    calendar.add_hook('after_request', broken)
+    _, after = recorded(calendar)
+    with caplog.at_level(logging.ERROR, logger='pyteamup.utils.metrics'):
+        event = calendar.new_event('Still created', START, START + HOUR, [1])
+    assert event.title == 'Still created'
+    # hooks after the failing one still run
+    assert [info.status_code for info in after] == [201]
+    assert sum('hook' in record.getMessage() for record in caplog.records) == 2
+    assert calendar.metrics.snapshot()['endpoints']['POST /{calendar}/events']['requests'] == 1
+
+    calendar.remove_hook('before_request', broken)
+    calendar.remove_hook('after_request', broken)
+    calendar.get_event(event.event_id)
+    with pytest.raises(ValueError):
+        calendar.add_hook('on_error', broken)
+
+
+def test_per_endpoint_counters_and_latencies_add_up(make_server, make_calendar):
+    server = make_server()
+    metrics = MetricsRegistry()
+    calendar = make_calendar(server, metrics=metrics)
+    _, after = recorded(calendar)
+    metrics.reset()
+    server.reset_counts()
+
+    events = [calendar.new_event(f'Event {i}', START, START + HOUR, [1]) for i in range(3)]
+    calendar.get_event_collection(START, START + HOUR)
+    calendar.get_event(events[0].event_id)
+    server.inject_errors(503)
+    calendar.get_event(events[1].event_id)
+    events[2].title = 'Renamed'
+    events[2].delete()
+    with pytest.raises(NotFound):
+        calendar.get_event('404')
+    metrics.increment('custom', 2)
+
+    snapshot = metrics.snapshot()
+    assert snapshot['counters'] == {'custom': 2}
+    endpoints = snapshot['endpoints']
+    assert {key: stats['requests'] for key, stats in endpoints.items()} == {
+        'POST /{calendar}/events': 3,
+        'GET /{calendar}/events': 1,
+        'GET /{calendar}/events/{event_id}': 3,
+        'PUT /{calendar}/events/{event_id}': 1,
+        'DELETE /{calendar}/events/{event_id}': 1}
+    single = endpoints['GET /{calendar}/events/{event_id}']
+    assert (single['status'], single['errors'], single['retries']) == ({200: 2, 404: 1}, 1, 1)
+    # every server request is accounted for, the retried one included
+    assert sum(s['requests'] + s['retries'] for s in endpoints.values()) == server.request_count
+    assert sum(s['request_bytes'] for s in endpoints.values()) == sum(i.request_bytes for i in after)
+
+    for key, stats in endpoints.items():
+        infos = [i for i in after if f'{i.method} {i.endpoint}' == key]
+        assert stats['total']['count'] == stats['requests'] == len(infos)
+        assert stats['total']['sum'] == pytest.approx(sum(i.total for i in infos))
+        assert stats['wait']['sum'] == pytest.approx(sum(i.wait for i in infos))
+        assert stats['total']['min'] <= stats['total']['p50'] <= stats['total']['p99'] <= stats['total']['max']
+        assert sum(stats['total']['buckets'].values()) == stats['requests']
+
+
+def test_histogram_percentiles():
+    histogram = Histogram(buckets=(1, 2, 4))
+    assert histogram.snapshot()['p50'] is None
+    for value in (0.5, 1.5, 1.5, 3, 10):
+        histogram.observe(value)
+    snapshot = histogram.snapshot()
+    assert (snapshot['count'], snapshot['min'], snapshot['max']) == (5, 0.5, 10)
+    assert snapshot['mean'] == pytest.approx(16.5 / 5)
+    assert snapshot['buckets'] == {'1': 1, '2': 2, '4': 1, 'inf': 1}
+    assert 1 <= snapshot['p50'] <= 2 and 4 <= snapshot['p99'] <= 10
+
+
+def test_request_info_phases():
+    info = RequestInfo('GET', '/{calendar}/events')
+    with info.phase('decode'):
+        pass
+    assert list(info.timed([1, 2], 'construct')) == [1, 2]
+    assert info.decode > 0 and info.construct > 0
+    assert 'GET /{calendar}/events' in repr(info)
@@ -0,0 +1,84 @@
+import datetime
+import threading
+import time
+
+import pytest
+import requests
+
+from pyteamup import VersionConflict
+from pyteamup.utils.ratelimit import AdaptiveConcurrency
+from benchmarks.mock_server import synthetic_calendar
+
+START = datetime.date(2000, 1, 1)
+END = datetime.date(2100, 1, 1)
+
+
+def test_synthetic_calendar_is_reproducible():
+    first = synthetic_calendar(200, subcalendars=5, recurring=0.2, seed=3)
+    assert first == synthetic_calendar(200, subcalendars=5, recurring=0.2, seed=3)
+    events, subcalendars = first
+    assert len(subcalendars) == 5
+    assert any(e['rrule'] for e in events) and any(not e['rrule'] for e in events)
+    assert len({e['id'] for e in events}) == len(events)
+
+
+def test_unknown_key_is_refused(make_server):
+    server = make_server()
+    resp = requests.get(f'{server.base_url}/{server.calendar_id}/events', headers={'Teamup-Token': 'wrong'})
+    assert resp.status_code in (401, 403)
+
+
+def test_latency_and_error_injection(make_server, make_calendar):
+    server = make_server(latency=0.1)
+    calendar = make_calendar(server)
+    calendar.valid_api
+    began = time.perf_counter()
+    calendar.get_event_collection(START, END)
+    assert time.perf_counter() - began >= 0.1
+
+    server.latency = 0
+    server.inject_errors(500)
+    with pytest.raises(Exception):
+        calendar.get_event_collection(START, END, subcal_id=1)
+
+
+def test_stale_update_is_rejected_with_409(make_server, make_calendar):
+    events, subcalendars = synthetic_calendar(3, subcalendars=1, recurring=0)
+    server = make_server(events=events, subcalendars=subcalendars)
+    calendar = make_calendar(server)
+    stale = calendar.get_event_collection(START, END)[0]
+    calendar.get_event(stale.event_id).title = 'Changed elsewhere'
+    with pytest.raises(VersionConflict):
+        stale.title = 'Too late'
+
+
+def test_adaptive_concurrency_backs_off_and_recovers():
+    limit = AdaptiveConcurrency(initial=8, minimum=1, maximum=16)
+    limit.acquire()
+    limit.release(overloaded=True)
+    assert limit.limit == 4
+    for _ in range(40):
+        limit.acquire()
+        limit.release()
+    assert 4 < limit.limit <= 16
+
+
+def test_adaptive_concurrency_caps_requests_in_flight():
+    limit = AdaptiveConcurrency(initial=2, maximum=2)
+    peak, active, lock = [0], [0], threading.Lock()
+
+    def work():
+        limit.acquire()
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+        limit.release()
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak[0] == 2 and limit.in_flight == 0
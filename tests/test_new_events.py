@@ -0,0 +1,95 @@
+import datetime
+import threading
+
+import pytest
+
+from pyteamup import Event, BadRequest
+from pyteamup.utils.bulk import BulkResult
+
+START = datetime.datetime(2026, 10, 5, 9)
+HOUR = datetime.timedelta(hours=1)
+
+
+def spec(i, **kwargs):
+    return dict({'title': f'Event {i}', 'start_dt': START + i * HOUR, 'end_dt': START + (i + 1) * HOUR,
+                 'subcalendar_ids': [1]}, **kwargs)
+
+
+def count_in_flight(server):
+    """Wraps the latency of the server to record the peak number of requests it is answering at once"""
+    lock, state = threading.Lock(), {'in_flight': 0, 'peak': 0}
+    wait = server.wait
+
+    def counted_wait():
+        with lock:
+            state['in_flight'] += 1
+            state['peak'] = max(state['peak'], state['in_flight'])
+        try:
+            wait()
+        finally:
+            with lock:
+                state['in_flight'] -= 1
+    server.wait = counted_wait
+    return state
+
+
+def test_results_are_in_the_order_of_the_specs(make_server, make_calendar):
+    # random latency makes the responses arrive out of order
+    server = make_server(latency=(0, 0.05), seed=1)
+    calendar = make_calendar(server)
+    server.reset_counts()
+    results = calendar.new_events([spec(i, remote_id=f'r{i}') for i in range(20)], max_workers=8)
+
+    assert all(isinstance(result, BulkResult) for result in results)
+    assert [result.index for result in results] == list(range(20))
+    assert all(result.ok and result.error is None and result.undo_id for result in results)
+    assert [result.result.title for result in results] == [f'Event {i}' for i in range(20)]
+    assert all(type(result.result) is Event and result.result.undo_id == result.undo_id for result in results)
+    assert server.requests == {'POST /events': 20}
+    assert sorted(e['remote_id'] for e in server.events.values()) == sorted(f'r{i}' for i in range(20))
+
+
+def test_failed_items_do_not_stop_the_others(make_server, make_calendar):
+    server = make_server()
+    calendar = make_calendar(server)
+    specs = [spec(0), spec(1, start_dt='not a date'), spec(2), spec(3, subcalendar_ids={1}), {'title': 'Missing'},
+             spec(5)]
+    server.reset_counts()
+    # the invalid specs are rejected before anything is sent, one valid item is refused by the server
+    server.inject_errors(400)
+    results = calendar.new_events(specs, max_workers=1, returnas='dict')
+
+    assert [result.index for result in results] == list(range(6))
+    assert [result.ok for result in results] == [False, False, True, False, False, True]
+    assert isinstance(results[0].error, BadRequest)
+    assert isinstance(results[1].error, ValueError) and isinstance(results[3].error, ValueError)
+    assert isinstance(results[4].error, TypeError)
+    for result in results:
+        if result.ok:
+            assert result.error is None and isinstance(result.result, dict)
+        else:
+            assert result.result is None and result.undo_id is None
+    assert [r.result['title'] for r in results if r.ok] == ['Event 2', 'Event 5']
+    assert server.requests == {'POST /events': 3}
+    assert sorted(e['title'] for e in server.events.values()) == ['Event 2', 'Event 5']
+
+
+@pytest.mark.parametrize('max_workers', [1, 3])
+def test_max_workers_bounds_requests_in_flight(make_server, make_calendar, max_workers):
+    server = make_server(latency=0.05)
+    calendar = make_calendar(server)
+    state = count_in_flight(server)
+    results = calendar.new_events([spec(i) for i in range(12)], max_workers=max_workers)
+    assert all(result.ok for result in results)
+    assert state['peak'] == max_workers
+
+
+def test_new_events_refreshes_the_subcalendar_window(make_server, make_calendar):
+    server = make_server()
+    calendar = make_calendar(server)
+    assert calendar.subcalendar_events(1, START, START + HOUR) == {1: []}
+    calendar.new_events([spec(0)])
+    assert [e.title for e in calendar.subcalendar_events(1, START, START + HOUR)[1]] == ['Event 0']
+    assert calendar.new_events([]) == []
+    with pytest.raises(ValueError):
+        calendar.new_events([spec(0)], returnas='dataframe')
@@ -0,0 +1,76 @@
+import datetime
+
+from benchmarks.mock_server import synthetic_calendar
+
+START = datetime.date(2026, 1, 1)
+END = datetime.date(2026, 12, 31)
+
+
+def desired_events(subcalendar_id):
+    base = datetime.datetime(2026, 3, 1, 9)
+    return [{'remote_id': f'ext-{i}', 'title': f'Sync {i}', 'subcalendar_ids': [subcalendar_id],
+             'start_dt': base + datetime.timedelta(days=30 * i),
+             'end_dt': base + datetime.timedelta(days=30 * i, hours=1)}
+            for i in range(6)]
+
+
+def test_second_run_on_non_utc_calendar_is_unchanged(make_server, make_calendar):
+    server = make_server(timezone='Europe/Berlin')
+    calendar = make_calendar(server)
+    desired = desired_events(server.subcalendars[0]['id'])
+
+    first = calendar.reconcile(desired, START, END)
+    assert first.summary()['create'] == 6 and not first.failed
+    # the server stores the naive times with the calendar's offset
+    assert all(e['start_dt'].endswith(('+01:00', '+02:00')) for e in server.events.values())
+
+    server.reset_counts()
+    second = calendar.reconcile(desired, START, END)
+    assert second.summary() == {'create': 0, 'update': 0, 'delete': 0, 'unchanged': 6, 'skipped': 0, 'failed': 0}
+    assert server.requests == {'GET /events': 1}
+
+
+def test_naive_change_is_detected_in_wall_clock_time(make_server, make_calendar):
+    server = make_server(timezone='Europe/Berlin')
+    calendar = make_calendar(server)
+    desired = desired_events(server.subcalendars[0]['id'])
+    calendar.reconcile(desired, START, END)
+
+    desired[2]['start_dt'] += datetime.timedelta(hours=1)
+    report = calendar.reconcile(desired, START, END, dry_run=True)
+    assert [(a.remote_id, list(a.changes)) for a in report.updates] == [('ext-2', ['start_dt'])]
+
+
+def test_dry_run_sends_nothing_and_stale_events_are_deleted(make_server, make_calendar):
+    events, subcalendars = synthetic_calendar(5, subcalendars=2, recurring=0,
+                                              start=datetime.datetime(2026, 2, 1, tzinfo=datetime.timezone.utc))
+    for i, event in enumerate(events):
+        event['remote_id'] = f'ext-{i}'
+    server = make_server(events=events, subcalendars=subcalendars)
+    calendar = make_calendar(server)
+    desired = [{'remote_id': e['remote_id'], 'title': e['title']} for e in events[:3]]
+    desired[0]['title'] = 'Renamed'
+
+    server.reset_counts()
+    plan = calendar.reconcile(desired, START, END, dry_run=True)
+    assert plan.summary()['update'] == 1 and plan.summary()['delete'] == 2
+    assert server.requests == {'GET /events': 1}
+
+    report = calendar.reconcile(desired, START, END)
+    assert not report.failed
+    assert sorted(server.events) == sorted(str(e['id']) for e in events[:3])
+
+
+def test_desired_recurring_event_is_skipped_not_created(make_server, make_calendar):
+    events, subcalendars = synthetic_calendar(1, subcalendars=1, recurring=1.0, occurrences=3,
+                                              start=datetime.datetime(2026, 2, 1, tzinfo=datetime.timezone.utc))
+    for event in events:
+        event['remote_id'] = 'ext-series'
+    server = make_server(events=events, subcalendars=subcalendars)
+    calendar = make_calendar(server)
+
+    server.reset_counts()
+    report = calendar.reconcile([{'remote_id': 'ext-series', 'title': 'Renamed'}], START, END)
+    assert report.summary() == {'create': 0, 'update': 0, 'delete': 0, 'unchanged': 0, 'skipped': len(events),
+                                'failed': 0}
+    assert server.requests == {'GET /events': 1}
@@ -0,0 +1,56 @@
+import datetime
+
+import pytest
+
+from pyteamup.Recurrence import RecurrenceEngine, Series
+
+NINE = datetime.datetime(2026, 1, 12, 9)
+
+
+def weekly(series_id, start, tz=None):
+    return {'id': f'{series_id}-rid-0', 'series_id': series_id, 'rrule': 'FREQ=WEEKLY;COUNT=10', 'tz': tz,
+            'title': 'Weekly', 'subcalendar_ids': [1], 'start_dt': start, 'end_dt': start.replace('T09', 'T10'),
+            'ristart_dt': start, 'rsstart_dt': start}
+
+
+@pytest.fixture
+def engine():
+    return RecurrenceEngine([
+        weekly('zoned', '2026-01-05T09:00:00+01:00', tz='Europe/Berlin'),
+        weekly('fixed', '2026-01-05T09:00:00+01:00'),
+        {'id': 'single', 'rrule': '', 'title': 'Once', 'subcalendar_ids': [1], 'tz': None,
+         'start_dt': '2026-01-12T09:00:00+01:00', 'end_dt': '2026-01-12T10:00:00+01:00'}])
+
+
+@pytest.mark.parametrize('start, end, expected', [
+    # naive bounds are wall clock time of each event, not UTC: 09:00-10:00 local overlaps 09:30-09:45 but not 08:00-08:59
+    (NINE + datetime.timedelta(minutes=30), NINE + datetime.timedelta(minutes=45), 1),
+    (NINE - datetime.timedelta(hours=1), NINE - datetime.timedelta(minutes=1), 0),
+    # aware bounds are instants: 09:00+01:00 is 08:00 UTC
+    (datetime.datetime(2026, 1, 12, 7, 30, tzinfo=datetime.timezone.utc),
+     datetime.datetime(2026, 1, 12, 8, 30, tzinfo=datetime.timezone.utc), 1),
+])
+def test_bounds_are_read_the_same_everywhere(engine, start, end, expected):
+    for series in engine.series:
+        assert len(series.between(start, end)) == expected
+        assert len(series.arrays(start, end)[0]) == expected
+    assert sorted(engine.arrays(start, end).series_ids) == ['fixed', 'zoned'] * expected
+    assert len(engine.expand(start, end)) == 3 * expected
+
+
+def test_weekly_series_keeps_wall_clock_time_across_dst():
+    series = Series('s', 'FREQ=WEEKLY;COUNT=20', '2026-03-02T09:00:00+01:00', '2026-03-02T10:00:00+01:00',
+                    tz='Europe/Berlin')
+    starts = [o.start_dt for o in series.between(datetime.date(2026, 3, 1), datetime.date(2026, 4, 10))]
+    assert [s.hour for s in starts] == [9] * 6
+    assert [s.utcoffset() for s in starts] == [datetime.timedelta(hours=1)] * 4 + [datetime.timedelta(hours=2)] * 2
+
+
+def test_exceptions_are_applied(engine):
+    series = engine['fixed']
+    series.exclude('2026-01-12T09:00:00+01:00')
+    moved = dict(series.template, start_dt='2026-01-19T11:00:00+01:00', end_dt='2026-01-19T12:00:00+01:00')
+    series.override('2026-01-19T09:00:00+01:00', moved)
+    starts = [o.start_dt.hour for o in series.between(datetime.date(2026, 1, 10), datetime.date(2026, 1, 25))]
+    assert starts == [11]
+    assert len(series.arrays(datetime.date(2026, 1, 10), datetime.date(2026, 1, 25))[0]) == 1
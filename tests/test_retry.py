@@ -0,0 +1,126 @@
+import datetime
+import socket
+import time
+
+import pytest
+import requests
+
+from pyteamup.utils.exceptions import ServerError, error_class
+from pyteamup.utils.ratelimit import RetryPolicy, TokenBucket, parse_retry_after
+from pyteamup.utils.transport import Transport
+
+START = datetime.datetime(2026, 5, 4, 9)
+
+
+def new_event(calendar, server):
+    return calendar.new_event('Retried', START, START + datetime.timedelta(hours=1), server.subcalendars[0]['id'])
+
+
+def test_post_is_not_retried_on_503(make_server, make_calendar):
+    server = make_server()
+    calendar = make_calendar(server, retry=RetryPolicy(base_delay=0))
+    server.reset_counts()
+    server.inject_errors(503)
+    with pytest.raises(Exception):
+        new_event(calendar, server)
+    assert server.requests == {'POST /events': 1}
+    assert server.events == {}
+
+
+def test_post_is_retried_on_429(make_server, make_calendar):
+    server = make_server()
+    calendar = make_calendar(server, retry=RetryPolicy(base_delay=0))
+    server.reset_counts()
+    server.inject_errors(429, count=2)
+    event = new_event(calendar, server)
+    assert server.requests == {'POST /events': 3}
+    assert list(server.events) == [str(event.event_id)]
+
+
+def test_get_is_retried_on_503(make_server, make_calendar):
+    server = make_server()
+    calendar = make_calendar(server, retry=RetryPolicy(base_delay=0))
+    server.reset_counts()
+    server.inject_errors(503, count=2)
+    assert calendar.get_event_collection(START, START + datetime.timedelta(days=1)) == []
+    assert server.requests == {'GET /events': 3}
+
+
+def test_retry_after_is_clamped_to_max_delay(make_server, make_calendar):
+    server = make_server()
+    calendar = make_calendar(server, retry=RetryPolicy(base_delay=0, max_delay=0.05))
+    server.inject_errors(429, retry_after=3600)
+    began = time.perf_counter()
+    new_event(calendar, server)
+    assert time.perf_counter() - began < 5
+
+
+@pytest.mark.parametrize('status, retryable', [(429, True), (500, False), (502, True), (503, True), (504, True),
+                                               (409, False)])
+def test_error_retryable_agrees_with_policy(status, retryable):
+    error = error_class(status)('failed', status_code=status)
+    assert error.retryable is retryable
+    assert RetryPolicy().should_retry_status(status, 0) is retryable
+    if status >= 500:
+        assert isinstance(error, ServerError)
+
+
+def test_500_is_not_retried(make_server, make_calendar):
+    server = make_server()
+    calendar = make_calendar(server, retry=RetryPolicy(base_delay=0))
+    server.reset_counts()
+    server.inject_errors(500)
+    with pytest.raises(Exception) as raised:
+        calendar.get_event_collection(START, START + datetime.timedelta(days=1))
+    assert server.requests == {'GET /events': 1}
+    assert raised.value.retryable is False
+
+
+def test_retry_policy_decisions():
+    policy = RetryPolicy(max_retries=2)
+    assert policy.should_retry_status(503, 0, 'GET')
+    assert policy.should_retry_status(503, 0, 'PUT')
+    assert not policy.should_retry_status(503, 0, 'POST')
+    assert policy.should_retry_status(429, 0, 'POST')
+    assert not policy.should_retry_status(429, 2, 'GET')
+    assert not policy.should_retry_status(500, 0, 'GET')
+    assert not policy.should_retry_error('POST', 0)
+    assert policy.should_retry_error('POST', 0, sent=False)
+    assert policy.should_retry_error('GET', 1)
+    assert policy.delay(0, retry_after=120) == policy.max_delay
+    assert policy.delay(0, retry_after=2) == 2
+    assert 0 <= policy.delay(10) <= policy.max_delay
+    assert parse_retry_after('7') == 7.0
+    assert parse_retry_after(None) is None
+
+
+def test_refused_connection_is_retried_for_post(monkeypatch):
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    sleeps = []
+    monkeypatch.setattr(Transport, '_sleep', staticmethod(lambda seconds: sleeps.append(seconds) or 0.0))
+    with Transport(retry=RetryPolicy(max_retries=2)) as transport:
+        with pytest.raises(requests.ConnectionError):
+            transport.post(f'http://127.0.0.1:{port}/events', json={})
+    assert len(sleeps) == 2
+
+
+def test_token_bucket_allows_burst_then_paces():
+    bucket = TokenBucket(rate=10, burst=3)
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    wait = bucket.reserve()
+    assert 0.05 < wait <= 0.1
+    assert bucket.reserve() > wait
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_rate_limiter_paces_requests(make_server, make_calendar):
+    server = make_server()
+    calendar = make_calendar(server, rate_limiter=TokenBucket(rate=20, burst=1), cache=False)
+    calendar.valid_api
+    began = time.perf_counter()
+    for _ in range(5):
+        calendar.get_event_collection(START, START + datetime.timedelta(days=1))
+    assert time.perf_counter() - began >= 0.15
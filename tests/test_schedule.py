@@ -0,0 +1,91 @@
+import datetime
+
+import pytest
+
+from pyteamup import Schedule
+
+UTC = datetime.timezone.utc
+DAY = datetime.date(2026, 3, 2)
+
+
+def at(hour, minute=0):
+    return datetime.datetime(2026, 3, 2, hour, minute, tzinfo=UTC)
+
+
+def booking(event_id, start, end, subcalendar_ids, all_day=False):
+    return {'id': event_id, 'start_dt': start.isoformat(), 'end_dt': end.isoformat(), 'all_day': all_day,
+            'subcalendar_ids': subcalendar_ids, 'title': f'Booking {event_id}'}
+
+
+@pytest.fixture
+def schedule():
+    return Schedule([booking(1, at(9), at(17), [5]),
+                     booking(2, at(10), at(11), [6]),
+                     booking(3, at(10, 30), at(12), [6, 7]),
+                     booking(4, at(8), at(9), [5])], subcalendar_ids=[5, 6, 7, 8])
+
+
+@pytest.mark.parametrize('room', [5, '5'])
+def test_ids_are_read_as_str_or_int(schedule, room):
+    assert [e['id'] for e in schedule.overlapping(at(8), at(10), room)] == [4, 1]
+    assert not schedule.is_free(at(12), at(13), room)
+    assert schedule.is_free(at(17), at(18), room)
+    assert schedule.free_slots(datetime.timedelta(hours=1), at(8), at(20), [room], count=2) == \
+        [(at(17), at(18)), (at(18), at(19))]
+
+
+def test_overlapping_lists_events_once(schedule):
+    found = schedule.overlapping(at(10, 45), at(10, 50))
+    assert [e['id'] for e in found] == [1, 2, 3]
+    assert [e['id'] for e in schedule.overlapping(at(11), at(12), ['6', 7])] == [3]
+
+
+def test_conflicts(schedule):
+    conflicts = schedule.conflicts()
+    assert set(conflicts) == {'5', '6', '7', '8'}
+    assert [(a['id'], b['id']) for a, b in conflicts['6']] == [(2, 3)]
+    assert conflicts['5'] == [] and conflicts['8'] == []
+    assert list(schedule.conflicts(['6'])) == ['6']
+
+
+def test_free_slots_across_subcalendars(schedule):
+    slots = schedule.free_slots(datetime.timedelta(minutes=30), at(9), at(13), subcalendar_ids=['6', '7'], count=3,
+                                step=datetime.timedelta(minutes=15))
+    assert slots == [(at(9), at(9, 30)), (at(9, 15), at(9, 45)), (at(9, 30), at(10))]
+    assert schedule.free_slots(datetime.timedelta(hours=1), at(12), at(13), ['5']) == []
+    with pytest.raises(ValueError):
+        schedule.free_slots(datetime.timedelta(0), at(9), at(10))
+
+
+def test_known_subcalendar_without_events_is_free(schedule):
+    assert schedule.is_free(at(0), at(23), 8)
+    assert schedule.overlapping(at(0), at(23), '8') == []
+    assert schedule.free_slots(datetime.timedelta(hours=2), at(9), at(12), ['8']) == [(at(9), at(11))]
+
+
+def test_unknown_subcalendar_raises(schedule):
+    for query in (lambda: schedule.is_free(at(9), at(10), '99'),
+                  lambda: schedule.overlapping(at(9), at(10), [5, 99]),
+                  lambda: schedule.conflicts([99]),
+                  lambda: schedule.free_slots(datetime.timedelta(hours=1), at(9), at(10), ['99'])):
+        with pytest.raises(KeyError):
+            query()
+
+
+def test_all_day_events_block_whole_days():
+    schedule = Schedule([booking(1, at(0), at(0), ['1'], all_day=True)])
+    assert not schedule.is_free(at(23), at(23, 30), 1)
+    assert schedule.is_free(at(0) + datetime.timedelta(days=1), at(1) + datetime.timedelta(days=1), 1)
+    assert schedule.subcalendar_ids == ['1']
+
+
+def test_calendar_schedule_knows_every_subcalendar(make_server, make_calendar):
+    subcalendars = [{'id': 11, 'name': 'Room A', 'active': True}, {'id': 12, 'name': 'Room B', 'active': True}]
+    server = make_server(subcalendars=subcalendars, events=[
+        dict(booking(100, at(9), at(17), [11]), version='v1', rrule='', series_id=None)])
+    schedule = make_calendar(server).get_schedule(DAY, DAY)
+    room_a, room_b = (subcal['id'] for subcal in subcalendars)
+    assert not schedule.is_free(at(10), at(11), room_a)
+    assert schedule.is_free(at(10), at(11), room_b)
+    with pytest.raises(KeyError):
+        schedule.is_free(at(10), at(11), 13)
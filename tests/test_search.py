@@ -0,0 +1,84 @@
+import datetime
+
+import pytest
+
+from pyteamup import Event
+from pyteamup.utils.search import SearchIndex, tokenize
+
+UTC = datetime.timezone.utc
+
+
+def event(event_id, title, day, subcalendar_ids=(1,), notes='', location='', who='', **fields):
+    start = datetime.datetime(2026, 4, day, 9, tzinfo=UTC)
+    return dict({'id': event_id, 'title': title, 'notes': notes, 'location': location, 'who': who,
+                 'subcalendar_ids': list(subcalendar_ids), 'start_dt': start.isoformat(),
+                 'end_dt': (start + datetime.timedelta(hours=1)).isoformat(), 'delete_dt': None}, **fields)
+
+
+@pytest.fixture
+def index():
+    return SearchIndex([event(1, 'Board meeting', 1, notes='<p>Budget &amp; planning</p>'),
+                        event(2, 'Team standup', 2, subcalendar_ids=(2,), location='Boardroom'),
+                        event(3, 'Budget review', 3, subcalendar_ids=(1, 2), who='Alice'),
+                        event(4, 'Offsite', 10, who='Bob')])
+
+
+def ids(events):
+    return [e['id'] for e in events]
+
+
+def test_tokenize_drops_html_and_case():
+    assert tokenize('<p>Budget &amp; Planning</p>') == ['budget', 'planning']
+    assert tokenize(None) == []
+
+
+def test_prefix_and_whole_word_matching(index):
+    assert ids(index.search('board')) == [1, 2]
+    assert ids(index.search('board', prefix=False)) == [1]
+    assert ids(index.search('bud')) == [1, 3]
+    assert ids(index.search('BUDGET plan')) == [1]
+    assert ids(index.search('alice')) == [3]
+    assert index.search('budget offsite') == []
+    assert index.search('nothing') == []
+    assert ids(index.search('')) == [1, 2, 3, 4]
+    assert ids(index.search('b', limit=2)) == [1, 2]
+
+
+def test_date_and_subcalendar_filters(index):
+    assert ids(index.search('', start_dt=datetime.date(2026, 4, 2), end_dt=datetime.date(2026, 4, 3))) == [2, 3]
+    assert ids(index.search('', end_dt=datetime.datetime(2026, 4, 2, 9, tzinfo=UTC))) == [1]
+    assert ids(index.search('budget', subcalendar_ids=2)) == [3]
+    assert ids(index.search('b', subcalendar_ids=['2'])) == [2, 3]
+    assert ids(index.search('', start_dt=datetime.date(2026, 4, 4), subcalendar_ids=[1])) == [4]
+
+
+def test_updates_replace_and_remove(index):
+    index.add(event(2, 'Retro', 2))
+    assert ids(index.search('standup')) == [] and ids(index.search('retro')) == [2]
+    assert ids(index.search('boardroom')) == []
+    added, removed = index.apply_changes([event(5, 'Board dinner', 20),
+                                          event(1, 'Board meeting', 1, delete_dt='2026-04-01T10:00:00+00:00'),
+                                          event(99, 'Never indexed', 1, delete_dt='2026-04-01T10:00:00+00:00')])
+    assert (added, removed) == (1, 1)
+    assert ids(index.search('board')) == [5]
+    assert 1 not in index and len(index) == 4
+    assert index.remove(1) is False
+    # words no event holds any more leave the vocabulary
+    assert ids(index.search('plan')) == []
+
+
+def test_index_over_events(make_server, make_calendar):
+    server = make_server(events=[dict(event(1, 'Board meeting', 1), version='v1', rrule='', series_id=None),
+                                 dict(event(2, 'Lunch', 2), version='v1', rrule='', series_id=None)])
+    calendar = make_calendar(server)
+    start, end = datetime.date(2026, 4, 1), datetime.date(2026, 4, 30)
+    server.reset_counts()
+    index = calendar.search_index(start, end)
+    assert [type(e) for e in index.search('boa')] == [Event]
+    assert [e.title for e in index.search('lunch')] == ['Lunch']
+    assert server.requests == {'GET /events': 1}
+
+    remote = calendar.search_events('lunch', start, end, returnas='dict')
+    assert [e['title'] for e in remote] == ['Lunch']
+    with pytest.raises(TypeError):
+        calendar.search_index(start, end, returnas='dataframe')
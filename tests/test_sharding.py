@@ -0,0 +1,72 @@
+import datetime
+
+import pytest
+
+from benchmarks.mock_server import synthetic_calendar
+
+START = datetime.datetime(2026, 3, 1, tzinfo=datetime.timezone.utc)
+END = START + datetime.timedelta(days=30)
+SUBCALENDARS = list(range(1, 11))
+
+
+@pytest.fixture(scope='module')
+def synthetic():
+    return synthetic_calendar(800, subcalendars=10, recurring=0.2, occurrences=4, start=START, seed=3)
+
+
+@pytest.fixture
+def server(make_server, synthetic):
+    events, subcalendars = synthetic
+    return make_server(events=events, subcalendars=subcalendars)
+
+
+def ids(events):
+    return [event['id'] for event in events]
+
+
+@pytest.mark.parametrize('shard_days, subcal_batch_size, max_shard_events', [
+    (1, None, None),
+    (3, None, None),
+    (7, 3, None),
+    (None, 4, None),
+    (None, 1, None),
+    (30, None, 100),
+    (10, 3, 40),
+    (2, 2, 1),
+])
+@pytest.mark.parametrize('subcal_id', [None, SUBCALENDARS, [2, 5, 7]])
+def test_sharded_fetch_returns_the_unsharded_events(server, make_calendar, shard_days, subcal_batch_size,
+                                                    max_shard_events, subcal_id):
+    calendar = make_calendar(server)
+    single = calendar.get_event_collection(START, END, subcal_id, returnas='dict')
+    server.reset_counts()
+    sharded = calendar.get_event_collection(START, END, subcal_id, returnas='dict', shard_days=shard_days,
+                                            subcal_batch_size=subcal_batch_size, max_workers=8,
+                                            max_shard_events=max_shard_events)
+
+    assert len(set(ids(sharded))) == len(sharded)
+    assert sorted(ids(sharded)) == sorted(ids(single))
+    assert {event['id']: event for event in sharded} == {event['id']: event for event in single}
+    assert [e['start_dt'] for e in sharded] == sorted(e['start_dt'] for e in sharded)
+
+    windows = -(-31 // shard_days) if shard_days else 1
+    groups = -(-len(subcal_id) // subcal_batch_size) if subcal_batch_size and subcal_id else 1
+    if max_shard_events:
+        # full windows were split and fetched again
+        assert server.requests['GET /events'] > windows * groups
+    else:
+        assert server.requests == {'GET /events': windows * groups}
+
+
+def test_events_crossing_shards_are_returned_once(server, make_calendar, synthetic):
+    events, _ = synthetic
+    calendar = make_calendar(server)
+    # events spanning midnight are returned by both daily windows, events in several subcalendars by several groups
+    crossing = [e for e in events if e['start_dt'][:10] != e['end_dt'][:10] and len(e['subcalendar_ids']) > 1]
+    assert crossing
+    sharded = calendar.get_event_collection(START, END, SUBCALENDARS, shard_days=1, subcal_batch_size=1,
+                                            max_workers=8)
+    in_range = [e['id'] for e in events if e['end_dt'][:10] >= START.date().isoformat() and
+                e['start_dt'][:10] <= END.date().isoformat()]
+    assert len(in_range) < len(events)
+    assert sorted(e.event_id for e in sharded) == sorted(in_range)
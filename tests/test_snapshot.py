@@ -0,0 +1,58 @@
+import datetime
+
+import pytest
+
+from pyteamup import Snapshot, dumps_snapshot
+
+
+def record(event_id, start, end, **fields):
+    return dict({'id': event_id, 'series_id': None, 'remote_id': None, 'subcalendar_ids': [1, 2],
+                 'subcalendar_id': 1, 'all_day': False, 'rrule': '', 'title': f'Event {event_id}', 'who': '',
+                 'location': '', 'notes': '', 'version': 'v1', 'readonly': False, 'tz': None,
+                 'start_dt': start, 'end_dt': end}, **fields)
+
+
+def present(records):
+    # fields absent from a snapshot are read back as None
+    return [{k: v for k, v in r.items() if v is not None} for r in records]
+
+
+def round_trip(records):
+    snapshot = Snapshot(dumps_snapshot(records, calendar_id='kscal'))
+    return snapshot, present(snapshot.records())
+
+
+def test_records_round_trip():
+    records = [record(1, '2026-01-05T09:00:00+01:00', '2026-01-05T10:00:00+01:00'),
+               record(2, '2026-07-05T09:00:00-04:30', None, notes='<p>x</p>', custom={'a': [1]}),
+               record(3, '2026-07-05T09:00:00', '2026-07-05T10:00:00', all_day=True)]
+    snapshot, decoded = round_trip(records)
+    assert decoded == present(records)
+    assert present(snapshot.record(i) for i in range(3)) == present(records)
+    assert present([snapshot.get(2, returnas='dict')]) == present(records[1:2])
+    assert snapshot.columns and len(snapshot) == 3
+
+
+def test_offsets_with_seconds_are_kept_exactly():
+    # historical zones such as Europe/Amsterdam before 1937 had offsets of minutes and seconds
+    records = [record(1, '1930-05-01T09:00:00+00:19:32', '1930-05-01T10:00:00+00:19:32'),
+               record(2, '2026-01-05T09:00:00+01:00', '2026-01-05T10:00:00+01:00')]
+    snapshot, decoded = round_trip(records)
+    assert decoded == present(records)
+    assert snapshot.column('start_dt') == [r['start_dt'] for r in records]
+
+
+def test_time_columns_are_compact():
+    records = [record(i, f'2026-01-{i + 1:02d}T09:00:00+01:00', f'2026-01-{i + 1:02d}T10:00:00+01:00')
+               for i in range(20)]
+    snapshot, decoded = round_trip(records)
+    assert decoded == present(records)
+    epochs = snapshot.epochs('start_dt')
+    assert int(epochs[0]) == int(datetime.datetime.fromisoformat(records[0]['start_dt']).timestamp())
+
+
+def test_time_parts_rejects_second_offsets():
+    from pyteamup.Snapshot import _time_parts
+    assert _time_parts('2026-01-05T09:00:00+05:45')[1] == 345
+    with pytest.raises(ValueError):
+        _time_parts('1930-05-01T09:00:00+00:19:32')
@@ -0,0 +1,32 @@
+import datetime
+
+from benchmarks.mock_server import synthetic_calendar
+
+START = datetime.date(2000, 1, 1)
+END = datetime.date(2100, 1, 1)
+
+
+def test_views_of_several_subcalendars_share_one_request(make_server, make_calendar):
+    events, subcalendars = synthetic_calendar(30, subcalendars=3, recurring=0)
+    server = make_server(events=events, subcalendars=subcalendars)
+    calendar = make_calendar(server)
+    server.reset_counts()
+    counts = {s.subcalendar_id: len(s.events(START, END)) for s in calendar.subcalendars}
+    assert server.requests == {'GET /subcalendars': 1, 'GET /events': 1}
+    for subcal_id, count in counts.items():
+        assert count == sum(subcal_id in e['subcalendar_ids'] for e in events)
+    assert calendar.get_subcalendar(name=subcalendars[1]['name']).subcalendar_id == subcalendars[1]['id']
+
+
+def test_dict_views_are_copies(make_server, make_calendar):
+    events, subcalendars = synthetic_calendar(10, subcalendars=2, recurring=0)
+    server = make_server(events=events, subcalendars=subcalendars)
+    calendar = make_calendar(server)
+    subcal_id = subcalendars[0]['id']
+    first = calendar.subcalendar_events(subcal_id, START, END, returnas='dict')[subcal_id]
+    count = len(first)
+    first.clear()
+    server.reset_counts()
+    again = calendar.subcalendar_events(subcal_id, START, END, returnas='dict')[subcal_id]
+    assert len(again) == count and again is not first
+    assert server.request_count == 0
@@ -0,0 +1,48 @@
+import datetime
+import threading
+import time
+
+from pyteamup import SyncedCalendar
+from benchmarks.mock_server import synthetic_calendar
+
+START = datetime.date(2000, 1, 1)
+END = datetime.date(2100, 1, 1)
+
+
+def mirrored(make_server, make_calendar, n=20):
+    events, subcalendars = synthetic_calendar(n, subcalendars=3, recurring=0)
+    server = make_server(events=events, subcalendars=subcalendars)
+    calendar = make_calendar(server)
+    return server, SyncedCalendar(calendar, start_dt=START, end_dt=END, window_days=36500)
+
+
+def test_full_resync_replaces_the_content(make_server, make_calendar):
+    server, mirror = mirrored(make_server, make_calendar)
+    assert mirror.full_resync() == 20
+    removed = next(iter(server.events))
+    del server.events[removed]
+    assert mirror.full_resync() == 19
+    assert len(mirror) == 19
+    assert removed not in {str(e['id']) for e in mirror.get_event_collection(START, END, returnas='dict')}
+    subcal_id = server.subcalendars[0]['id']
+    expected = {k for k, e in server.events.items() if subcal_id in e['subcalendar_ids']}
+    assert {str(e['id']) for e in mirror.get_event_collection(START, END, subcal_id, returnas='dict')} == expected
+
+
+def test_reads_are_not_blocked_by_the_download(make_server, make_calendar):
+    server, mirror = mirrored(make_server, make_calendar)
+    mirror.full_resync()
+    server.latency = 1.0
+    server.reset_counts()
+    resync = threading.Thread(target=mirror.full_resync)
+    resync.start()
+    try:
+        while not server.request_count:
+            time.sleep(0.01)
+        began = time.perf_counter()
+        assert len(mirror) == 20
+        assert len(mirror.get_event_collection(START, END)) == 20
+        assert time.perf_counter() - began < 0.5
+    finally:
+        resync.join()
+    assert len(mirror) == 20
@@ -0,0 +1,65 @@
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.mock_server import synthetic_calendar
+
+START = datetime.date(2000, 1, 1)
+END = datetime.date(2100, 1, 1)
+THREADS = 20
+
+
+def run_together(fn):
+    """Runs fn(i) in THREADS threads released at once, returns the results and the errors raised"""
+    barrier = threading.Barrier(THREADS)
+
+    def task(i):
+        barrier.wait()
+        try:
+            return fn(i), None
+        except Exception as error:
+            return None, error
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        outcomes = list(pool.map(task, range(THREADS)))
+    return [value for value, _ in outcomes], [error for _, error in outcomes if error is not None]
+
+
+def test_identical_gets_are_sent_once(make_server, make_calendar):
+    events, subcalendars = synthetic_calendar(50, subcalendars=3, recurring=0)
+    server = make_server(events=events, subcalendars=subcalendars, latency=0.2)
+    calendar = make_calendar(server, validate=False, pool_size=THREADS)
+    event_id = events[0]['id']
+
+    def cold_start(_):
+        return (calendar.configuration, len(calendar.subcalendars), len(calendar.get_event_collection(START, END)),
+                calendar.get_event(event_id).event_id)
+
+    server.reset_counts()
+    results, errors = run_together(cold_start)
+    assert errors == []
+    # one collection and one single event request, both counted under /events
+    assert server.requests == {'GET /configuration': 1, 'GET /subcalendars': 1, 'GET /events': 2}
+    assert len(set(map(repr, results))) == 1
+    # every waiter got its own collection list
+    lists = run_together(lambda _: calendar.get_event_collection(START, END, subcal_id=1))[0]
+    assert len({id(events) for events in lists}) == THREADS
+
+
+def test_concurrent_updates_of_one_event_do_not_conflict(make_server, make_calendar):
+    events, subcalendars = synthetic_calendar(5, subcalendars=1, recurring=0)
+    server = make_server(events=events, subcalendars=subcalendars, latency=0.01)
+    calendar = make_calendar(server, pool_size=THREADS)
+    shared = calendar.get_event_collection(START, END)[0]
+
+    def update(i):
+        if i % 2:
+            shared.title = f'Title {i}'
+        else:
+            shared.execute_update({'location': f'Room {i}'})
+
+    server.reset_counts()
+    _, errors = run_together(update)
+    assert errors == []
+    assert server.request_count == THREADS
+    stored = server.events[str(shared.event_id)]
+    assert (stored['title'], stored['location'], stored['version']) == (shared.title, shared.location, shared.version)
@@ -0,0 +1,73 @@
+import datetime
+
+from pyteamup import VersionConflict
+from benchmarks.mock_server import synthetic_calendar
+
+START = datetime.date(2000, 1, 1)
+END = datetime.date(2100, 1, 1)
+
+
+def calendar_with_events(make_server, make_calendar, n=5):
+    events, subcalendars = synthetic_calendar(n, subcalendars=2, recurring=0)
+    server = make_server(events=events, subcalendars=subcalendars)
+    return server, make_calendar(server), events
+
+
+def test_changes_are_merged_into_one_put_per_event(make_server, make_calendar):
+    server, calendar, events = calendar_with_events(make_server, make_calendar)
+    fetched = calendar.get_event_collection(START, END)
+    server.reset_counts()
+    with calendar.unit_of_work() as uow:
+        for event in fetched[:3]:
+            event.title = 'Renamed'
+            event.location = 'Room 1'
+        assert len(uow) == 3
+    assert server.requests == {'PUT /events': 3}
+    assert all(r.ok for r in uow.results)
+    for event in fetched[:3]:
+        stored = server.events[str(event.event_id)]
+        assert (stored['title'], stored['location']) == ('Renamed', 'Room 1')
+
+
+def test_objects_of_the_same_event_share_one_put(make_server, make_calendar):
+    server, calendar, events = calendar_with_events(make_server, make_calendar)
+    first = calendar.get_event_collection(START, END)[0]
+    event_id = first.event_id
+    second = calendar.get_event(event_id)
+    assert first is not second and first.event_id == second.event_id
+
+    server.reset_counts()
+    with calendar.unit_of_work() as uow:
+        first.title = 'Renamed'
+        second.location = 'Room 2'
+    assert server.requests == {'PUT /events': 1}
+    assert uow.conflicts == [] and all(r.ok for r in uow.results)
+    stored = server.events[str(event_id)]
+    assert (stored['title'], stored['location']) == ('Renamed', 'Room 2')
+    # both objects are refreshed, so a later change does not conflict
+    assert (second.title, first.location) == ('Renamed', 'Room 2')
+    second.notes = 'after'
+    assert server.events[str(event_id)]['notes'] == 'after'
+
+
+def test_error_in_block_discards_changes(make_server, make_calendar):
+    server, calendar, _ = calendar_with_events(make_server, make_calendar)
+    event = calendar.get_event_collection(START, END)[0]
+    server.reset_counts()
+    try:
+        with calendar.unit_of_work():
+            event.title = 'Never sent'
+            raise RuntimeError
+    except RuntimeError:
+        pass
+    assert server.request_count == 0
+
+
+def test_stale_event_is_reported_as_conflict(make_server, make_calendar):
+    server, calendar, _ = calendar_with_events(make_server, make_calendar)
+    stale = calendar.get_event_collection(START, END)[0]
+    calendar.get_event(stale.event_id, returnas='event').title = 'Changed elsewhere'
+    with calendar.unit_of_work() as uow:
+        stale.title = 'Too late'
+    assert uow.conflicts == [stale]
+    assert isinstance(uow.results[0].error, VersionConflict)